@@ -0,0 +1,97 @@
+import click
+import os
+import sys
+
+# Add current directory to path to ensure imports work
+sys.path.append(os.getcwd())
+
+from rich.console import Console
+from rich.table import Table
+
+from src.segment_store import SegmentStore, hash_file
+
+DEFAULT_DB = os.path.join('viz', 'segments.db')
+
+@click.group()
+def cli():
+    """
+    Queries the project-wide SQLite segment index written by main.py and visuals_cli.py.
+    """
+    pass
+
+@cli.command()
+@click.option('--db', default=DEFAULT_DB, type=click.Path(exists=True), help='Segment index database')
+@click.option('--lang', default=None, help='Target language chosen for the segment (e.g. C++)')
+@click.option('--recursive/--non-recursive', default=None, help='Filter on detected recursion')
+@click.option('--min-math', default=0, help='Minimum number of math operations')
+@click.option('--min-loops', default=0, help='Minimum number of loops')
+@click.option('--file', 'path', default=None, help='Substring of the file path')
+@click.option('--tool', type=click.Choice(['polyglot', 'splitter']), default=None, help='CLI that recorded the segment')
+@click.option('--limit', default=100, help='Maximum number of rows')
+def query(db, lang, recursive, min_math, min_loops, path, tool, limit):
+    """Lists indexed segments matching the given filters."""
+    with SegmentStore(db) as store:
+        rows = store.query(lang=lang, recursive=recursive, min_math=min_math, min_loops=min_loops,
+                           path=path, tool=tool, limit=limit)
+
+    table = Table(title=f"Indexed Segments ({len(rows)})")
+    table.add_column("File", style="cyan")
+    table.add_column("Segment", style="cyan")
+    table.add_column("Lines", justify="right")
+    table.add_column("Language", style="magenta")
+    table.add_column("Math", justify="right", style="green")
+    table.add_column("Loops", justify="right", style="green")
+    table.add_column("Recursive", style="green")
+    table.add_column("Score", justify="right", style="yellow")
+    for row in rows:
+        table.add_row(
+            os.path.relpath(row["path"]), row["segment_id"], f"{row['start_line']}-{row['end_line']}",
+            row["lang"] or "-", _count(row["math_ops"]), _count(row["loops"]),
+            "-" if row["recursion"] is None else ("yes" if row["recursion"] else "no"),
+            "-" if row["score"] is None else f"{row['score']:.2f}"
+        )
+    Console().print(table)
+
+@cli.command()
+@click.option('--db', default=DEFAULT_DB, type=click.Path(exists=True), help='Segment index database')
+def files(db):
+    """Lists indexed files with their hash and last analysis time."""
+    with SegmentStore(db) as store:
+        rows = store.files()
+    table = Table(title="Indexed Files")
+    table.add_column("File", style="cyan")
+    table.add_column("Tool", style="magenta")
+    table.add_column("Hash", style="green")
+    table.add_column("Elapsed (s)", justify="right", style="yellow")
+    for row in rows:
+        table.add_row(os.path.relpath(row["path"]), row["tool"], row["hash"][:12], f"{row['elapsed']:.3f}")
+    Console().print(table)
+
+@cli.command()
+@click.argument('paths', nargs=-1, type=click.Path(exists=True))
+@click.option('--db', default=DEFAULT_DB, help='Segment index database')
+@click.option('--tool', type=click.Choice(['polyglot', 'splitter']), default='polyglot', help='CLI whose results to compare against')
+def changed(paths, db, tool):
+    """
+    Prints the given files that are new or changed since they were last indexed,
+    one per line, so batch runs can process only those.
+    """
+    candidates = {}
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                for name in names:
+                    if name.endswith('.py'):
+                        full = os.path.join(root, name)
+                        candidates[full] = hash_file(full)
+        else:
+            candidates[path] = hash_file(path)
+    with SegmentStore(db) as store:
+        for path in store.changed_files(candidates, tool):
+            click.echo(os.path.relpath(path))
+
+def _count(value):
+    return "-" if value is None else str(int(value))
+
+if __name__ == '__main__':
+    cli()
@@ -1,64 +1,269 @@
 import ast
 import click
 import os
+import shutil
 import sys
+import time
 
 # Ensure src is in path
 sys.path.append(os.getcwd())
 
-from src.analyzer import FeatureAnalyzer
-from src.decision_engine import DecisionEngine
-from src.neural_classifier import NeuralClassifier
-from src.polyglot import PolyglotTranspiler
+from src.parser import SourceSegment
+from src.comfort import ComfortBalancer
+from src.call_graph import CallGraphBuilder
+from src.pipeline import Pipeline
+from src.polyglot import PolyglotTranspiler, SHARED_LIB_LANGS, PYTHON_LANG, uses_shared_memory
+from src.parallel_loops import PARALLEL_MIN_TRIP_COUNT
+from src.native_shim import generate_shim
+from src.scheduling import segment_dependencies, merge_dependencies
+from src.profiler import profile_program, DEFAULT_HOT_THRESHOLD, PROFILE_METRICS
+from src.build_profiles import BUILD_PROFILES, DEFAULT_PROFILE, compile_flags
 from src.visualizer import Visualizer
 from src.html_visualizer import HtmlVisualizer
+from src.segment_store import SegmentStore, SegmentRecord, hash_file, hash_text
 
-def _generate_runner(path, segments):
+def _generate_runner(path, segments, shm_capacity=0, build_profile=DEFAULT_PROFILE, timeout=120, cpu_limit=0,
+                     memory_limit=2048):
     """
-    Generates a Python script that compiles and runs the polyglot segments in order.
+    Generates a Python script that compiles and runs the polyglot segments.
+    Every segment is compiled with the flags of build_profile. Segments start
+    as soon as the segments listed in their 'deps' have finished, so
+    independent ones build and run concurrently; each segment's output is
+    printed as one block when it finishes, and the critical path is reported.
+    Each run gets timeout seconds of wall-clock time, cpu_limit seconds of CPU
+    time (0: timeout times the cores of the machine running it, as threads of
+    one segment add up) and memory_limit MiB of address space; 0 disables a
+    limit, and the runner's options override them.
+    With shm_capacity (bytes), the runner first creates the shared memory region
+    the segments exchange data through.
     """
-    content = """import os
-import subprocess
+    content = """import argparse
+import asyncio
+import math
+import os
+import shlex
+import shutil
+import signal
 import sys
 import time
-import shutil
 
-def run_command(cmd):
-    print(f"[CMD] {cmd}")
+try:
+    import resource
+except ImportError:
+    resource = None # Windows: only the wall-clock timeout applies
+"""
+    content += f"""
+# Per-segment run limits (0 disables); the command line options override them.
+# CPU_LIMIT None: the timeout times the number of cores
+SEGMENT_TIMEOUT = {timeout}
+CPU_LIMIT = {cpu_limit or None}
+MEMORY_LIMIT_MB = {memory_limit}
+BUILD_TIMEOUT = 600
+"""
+    content += """
+# Runtimes that reserve far more address space than they use; they get their
+# own memory options instead of an address-space limit
+RESERVING_RUNTIMES = ("Java", "Go")
+
+def resource_limits(cpu_seconds, memory_mb):
+    \"\"\"A function applying the limits in the child process, between fork and exec.\"\"\"
+    def apply():
+        if cpu_seconds:
+            # SIGXCPU at the soft limit, SIGKILL a second later
+            resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+        if memory_mb:
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return apply
+
+def kill_group(proc):
+    # The command runs in its own process group, so this also stops anything it started
+    try:
+        if os.name == 'nt':
+            proc.kill()
+        else:
+            os.killpg(proc.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+async def run_command(cmd, log, timeout=0, limits=None):
+    \"\"\"Runs cmd and returns its status: 'ok', 'failed', 'skipped', 'timeout' or 'cpu-limit'.\"\"\"
+    # Output is collected in log and printed once the segment is done, so
+    # concurrent segments never interleave
+    log.append(f"[CMD] {cmd}")
     
     # Extract the executable name (first part of command)
     executable = cmd.split()[0]
     if not shutil.which(executable):
-        print(f"[SKIP] Tool '{executable}' not found in PATH. Skipping segment.")
-        return False
+        log.append(f"[SKIP] Tool '{executable}' not found in PATH. Skipping segment.")
+        return 'skipped'
 
+    # shlex.split handles quotes correctly, but on Windows path backslashes can be tricky
+    args = shlex.split(cmd, posix=(os.name != 'nt'))
+    options = {}
+    if os.name != 'nt':
+        options['start_new_session'] = True
+        if limits and resource:
+            options['preexec_fn'] = limits
     try:
-        # Run without shell=True for better compatibility/security on Windows
-        # We need to split the command into args if it's a string
-        if isinstance(cmd, str):
-            import shlex
-            # shlex.split handles quotes correctly, but on Windows path backslashes can be tricky.
-            # Simple split might be enough for our simple commands, but let's use shlex with posix=False for Windows
-            args = shlex.split(cmd, posix=(os.name != 'nt'))
-        else:
-            args = cmd
-            
-        subprocess.check_call(args)
-        return True
-    except subprocess.CalledProcessError:
-        print(f"[ERROR] Failed to run: {cmd}")
-        return False
+        proc = await asyncio.create_subprocess_exec(*args, stdout=asyncio.subprocess.PIPE,
+                                                    stderr=asyncio.subprocess.STDOUT, **options)
     except FileNotFoundError:
-        print(f"[ERROR] Command not found/executable missing.")
-        return False
+        log.append(f"[ERROR] Command not found/executable missing.")
+        return 'failed'
     except PermissionError:
-        print(f"[ERROR] Permission denied. (Do you have the compiler installed/access rights?)")
-        return False
+        log.append(f"[ERROR] Permission denied. (Do you have the compiler installed/access rights?)")
+        return 'failed'
     except OSError as e:
-        print(f"[ERROR] System error: {e}")
-        return False
+        log.append(f"[ERROR] System error: {e}")
+        return 'failed'
+
+    chunks = []
+    async def drain():
+        while True:
+            chunk = await proc.stdout.read(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+    timed_out = False
+    try:
+        await asyncio.wait_for(asyncio.gather(drain(), proc.wait()), timeout or None)
+    except asyncio.TimeoutError:
+        timed_out = True
+        kill_group(proc)
+        await proc.wait()
+    # Whatever the command printed before it stopped
+    log.extend(b"".join(chunks).decode(errors='replace').splitlines())
+    if timed_out:
+        log.append(f"[TIMEOUT] Killed after {timeout}s: {cmd}")
+        return 'timeout'
+    # Only SIGXCPU is the CPU limit; SIGKILL may as well come from the OOM killer or a user
+    if limits and os.name != 'nt' and proc.returncode == -signal.SIGXCPU:
+        log.append(f"[TIMEOUT] CPU time limit exceeded: {cmd}")
+        return 'cpu-limit'
+    if proc.returncode != 0:
+        log.append(f"[ERROR] Failed to run: {cmd} (exit code {proc.returncode})")
+        return 'failed'
+    return 'ok'
+
+def shared_lib_name(filename):
+    # Must match the names native_shim.py loads
+    stem = os.path.splitext(filename)[0]
+    if os.name == 'nt':
+        return stem + '.dll'
+    if sys.platform == 'darwin':
+        return 'lib' + stem + '.dylib'
+    return 'lib' + stem + '.so'
+
+def segment_commands(seg, memory_mb=0):
+    \"\"\"The (build, run) commands of a segment; either may be None.\"\"\"
+    filename = seg['file']
+    lang = seg['lang']
+    flags = seg['flags'] + ' ' if seg['flags'] else ''
+    if seg.get('kind') == 'shared':
+        # Built as a C-ABI library and called in-process through native_shim.py
+        lib_name = shared_lib_name(filename)
+        if lang == "Rust":
+            return f"rustc --crate-type cdylib {flags}{filename} -o {lib_name}", None
+        return f"g++ -shared -fPIC {flags}{filename} -o {lib_name}", None
+    if lang in ("Rust", "C++"):
+        # rustc/g++ filename -o filename.exe && ./filename.exe
+        exe_name = os.path.splitext(filename)[0] + ('.exe' if os.name == 'nt' else '')
+        compiler = "rustc" if lang == "Rust" else "g++"
+        run_cmd = f".{os.sep}{exe_name}" if os.name != 'nt' else exe_name
+        return f"{compiler} {flags}{filename} -o {exe_name}", run_cmd
+    if lang == "Go":
+        return None, f"go run {flags}{filename}"
+    if lang == "Java":
+        # Single-file source-code mode (Java 11+); the transpiler emits 'public class Main'
+        heap = f"-Xmx{memory_mb}m " if memory_mb else ""
+        return None, f"java {heap}{filename}"
+    if lang in ("NumPy", "Python"):
+        # Vectorised or untouched Python: runs with this interpreter, no compiler needed
+        return None, f"{sys.executable} {filename}"
+    return None, None
+
+async def run_segment(i, seg, finished, limit, timings, statuses, options):
+    log = []
+    build_cmd, run_cmd = segment_commands(seg, options.memory_limit)
+    busy = 0.0
+    status = 'ok'
+    if build_cmd is None and run_cmd is None:
+        log.append(f"Unknown language: {seg['lang']}")
+        status = 'skipped'
+    if build_cmd:
+        # Building does not depend on other segments, only running does
+        async with limit:
+            start = time.perf_counter()
+            status = await run_command(build_cmd, log, options.build_timeout)
+            busy += time.perf_counter() - start
+        if status == 'ok' and seg.get('kind') == 'shared':
+            log.append(f"[LIB] {shared_lib_name(seg['file'])} ready; import native_shim to call it.")
+    await asyncio.gather(*(finished[d].wait() for d in seg['deps']))
+    if status == 'ok' and run_cmd:
+        memory_mb = 0 if seg['lang'] in RESERVING_RUNTIMES else options.memory_limit
+        limits = resource_limits(options.cpu_limit, memory_mb) if options.cpu_limit or memory_mb else None
+        async with limit:
+            start = time.perf_counter()
+            status = await run_command(run_cmd, log, options.timeout, limits)
+            busy += time.perf_counter() - start
+    timings[i] = busy
+    statuses[i] = status
+    after = f" after {', '.join(map(str, seg['deps']))}" if seg['deps'] else ""
+    print(f"\\n>>> Segment {i} ({seg['lang']}: {seg['file']}){after} {status} in {busy:.2f}s")
+    for line in log:
+        print(f"[seg {i}] {line}")
+    finished[i].set()
+
+def critical_path(segments, timings):
+    \"\"\"The dependency chain with the largest total time, and that time.\"\"\"
+    longest = {}
+    def chain(i):
+        if i not in longest:
+            chain_time, path = max((chain(d) for d in segments[i]['deps']), default=(0.0, []))
+            longest[i] = (chain_time + timings.get(i, 0.0), path + [i])
+        return longest[i]
+    return max((chain(i) for i in range(len(segments))), default=(0.0, []))
+
+async def run_all(segments, options):
+    finished = [asyncio.Event() for _ in segments]
+    limit = asyncio.Semaphore(max(1, options.jobs))
+    timings, statuses = {}, {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_segment(i, seg, finished, limit, timings, statuses, options)
+                           for i, seg in enumerate(segments)))
+    wall = time.perf_counter() - start
+    path_time, path = critical_path(segments, timings)
+    counts = {}
+    for status in statuses.values():
+        counts[status] = counts.get(status, 0) + 1
+    print(f"\\n[DONE] {len(segments)} segments in {wall:.2f}s "
+          f"({sum(timings.values()):.2f}s if run one after another): "
+          f"{', '.join(f'{n} {status}' for status, n in sorted(counts.items()))}")
+    for i, status in sorted(statuses.items()):
+        if status in ('timeout', 'cpu-limit'):
+            print(f"[TIMED OUT] Segment {i} ({segments[i]['file']}): {status}")
+    print(f"[CRITICAL PATH] {' -> '.join(f'segment {i}' for i in path)} ({path_time:.2f}s)")
 
 def main():
+    parser = argparse.ArgumentParser(description="Builds and runs the polyglot segments")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Commands to run at the same time (1 runs segments one by one)')
+    parser.add_argument('--timeout', type=float, default=SEGMENT_TIMEOUT,
+                        help='Wall-clock seconds a segment may run before its process group is killed (0: no limit)')
+    parser.add_argument('--build-timeout', type=float, default=BUILD_TIMEOUT,
+                        help='Wall-clock seconds a segment may take to build (0: no limit)')
+    parser.add_argument('--cpu-limit', type=int, default=CPU_LIMIT,
+                        help='CPU seconds per segment run, summed over its threads '
+                             '(default: --timeout times the number of cores; 0: no limit)')
+    parser.add_argument('--memory-limit', type=int, default=MEMORY_LIMIT_MB,
+                        help='Address space in MiB per segment run; the Java heap for Java (0: no limit)')
+    options = parser.parse_args()
+    if options.cpu_limit is None:
+        # A segment using every core for the whole timeout stays within the limit
+        options.cpu_limit = math.ceil(options.timeout * (os.cpu_count() or 1))
+
     print("--- Polyglot Execution Runner ---")
     
     # Diagnostic: Check PATH and compilers
@@ -72,60 +277,31 @@ def main():
 
     base_dir = os.path.dirname(os.path.abspath(__file__))
     os.chdir(base_dir)
-    
+"""
+    content += f"""
+    print("[BUILD] Profile: {build_profile}")
+"""
+    if shm_capacity:
+        content += f"""
+    # Shared memory region; segments find it through the environment
+    import polyglot_shm
+    shm_path = os.path.join(base_dir, 'polyglot.shm')
+    polyglot_shm.SharedRegion.create(shm_path, {shm_capacity}).close()
+    os.environ[polyglot_shm.ENV_VAR] = shm_path
+    print(f"[SHM] {{shm_path}} ({shm_capacity >> 20} MiB) shared with all segments")
+"""
+    content += """
     segments = [
 """
     for seg in segments:
-        content += f"        {{'file': '{seg['file']}', 'lang': '{seg['lang']}'}},\n"
+        flags = compile_flags(build_profile, seg['lang'])
+        content += (f"        {{'file': '{seg['file']}', 'lang': '{seg['lang']}', "
+                    f"'kind': '{seg.get('kind', 'executable')}', 'flags': {flags!r}, "
+                    f"'deps': {list(seg.get('deps', []))!r}}},\n")
         
     content += """    ]
 
-    for i, seg in enumerate(segments):
-        filename = seg['file']
-        lang = seg['lang']
-        print(f"\\n>>> Running Segment {i} ({lang}: {filename})")
-        
-        if lang == "Rust":
-            # rustc filename.rs -o filename.exe && ./filename.exe
-            exe_name = filename.replace('.rs', '.exe' if os.name == 'nt' else '')
-            compile_cmd = f"rustc {filename} -o {exe_name}"
-            run_cmd = f".{os.sep}{exe_name}" if os.name != 'nt' else exe_name
-            
-            if run_command(compile_cmd):
-                run_command(run_cmd)
-                
-        elif lang == "C++":
-            # g++ filename.cpp -o filename.exe && ./filename.exe
-            exe_name = filename.replace('.cpp', '.exe' if os.name == 'nt' else '')
-            compile_cmd = f"g++ {filename} -o {exe_name}"
-            run_cmd = f".{os.sep}{exe_name}" if os.name != 'nt' else exe_name
-            
-            if run_command(compile_cmd):
-                run_command(run_cmd)
-
-        elif lang == "Go":
-            # go run filename.go
-            run_command(f"go run {filename}")
-
-        elif lang == "Java":
-            # javac filename.java && java ClassName
-            # Assuming class name is Main or filename dependent. 
-            # My PolyglotTranspiler uses 'public class Main' or similar.
-            # If multiple files have 'class Main', this will clash.
-            # For this mock, let's assume single file compilation or just printing.
-            
-            # Note: The Mock Polyglot output for Java is 'public class Main'.
-            # We need to rename the file to Main.java to compile it properly in Java,
-            # OR we should have generated it as Main.java.
-            # But we have segment_i_Java.java.
-            # Quick hack: Rename temporarily or just try to run single-file source-code mode (Java 11+)
-            
-            run_command(f"java {filename}")
-
-        else:
-            print(f"Unknown language: {lang}")
-            
-        time.sleep(0.5)
+    asyncio.run(run_all(segments, options))
 
 if __name__ == "__main__":
     main()
@@ -135,78 +311,115 @@ if __name__ == "__main__":
 
 @click.command()
 @click.argument('input_file', type=click.Path(exists=True))
-def main(input_file):
+@click.option('--index-db', default=os.path.join('viz', 'segments.db'), help='SQLite segment index to record results in (empty to disable)')
+@click.option('--skip-unchanged', is_flag=True, help='Skip the file if the segment index already has its current contents')
+@click.option('--compiled-models', is_flag=True, help='Use cached TorchScript/int8 models for neural inference')
+@click.option('--build-workers', default=0, help='Group same-language segments into compile units balanced for N parallel build workers (0 = one file per segment)')
+@click.option('--assignment', type=click.Choice(['call-graph', 'independent']), default='call-graph',
+              help='Assign languages for the whole module using the call graph, or per segment')
+@click.option('--shared-libs', is_flag=True,
+              help='Build Rust/C++ functions as shared libraries called in-process via a generated ctypes shim')
+@click.option('--shm-size', default=64, help='Size in MiB of the shared memory region for segments using shm_read/shm_write')
+@click.option('--build-profile', type=click.Choice(list(BUILD_PROFILES)), default=DEFAULT_PROFILE,
+              help='Compiler optimisation profile for the generated native code')
+@click.option('--parallel-threshold', default=PARALLEL_MIN_TRIP_COUNT,
+              help='Minimum trip count for running independent loops on all cores in C++/Rust (0 to disable)')
+@click.option('--call-graph-module', 'call_graph_modules', multiple=True, type=click.Path(exists=True),
+              help='Another module of the program to include in the call graph (repeatable)')
+@click.option('--profile', is_flag=True,
+              help='Run the input under cProfile first and only transpile hot segments; cold ones stay in Python')
+@click.option('--profile-driver', default=None, type=click.Path(exists=True),
+              help='Script to profile instead of running the input itself (implies --profile)')
+@click.option('--profile-metric', type=click.Choice(PROFILE_METRICS), default='self',
+              help='Rank segments by time in their own code or including their callees')
+@click.option('--hot-threshold', default=DEFAULT_HOT_THRESHOLD,
+              help='Share of the profiled run time (0-1) a segment needs to be transpiled')
+@click.option('--profile-timeout', default=300,
+              help='Wall-clock seconds the profiling run may take (0 = no limit)')
+@click.option('--segment-timeout', default=120,
+              help='Wall-clock seconds the runner lets a segment run before killing it (0 = no limit)')
+@click.option('--segment-cpu-limit', default=0,
+              help='CPU seconds per segment run, summed over its threads (0 = --segment-timeout times the cores)')
+@click.option('--segment-memory', default=2048,
+              help='Address space limit in MiB per segment run; the heap size for Java (0 = no limit)')
+def main(input_file, index_db, skip_unchanged, compiled_models, build_workers, assignment, shared_libs, shm_size,
+         build_profile, parallel_threshold, call_graph_modules, profile, profile_driver, profile_metric, hot_threshold,
+         profile_timeout, segment_timeout, segment_cpu_limit, segment_memory):
     """
     Polyglot Transpiler v1.
     
-    Analyzes Python code and splits it into [Rust, C++, Go, Java] based on 
+    Analyzes Python code and splits it into [Rust, C++, Go, Java, NumPy] based on 
     mathematical cost functions and neural network predictions.
     """
+    store = SegmentStore(index_db) if index_db else None
+    file_hash = hash_file(input_file)
+    if store and skip_unchanged and store.is_unchanged(input_file, "polyglot", file_hash):
+        click.echo(f"{input_file} is unchanged since the last indexed run. Skipping.")
+        store.close()
+        return
+
     click.echo(f"Analyzing {input_file}...")
+    run_start = time.perf_counter()
     
     with open(input_file, 'r', encoding='utf-8') as f:
         source_code = f.read()
         
-    # 1. Parse and Split (Naive split by function for this demo)
-    tree = ast.parse(source_code)
-    
-    segments = []
-    
-    # Extract functions and classes as segments
-    for node in tree.body:
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
-            segment_code = ast.get_source_segment(source_code, node)
-            # Determine type label
-            seg_type = "class" if isinstance(node, ast.ClassDef) else "function"
-            segments.append({"ast": node, "code": segment_code, "type": seg_type})
-        # Handle top-level code? For now, ignore or treat as main block.
-        
-    if not segments:
-        click.echo("No functions found. Treating whole file as one segment.")
-        segments.append({"ast": tree, "code": source_code, "type": "module"})
+    # 1. Parse and Split (Naive split by function for this demo), 2. Analyze & Decide
+    module_name = os.path.splitext(os.path.basename(input_file))[0]
+    other_modules = {}
+    for path in call_graph_modules:
+        with open(path, 'r', encoding='utf-8') as f:
+            other_modules[os.path.splitext(os.path.basename(path))[0]] = ast.parse(f.read())
+    pipeline = Pipeline(compiled_models=compiled_models)
+    results = pipeline.analyze(source_code, module_name, other_modules, assignment)
 
-    # 2. Analyze & Decide
-    analyzer = FeatureAnalyzer()
-    decision_engine = DecisionEngine(use_neural_fallback=True)
-    neural_net = NeuralClassifier()
-    
-    results = []
-    
-    for seg in segments:
-        # Extract features
-        features = analyzer.analyze(seg["ast"])
-        
-        # Cost Function Decision
-        decision = decision_engine.decide(features)
-        
-        if decision is None:
-            # Inconclusive -> Neural Net
+    if results[0]["type"] == "module":
+        click.echo("No functions found. Treating whole file as one segment.")
+    for res in results:
+        if res["source"] == "NeuralNet":
             click.secho(f"Cost function inconclusive for segment. Using Neural Network...", fg="yellow")
-            # Vectorize features for NN: [math, io, loops, conditionals, functions, classes, async, recursion, strings]
-            vec = [
-                features.math_ops, features.io_ops, features.loops, 
-                features.conditionals, features.functions, features.classes,
-                features.async_ops, int(features.recursion), features.string_ops
-            ]
-            best_lang, _ = neural_net.predict(vec)
-            score = 0.0 # NN doesn't return cost score same way
-            source = "NeuralNet"
+        if "moved_from" in res:
+            click.secho(f"Call graph moved '{res['name']}' from {res['moved_from']} to {res['lang']} "
+                        f"to avoid boundary crossings.", fg="yellow")
+
+    if profile or profile_driver:
+        # Transpiling code that barely runs only adds compile time and FFI calls
+        click.echo(f"Profiling {profile_driver or input_file}...")
+        try:
+            program_profile = profile_program(input_file, profile_driver, timeout=profile_timeout or None)
+        except (RuntimeError, OSError) as e:
+            click.secho(f"Profiling failed, transpiling every segment: {e}", fg="yellow")
         else:
-            best_lang, scores_map = decision
-            score = scores_map[best_lang]
-            source = "CostFunction"
-            
+            cold = 0
+            for res in results:
+                # Profiles report a decorated function at its first decorator
+                first_line = min([d.lineno for d in getattr(res["ast"], "decorator_list", [])] + [res["start_line"]])
+                res["hot_share"] = program_profile.share(first_line, res["end_line"], profile_metric)
+                if res["hot_share"] < hot_threshold:
+                    res["lang"], res["score"], res["source"] = PYTHON_LANG, 0.0, "Profile"
+                    cold += 1
+            click.echo(f"{cold} of {len(results)} segments spent under {hot_threshold:.0%} of the run "
+                       f"({profile_metric} time) and stay in Python.")
+
+    def is_shared(lang, nodes):
+        # Only plain functions have a C signature to export
+        return shared_libs and lang in SHARED_LIB_LANGS and all(isinstance(n, ast.FunctionDef) for n in nodes)
+
+    for res in results:
         # Transpile
-        transpiled_code = PolyglotTranspiler.transpile(seg["code"], best_lang)
-        
-        results.append({
-            "features": features,
-            "lang": best_lang,
-            "score": score,
-            "source": source,
-            "original": seg["code"],
-            "transpiled": transpiled_code
-        })
+        transpile_start = time.perf_counter()
+        if is_shared(res["lang"], [res["ast"]]):
+            res["transpiled"], res["exports"] = PolyglotTranspiler.transpile_shared(res["original"], res["lang"],
+                                                                                     parallel_threshold)
+            res["kind"] = "shared"
+        else:
+            res["transpiled"] = PolyglotTranspiler.transpile(res["original"], res["lang"], parallel_threshold)
+            res["kind"] = "executable"
+        res["elapsed"] += time.perf_counter() - transpile_start
+
+    # Run-order constraints between segments; the runner starts everything else concurrently
+    dependencies = segment_dependencies(
+        results, CallGraphBuilder().build({res["name"]: res["ast"] for res in results if res["name"]}))
 
     # 3. Output Code
     # Ensure output directory exists
@@ -215,9 +428,40 @@ def main(input_file):
         os.makedirs(output_dir)
 
     segment_files = []
+    libraries = []
+
+    if build_workers > 0:
+        # Group same-language segments into compile units whose estimated build
+        # times are balanced across the parallel build workers
+        balancer = ComfortBalancer(mode="compile_cost", workers=build_workers)
+        units = balancer.partition_compile_units([
+            SourceSegment(id=f"seg_{i}", start_line=res["start_line"], end_line=res["end_line"],
+                          tags=[f"lang:{res['lang']}"], complexity_score=res["complexity"],
+                          text=res["original"])
+            for i, res in enumerate(results)
+        ])
+        outputs = []
+        unit_of = {}
+        for u, unit in enumerate(units):
+            code = "\n\n".join(s.code for s in unit.segments)
+            members = [results[int(s.id.split("_")[1])] for s in unit.segments]
+            unit_of.update({int(s.id.split("_")[1]): u for s in unit.segments})
+            if is_shared(unit.language, [m["ast"] for m in members]):
+                transpiled, exports = PolyglotTranspiler.transpile_shared(code, unit.language, parallel_threshold)
+                outputs.append({"lang": unit.language, "transpiled": transpiled, "kind": "shared",
+                                "exports": exports, "original": code})
+            else:
+                outputs.append({"lang": unit.language, "kind": "executable",
+                                "transpiled": PolyglotTranspiler.transpile(code, unit.language, parallel_threshold)})
+        click.echo(f"Grouped {len(results)} segments into {len(units)} compile units "
+                   f"(estimated build makespan {max(u.cost for u in units):.2f}s on {build_workers} workers).")
+        output_deps = merge_dependencies(dependencies, unit_of)
+    else:
+        outputs = results
+        output_deps = dict(enumerate(dependencies))
 
-    for i, res in enumerate(results):
-        ext_map = {"Rust": "rs", "C++": "cpp", "Go": "go", "Java": "java"}
+    for i, res in enumerate(outputs):
+        ext_map = {"Rust": "rs", "C++": "cpp", "Go": "go", "Java": "java", "NumPy": "py", PYTHON_LANG: "py"}
         ext = ext_map.get(res['lang'], "txt")
         # C++ file extension should be .cpp, output filename segment_1_Cpp.cpp to correspond with runner expectation
         lang_label = res['lang']
@@ -232,15 +476,52 @@ def main(input_file):
             
         segment_files.append({
             "file": filename,
-            "lang": res['lang']
+            "lang": res['lang'],
+            "kind": res['kind'],
+            "deps": output_deps[i]
         })
+        if res['kind'] == "shared":
+            libraries.append({"stem": os.path.splitext(filename)[0], "exports": res["exports"],
+                              "fallback": res["original"]})
     
     click.echo(f"Transpiled segments written to '{output_dir}/' directory.")
+
+    if libraries:
+        shim_path = os.path.join(output_dir, "native_shim.py")
+        generate_shim(shim_path, libraries)
+        click.echo(f"ctypes shim for {len(libraries)} shared libraries generated at '{shim_path}'.")
     
+    shm_capacity = 0
+    if any(uses_shared_memory(res["ast"]) for res in results):
+        # The runner and Python code use the same module to create/access the region
+        shutil.copy(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "shared_memory.py"),
+                    os.path.join(output_dir, "polyglot_shm.py"))
+        shm_capacity = shm_size * 1024 * 1024
+
     # Generate Runner Script
     runner_path = os.path.join(output_dir, "runner.py")
-    _generate_runner(runner_path, segment_files)
-    click.echo(f"Runner script generated at '{runner_path}'.")
+    _generate_runner(runner_path, segment_files, shm_capacity, build_profile, segment_timeout, segment_cpu_limit,
+                     segment_memory)
+    click.echo(f"Runner script generated at '{runner_path}' (build profile: {build_profile}).")
+
+    if store:
+        store.record_file(input_file, "polyglot", file_hash, [
+            SegmentRecord(
+                segment_id=f"seg_{i}",
+                start_line=res["start_line"],
+                end_line=res["end_line"],
+                code_hash=hash_text(res["original"]),
+                complexity=res["complexity"],
+                features=res["features"],
+                lang=res["lang"],
+                score=res["score"],
+                decision_source=res["source"],
+                elapsed=res["elapsed"],
+                build_profile=build_profile
+            ) for i, res in enumerate(results)
+        ], elapsed=time.perf_counter() - run_start)
+        store.close()
+        click.echo(f"Segment index updated: {index_db}")
 
     # 4. Visualize
     # Terminal Summary
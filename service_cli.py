@@ -0,0 +1,119 @@
+import click
+import json
+import os
+import sys
+import time
+
+# Add current directory to path to ensure imports work
+sys.path.append(os.getcwd())
+
+# Only the client is imported up front: client commands must not load torch
+from src.service_client import ServiceClient, DEFAULT_SOCKET
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _module(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+def _request(ctx, op, **params):
+    try:
+        with ServiceClient(ctx.obj["socket"], ctx.obj["port"] or None) as client:
+            return client.request(op, **params)
+    except (OSError, RuntimeError) as e:
+        raise click.ClickException(f"{op} failed: {e}")
+
+@click.group()
+@click.option('--socket', 'socket_path', default=DEFAULT_SOCKET, help='Unix domain socket of the service')
+@click.option('--port', default=0, help='Use localhost TCP on this port instead of the Unix socket')
+@click.pass_context
+def cli(ctx, socket_path, port):
+    """
+    Runs the long-running transpile service, or sends it requests.
+
+    The service keeps the analysis pipeline and neural models loaded, so each
+    request costs milliseconds instead of a full main.py start-up.
+    """
+    ctx.obj = {"socket": socket_path, "port": port}
+
+@cli.command()
+@click.option('--compiled-models', is_flag=True, help='Use cached TorchScript/int8 models for neural inference')
+@click.pass_context
+def serve(ctx, compiled_models):
+    """Starts the service in the foreground; stop it with `stop` or Ctrl+C."""
+    start = time.perf_counter()
+    from src.service import TranspileService, make_server, serve as serve_forever
+    service = TranspileService(compiled_models=compiled_models)
+    try:
+        server = make_server(service, ctx.obj["socket"], ctx.obj["port"] or None)
+    except (OSError, RuntimeError) as e:
+        raise click.ClickException(str(e))
+    where = f"127.0.0.1:{ctx.obj['port']}" if ctx.obj["port"] else ctx.obj["socket"]
+    click.echo(f"Transpile service ready on {where} (warm-up {time.perf_counter() - start:.2f}s).")
+    serve_forever(server)
+    click.echo(f"Transpile service stopped after {service.requests} requests.")
+
+@cli.command()
+@click.pass_context
+def ping(ctx):
+    """Checks that the service is up and reports the round-trip time."""
+    start = time.perf_counter()
+    result = _request(ctx, "ping")
+    click.echo(f"Service pid {result['pid']} up {result['uptime']:.0f}s, {result['requests']} requests "
+               f"(round trip {(time.perf_counter() - start) * 1000:.1f} ms)")
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.pass_context
+def analyze(ctx, input_file):
+    """Prints the features of every segment of INPUT_FILE as JSON."""
+    click.echo(json.dumps(_request(ctx, "analyze", code=_read(input_file), module=_module(input_file)), indent=2))
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.option('--assignment', type=click.Choice(['call-graph', 'independent']), default='call-graph',
+              help='Assign languages per segment, or for the whole module along the call graph')
+@click.pass_context
+def decide(ctx, input_file, assignment):
+    """Prints the language chosen for every segment of INPUT_FILE."""
+    segments = _request(ctx, "decide", code=_read(input_file), module=_module(input_file), assignment=assignment)
+    for seg in segments:
+        click.echo(f"{seg['name'] or '<module>'} (lines {seg['start_line']}-{seg['end_line']}): "
+                   f"{seg['lang']} [{seg['source']}, score {seg['score']:.2f}]")
+
+@cli.command()
+@click.argument('input_file', type=click.Path(exists=True))
+@click.option('--lang', default=None, help='Target language for the whole file (default: decided per segment)')
+@click.option('--parallel-threshold', default=None, type=int,
+              help='Minimum trip count for running independent loops on all cores in C++/Rust')
+@click.option('--output', '-o', default=None, help='File to write the transpiled code to (default: stdout)')
+@click.pass_context
+def transpile(ctx, input_file, lang, parallel_threshold, output):
+    """Transpiles INPUT_FILE through the service."""
+    params = {"code": _read(input_file), "module": _module(input_file)}
+    if lang:
+        params["lang"] = lang
+    if parallel_threshold is not None:
+        params["parallel_threshold"] = parallel_threshold
+    result = _request(ctx, "transpile", **params)
+    if lang:
+        text = result["code"]
+    else:
+        text = "\n\n".join(f"// --- {seg['name'] or '<module>'}: {seg['lang']} ---\n{seg['code']}" for seg in result)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        click.echo(f"Transpiled code written to {output}")
+    else:
+        click.echo(text)
+
+@cli.command()
+@click.pass_context
+def stop(ctx):
+    """Asks the service to shut down."""
+    result = _request(ctx, "shutdown")
+    click.echo(f"Transpile service stopping after {result['requests']} requests.")
+
+if __name__ == '__main__':
+    cli()
@@ -1,6 +1,48 @@
 import ast
+import math
+import operator
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, List, Optional
+
+# Iterations assumed for loops whose trip count is not a compile-time constant
+SYMBOLIC_TRIP_COUNT = 100.0
+
+# Times a recursive function is assumed to run per outside call
+RECURSION_FACTOR = 100.0
+
+_CONSTANT_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+                 ast.FloorDiv: operator.floordiv, ast.Pow: operator.pow}
+
+def constant_int(node) -> Optional[int]:
+    """The value of an int expression built from literals (e.g. 10**6), or None."""
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return node.value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = constant_int(node.operand)
+        return None if value is None else -value
+    if isinstance(node, ast.BinOp) and type(node.op) in _CONSTANT_OPS:
+        left, right = constant_int(node.left), constant_int(node.right)
+        if left is None or right is None or (isinstance(node.op, ast.Pow) and not 0 <= right <= 64) \
+                or (isinstance(node.op, ast.FloorDiv) and right == 0):
+            return None
+        return _CONSTANT_OPS[type(node.op)](left, right)
+    return None
+
+def trip_count(loop) -> Optional[int]:
+    """Iterations of `for ... in range(...)` (or a literal sequence) when its bounds are constants."""
+    iterable = loop.iter if isinstance(loop, (ast.For, ast.AsyncFor, ast.comprehension)) else None
+    if isinstance(iterable, (ast.List, ast.Tuple, ast.Set)):
+        return len(iterable.elts)
+    if not (isinstance(iterable, ast.Call) and isinstance(iterable.func, ast.Name) and iterable.func.id == "range"
+            and 1 <= len(iterable.args) <= 3):
+        return None
+    bounds = [constant_int(a) for a in iterable.args]
+    if None in bounds:
+        return None
+    start, stop, step = (0, bounds[0], 1) if len(bounds) == 1 else (bounds + [1])[:3]
+    if step == 0:
+        return None
+    return max(0, math.ceil((stop - start) / step))
 
 @dataclass
 class CodeFeatures:
@@ -13,24 +55,83 @@ class CodeFeatures:
     async_ops: int = 0
     recursion: bool = False
     string_ops: int = 0
+    # Deepest nesting of loops and comprehensions
+    max_loop_depth: int = 0
+    # Loops whose trip count depends on runtime values
+    symbolic_loops: int = 0
+    # Operations weighted by how many times they are expected to execute
+    estimated_ops: float = 0.0
+    # Module-wide call graph facts (see CallGraphIndex.annotate)
+    call_depth: int = 0
+    fan_in: int = 0
+    # Expected calls per program run
+    hotness: float = 1.0
+    # Arithmetic the NumPy target turns into array expressions (see PolyglotTranspiler.vector_ops)
+    vector_ops: int = 0
 
 class FeatureAnalyzer(ast.NodeVisitor):
     """
     Walks the AST of a code segment to extract features 
     that influence performance in different languages.
+
+    Besides syntax counts it estimates the work a segment does: every
+    operation is weighted by the product of the trip counts of its enclosing
+    loops. Trip counts come from constant range() bounds; other loops are
+    assumed to run symbolic_trip_count times, and recursive functions
+    recursion_factor times.
     """
-    def __init__(self):
+    def __init__(self, symbolic_trip_count: float = SYMBOLIC_TRIP_COUNT,
+                 recursion_factor: float = RECURSION_FACTOR):
         self.features = CodeFeatures()
         self.current_func_name = None
+        self.symbolic_trip_count = symbolic_trip_count
+        self.recursion_factor = recursion_factor
+        # Expected executions of the code being visited
+        self.multipliers: List[float] = [1.0]
+        self.loop_depth = 0
 
     def analyze(self, tree: ast.AST) -> CodeFeatures:
         self.features = CodeFeatures()
+        self.multipliers = [1.0]
+        self.loop_depth = 0
         self.visit(tree)
         return self.features
 
+    def _count_op(self):
+        self.features.estimated_ops += self.multipliers[-1]
+
+    def _visit_repeated(self, nodes: List[ast.AST], executions: float, depth: int):
+        """Visits nodes that run `executions` times per run of the enclosing code, `depth` loops deeper."""
+        self.multipliers.append(self.multipliers[-1] * executions)
+        self.loop_depth += depth
+        self.features.max_loop_depth = max(self.features.max_loop_depth, self.loop_depth)
+        for child in nodes:
+            self.visit(child)
+        self.loop_depth -= depth
+        self.multipliers.pop()
+
+    def _trips(self, count: Optional[int]) -> float:
+        if count is None:
+            self.features.symbolic_loops += 1
+            return self.symbolic_trip_count
+        return float(count)
+
     def visit_BinOp(self, node):
         # Arithmetic operations
         self.features.math_ops += 1
+        self._count_op()
+        self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        self._count_op()
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        self._count_op()
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node):
+        self._count_op()
         self.generic_visit(node)
 
     def visit_Call(self, node):
@@ -50,15 +151,41 @@ class FeatureAnalyzer(ast.NodeVisitor):
         if self.current_func_name and name == self.current_func_name:
             self.features.recursion = True
             
+        self._count_op()
         self.generic_visit(node)
 
     def visit_For(self, node):
         self.features.loops += 1
-        self.generic_visit(node)
+        # The iterable is evaluated once, outside the loop's own iterations
+        self.visit(node.iter)
+        self._visit_repeated(node.body, self._trips(trip_count(node)), 1)
+        for stmt in node.orelse:
+            self.visit(stmt)
+
+    visit_AsyncFor = visit_For
 
     def visit_While(self, node):
         self.features.loops += 1
-        self.generic_visit(node)
+        self._visit_repeated([node.test] + node.body, self._trips(None), 1)
+        for stmt in node.orelse:
+            self.visit(stmt)
+
+    def _visit_comprehension(self, node):
+        # Each generator nests inside the previous one: its iterable is evaluated once per
+        # iteration of the generators before it, its conditions once per item it yields,
+        # and the element runs in the innermost
+        trips = 1.0
+        for depth, gen in enumerate(node.generators):
+            self._visit_repeated([gen.target, gen.iter], trips, depth)
+            trips *= self._trips(trip_count(gen))
+            self._visit_repeated(gen.ifs, trips, depth + 1)
+        parts = [getattr(node, attr) for attr in ("elt", "key", "value") if hasattr(node, attr)]
+        self._visit_repeated(parts, trips, len(node.generators))
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
 
     def visit_If(self, node):
         self.features.conditionals += 1
@@ -70,7 +197,11 @@ class FeatureAnalyzer(ast.NodeVisitor):
 
     def visit_FunctionDef(self, node):
         self.current_func_name = node.name
-        self.generic_visit(node)
+        recursive = any(isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id == node.name
+                        for n in ast.walk(node))
+        for child in node.decorator_list + [node.args] + ([node.returns] if node.returns else []):
+            self.visit(child)
+        self._visit_repeated(node.body, self.recursion_factor if recursive else 1.0, 0)
         self.current_func_name = None
 
     def visit_ClassDef(self, node):
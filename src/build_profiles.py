@@ -0,0 +1,44 @@
+from typing import Dict
+
+# Compiler flags per build profile and language. Go and Java have no ahead-of-time
+# optimisation levels worth exposing (gc always optimises, Java relies on the JIT),
+# so only the debug profile changes their builds. NumPy segments are not compiled.
+# C++ always links OpenMP for the loops PolyglotTranspiler parallelises.
+BUILD_PROFILES: Dict[str, Dict[str, str]] = {
+    "debug": {
+        "Rust": "-C opt-level=0 -g",
+        "C++": "-O0 -g -fopenmp",
+        "Go": "-gcflags=all='-N -l'",
+        "Java": "",
+        "NumPy": "",
+    },
+    "release": {
+        "Rust": "-C opt-level=3",
+        "C++": "-O2 -fopenmp",
+        "Go": "",
+        "Java": "",
+        "NumPy": "",
+    },
+    "native": {
+        "Rust": "-C opt-level=3 -C target-cpu=native",
+        "C++": "-O3 -march=native -fopenmp",
+        "Go": "",
+        "Java": "",
+        "NumPy": "",
+    },
+    "lto": {
+        "Rust": "-C opt-level=3 -C target-cpu=native -C lto=fat -C codegen-units=1",
+        "C++": "-O3 -march=native -flto -fopenmp",
+        "Go": "",
+        "Java": "",
+        "NumPy": "",
+    },
+}
+
+DEFAULT_PROFILE = "release"
+
+def compile_flags(profile: str, lang: str) -> str:
+    """Returns the compiler flags a segment in lang is built with under profile."""
+    if profile not in BUILD_PROFILES:
+        raise ValueError(f"Unknown build profile: {profile}")
+    return BUILD_PROFILES[profile].get(lang, "")
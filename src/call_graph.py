@@ -0,0 +1,279 @@
+import ast
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+import networkx as nx
+
+from src.analyzer import CodeFeatures, RECURSION_FACTOR, trip_count
+
+# Pseudo-function holding a module's top-level statements
+ENTRY = "<module>"
+
+class CallGraphBuilder(ast.NodeVisitor):
+    """
+    Builds a call graph between the top-level definitions of a module.
+
+    Nodes are definition names (functions and classes); an edge caller ->
+    callee carries `weight`, the estimated number of calls per invocation of
+    the caller. Calls nested in loops run once per iteration: loops over
+    constant ranges use their trip count, others are assumed to run
+    `loop_factor` times.
+    """
+    def __init__(self, loop_factor: float = 10.0):
+        self.loop_factor = loop_factor
+        self.graph = nx.DiGraph()
+        self.methods: Dict[str, str] = {}
+        self.current: Optional[str] = None
+        self.frequency = 1.0
+
+    def build(self, definitions: Dict[str, ast.AST]) -> nx.DiGraph:
+        self.graph = nx.DiGraph()
+        self.graph.add_nodes_from(definitions)
+        # Method name -> owning class, so obj.method() calls resolve to the class segment
+        self.methods = {}
+        for name, node in definitions.items():
+            if isinstance(node, ast.ClassDef):
+                for child in node.body:
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)) and not child.name.startswith("__"):
+                        self.methods.setdefault(child.name, name)
+        for name, node in definitions.items():
+            self.current = name
+            self.frequency = 1.0
+            self.visit(node)
+        self.current = None
+        return self.graph
+
+    def _add_call(self, callee: str):
+        if callee == self.current or callee not in self.graph:
+            return
+        self._add_edge(callee)
+
+    def _add_edge(self, callee: str):
+        if self.graph.has_edge(self.current, callee):
+            self.graph[self.current][callee]["weight"] += self.frequency
+        else:
+            self.graph.add_edge(self.current, callee, weight=self.frequency)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            self._add_call(node.func.id)
+        elif isinstance(node.func, ast.Attribute):
+            owner = self.methods.get(node.func.attr)
+            if owner:
+                self._add_call(owner)
+        self.generic_visit(node)
+
+    def _trips(self, loop) -> float:
+        count = trip_count(loop)
+        return self.loop_factor if count is None else float(count)
+
+    def _visit_repeated(self, nodes, times: float):
+        outer = self.frequency
+        self.frequency *= times
+        for node in nodes:
+            self.visit(node)
+        self.frequency = outer
+
+    def visit_For(self, node):
+        # The iterable is evaluated once; the body once per iteration
+        self.visit(node.iter)
+        self._visit_repeated([node.target] + node.body, self._trips(node))
+        self._visit_repeated(node.orelse, 1.0)
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        self._visit_repeated([node.test] + node.body, self.loop_factor)
+        self._visit_repeated(node.orelse, 1.0)
+
+    def _visit_comprehension(self, node):
+        times = 1.0
+        for generator in node.generators:
+            times *= self._trips(generator)
+        outer = self.frequency
+        self.frequency *= times
+        self.generic_visit(node)
+        self.frequency = outer
+
+    visit_ListComp = _visit_comprehension
+    visit_SetComp = _visit_comprehension
+    visit_DictComp = _visit_comprehension
+    visit_GeneratorExp = _visit_comprehension
+
+@dataclass
+class CallInfo:
+    """Interprocedural facts about one function (or the functions of one segment)."""
+    # In a call cycle, direct or mutual
+    recursive: bool = False
+    # Only reachable through a cycle of several functions
+    mutual: bool = False
+    # Longest chain of function calls leading here from an entry point
+    call_depth: int = 0
+    # Distinct callers, top-level code included
+    fan_in: int = 0
+    # Expected calls per program run from outside the function's cycle
+    hotness: float = 1.0
+
+class CallGraphIndex(CallGraphBuilder):
+    """
+    Function-level call graph over one or more modules. It is built once,
+    before any segment is analysed, so segment features can see calls that
+    cross segment and module boundaries.
+
+    Nodes are qualified names (`module.func`, `module.Class.method`, and
+    `module.<module>` for top-level statements); edges carry calls per
+    invocation of the caller, estimated as in CallGraphBuilder. Calls are
+    resolved through local definitions, `import m` / `from m import f` of
+    indexed modules, `self.method()`, and method names as CallGraphBuilder
+    does. From the strongly connected components of the graph it derives a
+    CallInfo per function; hotness flows from callers to callees in
+    topological order, and every call entering a cycle is assumed to repeat
+    recursion_factor times inside it.
+    """
+    def __init__(self, loop_factor: float = 10.0, recursion_factor: float = RECURSION_FACTOR):
+        super().__init__(loop_factor)
+        self.recursion_factor = recursion_factor
+        self.info: Dict[str, CallInfo] = {}
+        self.classes: Set[str] = set()
+        # Per module being visited: local name -> qualified name, and module aliases
+        self.scope: Dict[str, str] = {}
+        self.module_aliases: Dict[str, str] = {}
+        self.current_class: Optional[str] = None
+
+    def index(self, modules: Dict[str, ast.Module]) -> Dict[str, CallInfo]:
+        self.graph = nx.DiGraph()
+        self.methods, self.classes = {}, set()
+        for module, tree in modules.items():
+            self.graph.add_node(f"{module}.{ENTRY}")
+            for node in tree.body:
+                if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    self.graph.add_node(f"{module}.{node.name}")
+                elif isinstance(node, ast.ClassDef):
+                    self.classes.add(f"{module}.{node.name}")
+                    for child in node.body:
+                        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                            qualified = f"{module}.{node.name}.{child.name}"
+                            self.graph.add_node(qualified)
+                            if not child.name.startswith("__"):
+                                self.methods.setdefault(child.name, qualified)
+        for module, tree in modules.items():
+            self._visit_module(module, tree, modules)
+        self.current, self.current_class = None, None
+        self.info = self._summarise()
+        return self.info
+
+    def _visit_module(self, module: str, tree: ast.Module, modules: Dict[str, ast.Module]):
+        self.scope = {node.name: f"{module}.{node.name}" for node in tree.body
+                      if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))}
+        self.module_aliases = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.name in modules:
+                        self.module_aliases[alias.asname or alias.name] = alias.name
+            elif isinstance(node, ast.ImportFrom) and node.module:
+                source = node.module if node.module in modules else node.module.split(".")[-1]
+                if source in modules:
+                    for alias in node.names:
+                        self.scope[alias.asname or alias.name] = f"{source}.{alias.name}"
+        entry = f"{module}.{ENTRY}"
+        for node in tree.body:
+            self.frequency = 1.0
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self.current, self.current_class = f"{module}.{node.name}", None
+                self.generic_visit(node)
+            elif isinstance(node, ast.ClassDef):
+                self.current_class = f"{module}.{node.name}"
+                for child in node.body:
+                    self.frequency = 1.0
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        self.current = f"{self.current_class}.{child.name}"
+                        self.generic_visit(child)
+                    else:
+                        # Class bodies run at import time
+                        self.current = entry
+                        self.visit(child)
+                self.current_class = None
+            else:
+                self.current, self.current_class = entry, None
+                self.visit(node)
+
+    def _resolve(self, func: ast.AST) -> Optional[str]:
+        target = None
+        if isinstance(func, ast.Name):
+            target = self.scope.get(func.id)
+        elif isinstance(func, ast.Attribute):
+            owner = func.value.id if isinstance(func.value, ast.Name) else None
+            if owner in self.module_aliases:
+                target = f"{self.module_aliases[owner]}.{func.attr}"
+            elif owner in ("self", "cls") and self.current_class:
+                target = f"{self.current_class}.{func.attr}"
+            else:
+                target = self.methods.get(func.attr)
+        if target in self.classes:
+            # Instantiating a class runs its constructor
+            target = f"{target}.__init__"
+        return target if target in self.graph else None
+
+    def visit_Call(self, node):
+        callee = self._resolve(node.func)
+        if callee:
+            self._add_edge(callee)
+        self.generic_visit(node)
+
+    def _summarise(self) -> Dict[str, CallInfo]:
+        condensed = nx.condensation(self.graph)
+        # Calls per run of each component's members, recursion included
+        invocations: Dict[int, float] = {}
+        depths: Dict[int, int] = {}
+        info: Dict[str, CallInfo] = {}
+        for component in nx.topological_sort(condensed):
+            members = condensed.nodes[component]["members"]
+            entry = any(name.endswith(f".{ENTRY}") for name in members)
+            recursive = len(members) > 1 or any(self.graph.has_edge(n, n) for n in members)
+            callers = list(condensed.predecessors(component))
+            external = sum(invocations[caller] * self.graph[source][target]["weight"]
+                           for caller in callers for source in condensed.nodes[caller]["members"]
+                           for target in members if self.graph.has_edge(source, target)) if callers else 1.0
+            # Top-level code sits one level above the functions it calls
+            depths[component] = -1 if entry else max((depths[c] + 1 for c in callers), default=0)
+            invocations[component] = external * (self.recursion_factor if recursive else 1.0)
+            if entry:
+                continue
+            for name in members:
+                info[name] = CallInfo(recursive=recursive, mutual=len(members) > 1, call_depth=depths[component],
+                                      fan_in=len(set(self.graph.predecessors(name)) - {name}), hotness=external)
+        return info
+
+    def segment_info(self, module: str, node: ast.AST) -> CallInfo:
+        """Combined CallInfo of the functions a segment defines; fan-in only counts callers outside it."""
+        if isinstance(node, ast.Module):
+            prefix = f"{module}."
+        elif isinstance(node, ast.ClassDef):
+            prefix = f"{module}.{node.name}."
+        else:
+            prefix = None
+        names: List[str] = ([name for name in self.info if name.startswith(prefix)] if prefix
+                            else [f"{module}.{node.name}"] if f"{module}.{node.name}" in self.info else [])
+        combined = CallInfo()
+        if not names:
+            return combined
+        callers = {caller for name in names for caller in self.graph.predecessors(name)} - set(names)
+        combined.recursive = any(self.info[name].recursive for name in names)
+        combined.mutual = any(self.info[name].mutual for name in names)
+        combined.call_depth = max(self.info[name].call_depth for name in names)
+        combined.fan_in = len(callers)
+        combined.hotness = max(self.info[name].hotness for name in names)
+        return combined
+
+    def annotate(self, features: CodeFeatures, module: str, node: ast.AST) -> CodeFeatures:
+        """Adds a segment's interprocedural facts to the features analysed from the segment alone."""
+        info = self.segment_info(module, node)
+        features.call_depth = info.call_depth
+        features.fan_in = info.fan_in
+        features.hotness = info.hotness
+        if info.mutual and not features.recursion:
+            # The segment's own analysis only sees direct recursion
+            features.estimated_ops *= self.recursion_factor
+        features.recursion = features.recursion or info.recursive
+        return features
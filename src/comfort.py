@@ -1,21 +1,134 @@
-from typing import List
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from src.parser import SourceSegment
 
+# Rough native build cost model in seconds: a fixed per-invocation overhead
+# (toolchain start-up, headers/std) plus costs per line and per AST node.
+COMPILE_COSTS = {
+    "Rust": {"overhead": 0.40, "per_line": 0.004, "per_node": 0.0008},
+    "C++": {"overhead": 0.45, "per_line": 0.003, "per_node": 0.0006},
+    "Go": {"overhead": 0.25, "per_line": 0.001, "per_node": 0.0002},
+    "Java": {"overhead": 0.50, "per_line": 0.002, "per_node": 0.0003},
+    # Interpreted: only the NumPy import at start-up
+    "NumPy": {"overhead": 0.10, "per_line": 0.0, "per_node": 0.0},
+    # Left as the original Python: nothing to build
+    "Python": {"overhead": 0.0, "per_line": 0.0, "per_node": 0.0},
+    "default": {"overhead": 0.30, "per_line": 0.002, "per_node": 0.0004},
+}
+
+def segment_language(segment: SourceSegment) -> str:
+    """Language recorded in a 'lang:<name>' tag, or 'default'."""
+    for tag in segment.tags:
+        if tag.startswith("lang:"):
+            return tag[5:]
+    return "default"
+
+@dataclass
+class CompileUnit:
+    """Same-language segments built together by one compiler invocation."""
+    language: str
+    segments: List[SourceSegment] = field(default_factory=list)
+    cost: float = 0.0
+
 class ComfortBalancer:
     """
     Balances segment sizes to ensure they are 'comfortable' to read.
     Attempts to merge small segments and ensure no segment is too massive
     (though splitting is primarily handled by strategies).
+
+    In "compile_cost" mode segments are instead grouped into same-language
+    compile units so that parallel builds on `workers` workers finish at
+    about the same time. A unit's members need not be adjacent, so they are
+    yielded unmerged, each with its own line range, tagged with their unit.
     """
-    def __init__(self, min_lines: int = 5, max_lines: int = 50):
+    def __init__(self, min_lines: int = 5, max_lines: int = 50, mode: str = "comfort",
+                 workers: int = 4, language_of: Optional[Callable[[SourceSegment], str]] = None):
+        if mode not in ("comfort", "compile_cost"):
+            raise ValueError(f"Unknown balancing mode: {mode}")
         self.min_lines = min_lines
         self.max_lines = max_lines
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.language_of = language_of or segment_language
+
+    def balance(self, segments: Iterable[SourceSegment]) -> List[SourceSegment]:
+        return list(self.balance_stream(segments))
 
-    def balance(self, segments: List[SourceSegment]) -> List[SourceSegment]:
-        if not segments:
+    def estimate_compile_cost(self, segment: SourceSegment, language: str) -> float:
+        """Estimated build time of the segment's body, excluding per-unit overhead."""
+        costs = COMPILE_COSTS.get(language, COMPILE_COSTS["default"])
+        return segment.line_count * costs["per_line"] + segment.complexity_score * costs["per_node"]
+
+    def partition_compile_units(self, segments: Iterable[SourceSegment]) -> List[CompileUnit]:
+        """
+        Groups segments into same-language compile units minimising the build
+        makespan on self.workers workers.
+
+        Within a language, units are contiguous runs in source order and cost
+        overhead + sum(body costs). For a makespan bound T the fewest units per
+        language is found greedily, which is exact for contiguous partitions, and
+        the count only shrinks as T grows, so a binary search on T yields the
+        smallest makespan that needs no more units than there are workers.
+        """
+        groups: Dict[str, List[SourceSegment]] = {}
+        for seg in segments:
+            groups.setdefault(self.language_of(seg), []).append(seg)
+        if not groups:
             return []
-            
-        balanced = []
+
+        bodies = {lang: [self.estimate_compile_cost(s, lang) for s in segs] for lang, segs in groups.items()}
+        overheads = {lang: COMPILE_COSTS.get(lang, COMPILE_COSTS["default"])["overhead"] for lang in groups}
+        # Every language needs at least one unit, even with fewer workers
+        max_units = max(self.workers, len(groups))
+
+        def greedy(lang: str, bound: float) -> List[List[int]]:
+            units, current, load = [], [], overheads[lang]
+            for i, cost in enumerate(bodies[lang]):
+                if current and load + cost > bound:
+                    units.append(current)
+                    current, load = [], overheads[lang]
+                current.append(i)
+                load += cost
+            units.append(current)
+            return units
+
+        lo = max(overheads[lang] + max(bodies[lang]) for lang in groups)
+        hi = max(lo, sum(overheads[lang] + sum(bodies[lang]) for lang in groups))
+        for _ in range(60):
+            if hi - lo <= 1e-9 * max(hi, 1.0):
+                break
+            mid = (lo + hi) / 2
+            if sum(len(greedy(lang, mid)) for lang in groups) <= max_units:
+                hi = mid
+            else:
+                lo = mid
+
+        units = []
+        for lang, segs in groups.items():
+            for members in greedy(lang, hi):
+                units.append(CompileUnit(
+                    language=lang,
+                    segments=[segs[i] for i in members],
+                    cost=overheads[lang] + sum(bodies[lang][i] for i in members)
+                ))
+        units.sort(key=lambda u: u.segments[0].start_line)
+        return units
+
+    def balance_stream(self, segments: Iterable[SourceSegment]) -> Iterator[SourceSegment]:
+        """
+        Streaming form of balance: each segment is yielded as soon as no later
+        segment can be merged into it, so at most one segment is held back.
+        Compile-cost partitioning is global, so that mode yields after the input
+        ends: unit by unit, each member tagged "compile_unit:<n>".
+        """
+        if self.mode == "compile_cost":
+            for n, unit in enumerate(self.partition_compile_units(segments)):
+                for seg in unit.segments:
+                    seg.tags = list(dict.fromkeys(seg.tags + ["compile_unit", f"compile_unit:{n}",
+                                                              f"lang:{unit.language}"]))
+                    yield seg
+            return
+
         buffer_segment = None
         
         for seg in segments:
@@ -26,26 +139,42 @@ class ComfortBalancer:
                 buffer_lines = buffer_segment.end_line - buffer_segment.start_line + 1
                 if buffer_lines + seg_lines <= self.max_lines:
                     # Merge
-                    merged_code = buffer_segment.code + "\n" + seg.code
-                    buffer_segment = SourceSegment(
-                        id=f"{buffer_segment.id}_{seg.id}",
-                        code=merged_code,
-                        start_line=buffer_segment.start_line,
-                        end_line=seg.end_line,
-                        tags=buffer_segment.tags + seg.tags + ["balanced_merge"]
-                    )
+                    buffer_segment = self._merge(buffer_segment, seg)
                     continue
                 else:
                     # Flush buffer
-                    balanced.append(buffer_segment)
+                    yield buffer_segment
                     buffer_segment = None
             
             if seg_lines < self.min_lines:
                 buffer_segment = seg
             else:
-                balanced.append(seg)
+                yield seg
                 
         if buffer_segment:
-            balanced.append(buffer_segment)
-            
-        return balanced
+            yield buffer_segment
+
+    def _merge(self, first: SourceSegment, second: SourceSegment) -> SourceSegment:
+        merged_id = f"{first.id}_{second.id}"
+        tags = first.tags + second.tags + ["balanced_merge"]
+        if (first.index is not None and first.index is second.index
+                and first.text is None and second.text is None):
+            # Same shared buffer: the merge is just a wider view, no text is copied.
+            return SourceSegment(
+                id=merged_id,
+                start_line=first.start_line,
+                end_line=second.end_line,
+                tags=tags,
+                complexity_score=first.complexity_score + second.complexity_score,
+                index=first.index,
+                start_offset=first.start_offset,
+                end_offset=second.end_offset
+            )
+        return SourceSegment(
+            id=merged_id,
+            start_line=first.start_line,
+            end_line=second.end_line,
+            tags=tags,
+            complexity_score=first.complexity_score + second.complexity_score,
+            text=first.code + "\n" + second.code
+        )
@@ -0,0 +1,74 @@
+import hashlib
+import os
+import warnings
+from typing import Sequence, Tuple
+
+import torch
+import torch.nn as nn
+
+DEFAULT_CACHE_DIR = ".model_cache"
+
+def _weights_key(model: nn.Module, quantize: bool) -> str:
+    """Cache key over the model class, its weights and the torch version."""
+    digest = hashlib.sha1()
+    digest.update(type(model).__name__.encode())
+    digest.update(torch.__version__.encode())
+    digest.update(b"int8" if quantize else b"fp32")
+    for name, tensor in model.state_dict().items():
+        digest.update(name.encode())
+        digest.update(tensor.detach().cpu().numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+def _outputs_match(eager: nn.Module, compiled: torch.jit.ScriptModule,
+                   example_inputs: Sequence[Tuple], atol: float) -> bool:
+    with torch.inference_mode():
+        for inputs in example_inputs:
+            expected = eager(*inputs)
+            actual = compiled(*inputs)
+            if expected.shape != actual.shape:
+                return False
+            if (expected - actual).abs().max().item() > atol:
+                return False
+    return True
+
+def compile_model(model: nn.Module, name: str, example_inputs: Sequence[Tuple],
+                  quantize: bool = True, atol: float = 0.05,
+                  cache_dir: str = DEFAULT_CACHE_DIR) -> nn.Module:
+    """
+    Returns a TorchScript version of an eval-mode model for CPU inference.
+
+    Linear and LSTM layers are dynamically quantized to int8 when quantize
+    is set. The scripted module is cached on disk under a key derived from
+    the weights, so later runs only load it. Outputs are checked against
+    eager mode on example_inputs; if they differ by more than atol (or
+    compilation fails) the eager model is returned with a warning.
+    """
+    model.eval()
+    path = os.path.join(cache_dir, f"{name}-{_weights_key(model, quantize)}.pt")
+
+    try:
+        with warnings.catch_warnings():
+            # Recent torch versions emit migration notices for quantize_dynamic and torch.jit
+            warnings.simplefilter("ignore", FutureWarning)
+            warnings.simplefilter("ignore", UserWarning)
+            if os.path.exists(path):
+                compiled = torch.jit.load(path)
+            else:
+                target = model
+                if quantize:
+                    target = torch.ao.quantization.quantize_dynamic(
+                        model, {nn.Linear, nn.LSTM}, dtype=torch.qint8
+                    )
+                compiled = torch.jit.script(target)
+                if not os.path.exists(cache_dir):
+                    os.makedirs(cache_dir)
+                compiled.save(path)
+    except (RuntimeError, OSError) as e:
+        warnings.warn(f"Compiled inference unavailable for {name} ({e}); using eager mode.")
+        return model
+
+    compiled.eval()
+    if not _outputs_match(model, compiled, example_inputs, atol):
+        warnings.warn(f"Compiled {name} differs from eager mode by more than {atol}; using eager mode.")
+        return model
+    return compiled
@@ -1,3 +1,8 @@
+import math
+from typing import Dict, Optional
+
+import networkx as nx
+
 from src.analyzer import CodeFeatures
 
 class CostModel:
@@ -6,22 +11,31 @@ class CostModel:
     Scores are heuristic-based (0.0 to 1.0+).
     """
     
-    # Weights: [Math, IO, Loops, Recursion, Classes, Async, Strings]
+    # Weights: [Math, IO, Loops, Recursion, Classes, Async, Strings, Vector]
+    # "vector" scores the arithmetic the NumPy target turns into array expressions
     WEIGHTS = {
         "Rust": {
-            "math": 1.0, "io": 0.8, "loops": 1.0, "recursion": 0.8, "classes": 0.1, "async": 0.9, "strings": 0.7, "base_cost": 0.9
+            "math": 1.0, "io": 0.8, "loops": 1.0, "recursion": 0.8, "classes": 0.1, "async": 0.9, "strings": 0.7, "vector": 0.0, "base_cost": 0.9
         },
         "C++": {
-            "math": 1.0, "io": 0.9, "loops": 1.0, "recursion": 1.0, "classes": 0.8, "async": 0.7, "strings": 0.6, "base_cost": 0.85
+            "math": 1.0, "io": 0.9, "loops": 1.0, "recursion": 1.0, "classes": 0.8, "async": 0.7, "strings": 0.6, "vector": 0.0, "base_cost": 0.85
         },
         "Go": {
-            "math": 0.7, "io": 1.0, "loops": 0.9, "recursion": 0.6, "classes": 0.2, "async": 1.0, "strings": 0.9, "base_cost": 0.8
+            "math": 0.7, "io": 1.0, "loops": 0.9, "recursion": 0.6, "classes": 0.2, "async": 1.0, "strings": 0.9, "vector": 0.0, "base_cost": 0.8
         },
         "Java": {
-            "math": 0.8, "io": 0.9, "loops": 0.8, "recursion": 0.7, "classes": 2.0, "async": 0.8, "strings": 1.0, "base_cost": 0.7
+            "math": 0.8, "io": 0.9, "loops": 0.8, "recursion": 0.7, "classes": 2.0, "async": 0.8, "strings": 1.0, "vector": 0.0, "base_cost": 0.7
+        },
+        # Vectorised Python: no compiler needed, strong only on array math. Scalar
+        # arithmetic stays interpreted, so only what vectorises scores well
+        "NumPy": {
+            "math": 0.3, "io": 0.3, "loops": 0.9, "recursion": 0.1, "classes": 0.1, "async": 0.1, "strings": 0.2, "vector": 2.0, "base_cost": 0.6
         }
     }
 
+    # Score per order of magnitude of estimated work, scaled by the "loops" weight
+    WORK_WEIGHT = 2.0
+
     @staticmethod
     def calculate_score(features: CodeFeatures, lang: str) -> float:
         w = CostModel.WEIGHTS[lang]
@@ -32,8 +46,12 @@ class CostModel:
         
         # Add contributions
         score += features.math_ops * w["math"] * 2.0
+        score += features.vector_ops * w["vector"] * 2.0
         score += features.io_ops * w["io"] * 2.0
-        score += features.loops * w["loops"] * 3.0
+        # Loops count by the work they are expected to do, not by how many there are;
+        # a cheap helper called from hot loops does as much work as one heavy call
+        work = features.estimated_ops * features.hotness
+        score += math.log10(1.0 + work) * w["loops"] * CostModel.WORK_WEIGHT
         score += features.string_ops * w["strings"] * 1.5
         score += features.classes * w["classes"] * 10.0 # Boost class weight significantly
         score += features.async_ops * w["async"] * 5.0
@@ -43,9 +61,15 @@ class CostModel:
             
         return score
 
+# Cut terminals of the expansion moves; objects, so no segment name can collide with them
+_SOURCE = object()
+_SINK = object()
+
 class DecisionEngine:
-    def __init__(self, use_neural_fallback=False):
+    def __init__(self, use_neural_fallback=False, boundary_cost: float = 0.5):
         self.use_neural = use_neural_fallback
+        # Score lost per estimated call that crosses a language boundary
+        self.boundary_cost = boundary_cost
 
     def decide(self, features: CodeFeatures) -> str:
         # Calculate score for each language
@@ -66,3 +90,93 @@ class DecisionEngine:
             return None
             
         return best_lang, scores
+
+    def assign_module(self, features: Dict[str, CodeFeatures], call_graph: nx.DiGraph,
+                      initial: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Whole-module language assignment maximising the sum of per-segment
+        suitability minus boundary_cost * call frequency for every call edge
+        whose endpoints land in different languages.
+
+        This is a Potts energy over the call graph, solved with alpha-expansion
+        (each move is an s-t minimum cut). Segments without calls to or from
+        other segments keep their `initial` language (or their best score).
+        """
+        langs = list(CostModel.WEIGHTS.keys())
+        scores = {seg: {lang: CostModel.calculate_score(f, lang) for lang in langs} for seg, f in features.items()}
+        labels = {seg: (initial or {}).get(seg) or max(s, key=s.get) for seg, s in scores.items()}
+
+        # Undirected boundary penalties between distinct segments
+        penalty: Dict[tuple, float] = {}
+        for u, v, data in call_graph.edges(data=True):
+            if u == v or u not in scores or v not in scores:
+                continue
+            key = (u, v) if u < v else (v, u)
+            penalty[key] = penalty.get(key, 0.0) + self.boundary_cost * data.get("weight", 1.0)
+        connected = {seg for edge in penalty for seg in edge}
+        if not connected:
+            return labels
+
+        # Unary cost: suitability given up relative to the segment's best language
+        unary = {seg: {lang: max(scores[seg].values()) - scores[seg][lang] for lang in langs} for seg in connected}
+        for seg in connected:
+            if labels[seg] not in unary[seg]:
+                labels[seg] = min(unary[seg], key=unary[seg].get)
+
+        def energy(assign):
+            total = sum(unary[seg][assign[seg]] for seg in connected)
+            return total + sum(w for (u, v), w in penalty.items() if assign[u] != assign[v])
+
+        best = energy(labels)
+        improved = True
+        while improved:
+            improved = False
+            for alpha in langs:
+                candidate = self._expand(alpha, labels, connected, unary, penalty)
+                value = energy(candidate)
+                if value < best - 1e-9:
+                    labels, best, improved = candidate, value, True
+        return labels
+
+    @staticmethod
+    def _expand(alpha, labels, nodes, unary, penalty):
+        """
+        One alpha-expansion move: every node either keeps its label or switches
+        to alpha. The binary energy is submodular for Potts penalties, so it is
+        minimised exactly by a minimum cut (source side = keep, sink side = alpha).
+        """
+        graph = nx.DiGraph()
+        graph.add_nodes_from([_SOURCE, _SINK])
+        graph.add_nodes_from(nodes)
+
+        def add(u, v, capacity):
+            if capacity <= 0:
+                return
+            if graph.has_edge(u, v):
+                graph[u][v]["capacity"] += capacity
+            else:
+                graph.add_edge(u, v, capacity=capacity)
+
+        def add_unary(node, cost_keep, cost_alpha):
+            # Cutting source->node puts the node on the sink side (switch to alpha)
+            add(_SOURCE, node, cost_alpha)
+            add(node, _SINK, cost_keep)
+
+        for node in nodes:
+            add_unary(node, unary[node][labels[node]], unary[node][alpha])
+
+        for (u, v), w in penalty.items():
+            # Pairwise energies E(x_u, x_v), x = 1 meaning "switch to alpha"
+            e00 = w if labels[u] != labels[v] else 0.0
+            e01 = w if labels[u] != alpha else 0.0
+            e10 = w if alpha != labels[v] else 0.0
+            # E = e00 + (e10 - e00) x_u + (e11 - e10) x_v + (e01 + e10 - e00 - e11)(1 - x_u) x_v, e11 = 0
+            if e10 >= e00:
+                add_unary(u, 0.0, e10 - e00)
+            else:
+                add_unary(u, e00 - e10, 0.0)
+            add_unary(v, e10, 0.0)
+            add(u, v, e01 + e10 - e00)
+
+        _, (keep, _) = nx.minimum_cut(graph, _SOURCE, _SINK)
+        return {node: (label if node not in nodes or node in keep else alpha) for node, label in labels.items()}
@@ -190,7 +190,9 @@ class HtmlVisualizer:
             "Rust": "#e43b26", # Rust Orange
             "C++": "#00599C",  # C++ Blue
             "Go": "#00ADD8",   # Go Cyan
-            "Java": "#b07219"  # Java Brown
+            "Java": "#b07219", # Java Brown
+            "NumPy": "#4d77cf", # NumPy Blue
+            "Python": "#ffd43b" # Python Yellow
         }.get(lang, "#777")
 
     def _get_lang_class(self, lang):
@@ -198,5 +200,7 @@ class HtmlVisualizer:
             "Rust": "rust",
             "C++": "cpp",
             "Go": "go",
-            "Java": "java"
+            "Java": "java",
+            "NumPy": "python",
+            "Python": "python"
         }.get(lang, "plaintext")
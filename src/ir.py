@@ -0,0 +1,166 @@
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.type_inference import TypeInference, FunctionTypes, INT, FLOAT, BOOL, STR, is_list, join
+
+# Python operators -> IR operator names
+BINARY_NAMES = {
+    ast.Add: "add", ast.Sub: "sub", ast.Mult: "mul", ast.Div: "div", ast.FloorDiv: "floordiv", ast.Mod: "mod",
+    ast.Pow: "pow", ast.BitAnd: "band", ast.BitOr: "bor", ast.BitXor: "bxor", ast.LShift: "shl", ast.RShift: "shr",
+}
+COMPARE_NAMES = {ast.Eq: "eq", ast.NotEq: "ne", ast.Lt: "lt", ast.LtE: "le", ast.Gt: "gt", ast.GtE: "ge"}
+UNARY_NAMES = {ast.USub: "neg", ast.UAdd: "pos", ast.Not: "not", ast.Invert: "invert"}
+LOGICAL_NAMES = {ast.And: "and", ast.Or: "or"}
+
+@dataclass
+class IRExpr:
+    """An expression with its inferred type; `source` is the Python node it was lowered from."""
+    type: Optional[str]
+    source: ast.AST
+
+@dataclass
+class IRConst(IRExpr):
+    value: object = None
+
+@dataclass
+class IRName(IRExpr):
+    id: str = ""
+
+@dataclass
+class IRCast(IRExpr):
+    """An implicit Python widening (int/bool -> float, bool -> int) made explicit."""
+    operand: Optional[IRExpr] = None
+
+@dataclass
+class IRBinary(IRExpr):
+    op: str = ""
+    left: Optional[IRExpr] = None
+    right: Optional[IRExpr] = None
+
+@dataclass
+class IRCompare(IRExpr):
+    op: str = ""
+    left: Optional[IRExpr] = None
+    right: Optional[IRExpr] = None
+
+@dataclass
+class IRUnary(IRExpr):
+    op: str = ""
+    operand: Optional[IRExpr] = None
+
+@dataclass
+class IRLogical(IRExpr):
+    op: str = ""
+    values: List[IRExpr] = field(default_factory=list)
+
+@dataclass
+class IROpaque(IRExpr):
+    """A construct the IR does not model (calls, containers, strings...); backends emit it from the AST."""
+
+class IRBuilder:
+    """
+    Lowers Python expressions into the typed IR. Operand widening is decided
+    here once, so backends only print. Lowered expressions are cached per AST
+    node, so printing the same tree for several targets lowers it only once.
+    """
+    def __init__(self, types: TypeInference):
+        self.types = types
+        self._cache: Dict[int, IRExpr] = {}
+        # Keeps cached nodes alive so their ids stay unique
+        self._nodes: List[ast.AST] = []
+
+    def lower(self, node: ast.AST, ft: FunctionTypes) -> IRExpr:
+        cached = self._cache.get(id(node))
+        if cached is None:
+            cached = self._lower(node, ft)
+            self._cache[id(node)] = cached
+            self._nodes.append(node)
+        return cached
+
+    def _lower(self, node, ft) -> IRExpr:
+        t = self.types.expr_type(node, ft)
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float, bool):
+            return IRConst(t, node, node.value)
+        if isinstance(node, ast.Name):
+            return IRName(t, node, node.id)
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_NAMES and not self._aggregate(t):
+            # Operands are widened to the result type (always float for true division)
+            return IRBinary(t, node, BINARY_NAMES[type(node.op)],
+                            self._widen(node.left, t, ft), self._widen(node.right, t, ft))
+        if (isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in COMPARE_NAMES
+                and not self._aggregate(self.types.expr_type(node.left, ft))
+                and not self._aggregate(self.types.expr_type(node.comparators[0], ft))):
+            # Compared in the wider numeric type
+            common = join(self.types.expr_type(node.left, ft), self.types.expr_type(node.comparators[0], ft))
+            return IRCompare(t, node, COMPARE_NAMES[type(node.ops[0])],
+                             self._widen(node.left, common, ft), self._widen(node.comparators[0], common, ft))
+        if isinstance(node, ast.UnaryOp):
+            return IRUnary(t, node, UNARY_NAMES[type(node.op)], self.lower(node.operand, ft))
+        if isinstance(node, ast.BoolOp):
+            return IRLogical(t, node, LOGICAL_NAMES[type(node.op)], [self.lower(v, ft) for v in node.values])
+        return IROpaque(t, node)
+
+    @staticmethod
+    def _aggregate(t: Optional[str]) -> bool:
+        return t == STR or is_list(t)
+
+    def _widen(self, node, target: Optional[str], ft) -> IRExpr:
+        expr = self.lower(node, ft)
+        if target == FLOAT and expr.type in (INT, BOOL):
+            if isinstance(expr, IRConst):
+                return IRConst(FLOAT, node, float(expr.value))
+            return IRCast(FLOAT, node, expr)
+        if target == INT and expr.type == BOOL:
+            return IRCast(INT, node, expr)
+        return expr
+
+@dataclass
+class Syntax:
+    """
+    How a backend spells the IR. `operators` are infix symbols; `formats`
+    override an operator with a template over {left} and {right}, and
+    `float_formats` do so for float results only. Operators in neither table
+    are emitted from the AST by the backend itself.
+    """
+    operators: Dict[str, str]
+    formats: Dict[str, str] = field(default_factory=dict)
+    float_formats: Dict[str, str] = field(default_factory=dict)
+    compare: Dict[str, str] = field(default_factory=lambda: dict(C_COMPARE))
+    unary: Dict[str, str] = field(default_factory=lambda: {"neg": "-", "pos": "", "not": "!", "invert": "~"})
+    logical: Dict[str, str] = field(default_factory=lambda: {"and": " && ", "or": " || "})
+    true: str = "true"
+    false: str = "false"
+
+C_COMPARE = {"eq": "==", "ne": "!=", "lt": "<", "le": "<=", "gt": ">", "ge": ">="}
+
+# Floor division and modulo keep the native (truncating) semantics the backends always had
+# on ints. On floats both follow Python: // rounds down and % takes the sign of the
+# divisor, so a == (a // b) * b + a % b still holds for negative operands
+C_OPERATORS = {
+    "add": "+", "sub": "-", "mul": "*", "div": "/", "floordiv": "/", "mod": "%",
+    "band": "&", "bor": "|", "bxor": "^", "shl": "<<", "shr": ">>",
+}
+
+# Python's float %: the truncated remainder, moved into the divisor's sign. Each
+# template evaluates its operands once
+RUST_SYNTAX = Syntax(C_OPERATORS, float_formats={
+    "floordiv": "({left} / {right}).floor()",
+    "mod": "{{ let (a, b) = ({left}, {right}); let r = a % b; if r != 0.0 && (r < 0.0) != (b < 0.0) {{ r + b }} else {{ r }} }}",
+}, unary={"neg": "-", "pos": "", "not": "!", "invert": "!"})
+CPP_SYNTAX = Syntax(C_OPERATORS, float_formats={
+    "floordiv": "floor({left} / {right})",
+    "mod": "[](double a, double b) {{ double r = fmod(a, b); return r != 0 && (r < 0) != (b < 0) ? r + b : r; }}({left}, {right})",
+})
+# Go has no % on floats; both templates need the math import
+GO_SYNTAX = Syntax(C_OPERATORS, float_formats={
+    "floordiv": "math.Floor({left} / {right})",
+    "mod": "func(a, b float64) float64 {{ r := math.Mod(a, b); if r != 0 && (r < 0) != (b < 0) {{ r += b }}; return r }}({left}, {right})",
+}, unary={"neg": "-", "pos": "", "not": "!", "invert": "^"})
+# Lambda parameters may not shadow Java locals; $ never appears in a Python name
+JAVA_SYNTAX = Syntax(C_OPERATORS, formats={"pow": "((long) Math.pow({left}, {right}))"}, float_formats={
+    "pow": "Math.pow({left}, {right})",
+    "floordiv": "Math.floor({left} / {right})",
+    "mod": "((java.util.function.DoubleBinaryOperator) ($a, $b) -> {{ double $r = $a % $b; "
+           "return $r != 0 && ($r < 0) != ($b < 0) ? $r + $b : $r; }}).applyAsDouble({left}, {right})",
+})
@@ -0,0 +1,80 @@
+from typing import Dict, List
+
+from src.polyglot import NativeExport
+
+# Abstract argument/return types used by NativeExport -> ctypes types
+CTYPES_MAP = {
+    "int32": "ctypes.c_int32",
+    "int64": "ctypes.c_int64",
+    "float64": "ctypes.c_double",
+    "bool": "ctypes.c_bool",
+}
+
+SHIM_HEADER = '''"""
+Auto-generated ctypes bindings for the polyglot shared libraries.
+
+Import this module instead of the original Python functions: each function
+keeps its original name and signature but runs the native build in-process.
+If a library has not been built yet (run runner.py), or a function's types
+cannot cross the C ABI, the original Python definition is used instead.
+"""
+import ctypes
+import os
+import sys
+
+_HERE = os.path.dirname(os.path.abspath(__file__))
+
+def shared_lib_name(stem):
+    if os.name == "nt":
+        return stem + ".dll"
+    if sys.platform == "darwin":
+        return "lib" + stem + ".dylib"
+    return "lib" + stem + ".so"
+
+def _load(stem):
+    try:
+        return ctypes.CDLL(os.path.join(_HERE, shared_lib_name(stem)))
+    except OSError:
+        return None
+
+NATIVE = {}
+'''
+
+def _ctype(abstract: str) -> str:
+    return CTYPES_MAP.get(abstract, "ctypes.c_int32")
+
+def _binding(lib: str, export: NativeExport) -> List[str]:
+    params = ", ".join(name for name, _ in export.args)
+    argtypes = ", ".join(_ctype(t) for _, t in export.args)
+    restype = _ctype(export.returns) if export.returns else "None"
+    return [
+        f"    {lib}.{export.name}.argtypes = [{argtypes}]",
+        f"    {lib}.{export.name}.restype = {restype}",
+        f"    def {export.name}({params}):",
+        f"        return {lib}.{export.name}({params})",
+        f"    NATIVE[{export.name!r}] = True",
+    ]
+
+def generate_shim(path: str, libraries: List[Dict]):
+    """
+    Writes a Python module binding every exported function of the shared
+    libraries with ctypes.
+
+    Each library is a dict with 'stem' (file name without extension),
+    'exports' (List[NativeExport]) and 'fallback' (the original Python source).
+    """
+    lines = [SHIM_HEADER]
+    for i, lib in enumerate(libraries):
+        handle = f"_lib_{i}"
+        # The Python definitions cover functions whose types cannot cross the C ABI;
+        # the native bindings then replace every exported one
+        lines.append(f"exec({lib['fallback']!r}, globals())")
+        lines.append(f"{handle} = _load({lib['stem']!r})")
+        lines.append(f"if {handle} is not None:")
+        for export in lib["exports"]:
+            lines.extend(_binding(handle, export))
+        if not lib["exports"]:
+            lines.append("    pass")
+        lines.append("")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines))
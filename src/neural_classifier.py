@@ -2,6 +2,7 @@ import torch
 import torch.nn as nn
 import torch.nn.functional as F
 import random
+from src.compiled_inference import compile_model, DEFAULT_CACHE_DIR
 
 class PolyglotClassifier(nn.Module):
     def __init__(self, input_dim, num_classes):
@@ -16,7 +17,7 @@ class PolyglotClassifier(nn.Module):
         return self.fc3(x)
 
 class NeuralClassifier:
-    def __init__(self):
+    def __init__(self, compiled: bool = False, cache_dir: str = DEFAULT_CACHE_DIR):
         # Features: math, io, loops, conditionals, functions, classes, async, recursion, strings
         self.input_dim = 9 
         self.classes = ["Rust", "C++", "Go", "Java"]
@@ -27,6 +28,11 @@ class NeuralClassifier:
         torch.manual_seed(42)
         self.model.apply(self._init_weights)
         self.model.eval() 
+
+        if compiled:
+            # TorchScript + int8 path, verified against eager on sample feature vectors
+            samples = torch.randint(0, 10, (16, self.input_dim)).float()
+            self.model = compile_model(self.model, "polyglot_classifier", [(samples,)], cache_dir=cache_dir)
     
     def _init_weights(self, m):
         if isinstance(m, nn.Linear):
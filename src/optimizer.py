@@ -0,0 +1,350 @@
+import ast
+import math
+import operator
+from typing import Dict, List, Optional, Set
+
+from src.type_inference import TypeInference, FunctionTypes, INT, FLOAT
+
+# Constant operators folded at transpile time
+BINARY_OPS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow,
+    ast.BitAnd: operator.and_, ast.BitOr: operator.or_, ast.BitXor: operator.xor,
+    ast.LShift: operator.lshift, ast.RShift: operator.rshift,
+}
+UNARY_OPS = {ast.USub: operator.neg, ast.UAdd: operator.pos, ast.Not: operator.not_, ast.Invert: operator.invert}
+COMPARE_OPS = {
+    ast.Eq: operator.eq, ast.NotEq: operator.ne, ast.Lt: operator.lt, ast.LtE: operator.le,
+    ast.Gt: operator.gt, ast.GtE: operator.ge,
+}
+
+# Folded constants larger than this stay as written rather than bloating the output
+MAX_FOLDED_SIZE = 1 << 16
+
+# Statements after which nothing in the same block runs
+_TERMINATORS = (ast.Return, ast.Raise, ast.Break, ast.Continue)
+
+class Optimizer(ast.NodeTransformer):
+    """
+    Backend-independent AST optimisations, run before any transpiler:
+
+    - constant folding of arithmetic, comparisons and boolean operators;
+    - dead code elimination: statements after return/raise/break/continue,
+      branches of constant conditions, and assignments to locals that are
+      never read (when the assigned value has no side effects);
+    - strength reduction on inferred types: int % 2**k -> & (2**k - 1),
+      int // 2**k -> >> k, float / 2**k -> * 2**-k and x ** 2|3 -> x * x (* x).
+
+    The int rewrites hold for negative operands too, because Python's % and
+    // round towards negative infinity just like two's complement & and >>.
+    They need an operand that is provably int (see _provably_int): a type
+    inferred from usage alone may be a float at run time, where & and >> raise.
+    """
+    def __init__(self, types: Optional[TypeInference] = None):
+        self.types = types
+        self.current_types = FunctionTypes("<module>")
+        self.current_class: Optional[str] = None
+        # Every value bound to each name of the current function; None where the
+        # value is not an expression (an unannotated argument, a tuple target...)
+        self.bindings: Dict[str, List[Optional[ast.AST]]] = {}
+        self._proving: Set[str] = set()
+
+    def optimize(self, tree: ast.AST) -> ast.AST:
+        if self.types is None:
+            self.types = TypeInference().infer(tree)
+        tree = self.visit(tree)
+        return ast.fix_missing_locations(tree)
+
+    def _type(self, node) -> Optional[str]:
+        return self.types.expr_type(node, self.current_types)
+
+    # --- Scopes --------------------------------------------------------------
+
+    def visit_ClassDef(self, node):
+        outer, self.current_class = self.current_class, node.name
+        self.generic_visit(node)
+        self.current_class = outer
+        return node
+
+    def visit_FunctionDef(self, node):
+        outer, outer_bindings = self.current_types, self.bindings
+        self.current_types = self.types.function(node.name, self.current_class)
+        self.bindings = self._bindings(node)
+        self.generic_visit(node)
+        self._remove_unused_assignments(node)
+        self.current_types, self.bindings = outer, outer_bindings
+        return node
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    # --- Dead code -------------------------------------------------------------
+
+    def _block(self, body: List[ast.stmt]) -> List[ast.stmt]:
+        kept = []
+        for stmt in body:
+            if isinstance(stmt, list):
+                kept.extend(stmt)
+            elif stmt is not None:
+                kept.append(stmt)
+        for i, stmt in enumerate(kept):
+            if isinstance(stmt, _TERMINATORS):
+                kept = kept[:i + 1]
+                break
+        return kept or [ast.Pass()]
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for attr in ("body", "orelse", "finalbody"):
+            value = getattr(node, attr, None)
+            if isinstance(value, list) and value and isinstance(value[0], ast.stmt) and not isinstance(node, ast.Module):
+                # An empty else stays empty; other blocks need at least `pass`
+                setattr(node, attr, self._block(value) if attr == "body" or any(
+                    not isinstance(s, ast.Pass) for s in value) else [])
+        return node
+
+    def visit_If(self, node):
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant):
+            branch = node.body if node.test.value else node.orelse
+            return branch or None
+        return node
+
+    def visit_While(self, node):
+        self.generic_visit(node)
+        if isinstance(node.test, ast.Constant) and not node.test.value:
+            return node.orelse or None
+        return node
+
+    def _remove_unused_assignments(self, func):
+        """Drops `name = pure_expr` for locals that are never read, until nothing changes."""
+        if any(isinstance(n, (ast.Global, ast.Nonlocal)) for n in ast.walk(func)) or any(
+                isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in ("locals", "eval", "exec", "vars")
+                for n in ast.walk(func)):
+            return
+        params = {a.arg for a in ast.walk(func.args) if isinstance(a, ast.arg)}
+        changed = True
+        while changed:
+            read = {n.id for n in ast.walk(func) if isinstance(n, ast.Name) and not isinstance(n.ctx, ast.Store)}
+            # AugAssign reads its target too
+            read |= {n.target.id for n in ast.walk(func) if isinstance(n, ast.AugAssign) and isinstance(n.target, ast.Name)}
+            unused = {n.id for n in ast.walk(func) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)} - read - params
+            changed = self._strip(func, unused)
+
+    def _strip(self, node, unused: Set[str]) -> bool:
+        changed = False
+        for attr in ("body", "orelse", "finalbody"):
+            block = getattr(node, attr, None)
+            if not isinstance(block, list) or not block or not isinstance(block[0], ast.stmt):
+                continue
+            kept = []
+            for stmt in block:
+                if (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Name)
+                        and stmt.targets[0].id in unused and self._pure(stmt.value)):
+                    changed = True
+                    continue
+                if not isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                    changed = self._strip(stmt, unused) or changed
+                kept.append(stmt)
+            if attr == "body" or kept:
+                setattr(node, attr, kept or [ast.Pass()])
+            else:
+                setattr(node, attr, [])
+        for handler in getattr(node, "handlers", []):
+            changed = self._strip(handler, unused) or changed
+        return changed
+
+    def _pure(self, node) -> bool:
+        """True when evaluating node has no side effects (arithmetic only divides by non-zero constants)."""
+        if isinstance(node, (ast.Constant, ast.Name)):
+            return True
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return all(self._pure(e) for e in node.elts)
+        if isinstance(node, ast.JoinedStr):
+            return all(self._pure(v.value if isinstance(v, ast.FormattedValue) else v) for v in node.values)
+        if isinstance(node, ast.UnaryOp):
+            return self._pure(node.operand)
+        if isinstance(node, ast.BoolOp):
+            return all(self._pure(v) for v in node.values)
+        if isinstance(node, ast.Compare):
+            return self._pure(node.left) and all(self._pure(c) for c in node.comparators)
+        if isinstance(node, ast.IfExp):
+            return all(self._pure(n) for n in (node.test, node.body, node.orelse))
+        if isinstance(node, ast.BinOp):
+            if isinstance(node.op, (ast.Div, ast.FloorDiv, ast.Mod)) and not (
+                    isinstance(node.right, ast.Constant) and node.right.value):
+                return False
+            return self._pure(node.left) and self._pure(node.right)
+        return False
+
+    # --- Constant folding and strength reduction --------------------------------
+
+    @staticmethod
+    def _constant(value, like) -> Optional[ast.Constant]:
+        if isinstance(value, (str, bytes, tuple)) and len(value) > MAX_FOLDED_SIZE:
+            return None
+        if isinstance(value, int) and not isinstance(value, bool) and value.bit_length() > 64:
+            return None
+        if isinstance(value, float) and not math.isfinite(value):
+            return None
+        return ast.copy_location(ast.Constant(value=value), like)
+
+    @staticmethod
+    def _literal(node):
+        return isinstance(node, ast.Constant) and isinstance(node.value, (int, float, bool, str))
+
+    @staticmethod
+    def _power_of_two(node) -> Optional[int]:
+        if isinstance(node, ast.Constant) and type(node.value) is int and node.value > 1 and node.value & (node.value - 1) == 0:
+            return node.value.bit_length() - 1
+        return None
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if self._literal(node.left) and self._literal(node.right) and type(node.op) in BINARY_OPS:
+            if self._too_large(node):
+                return node
+            try:
+                folded = self._constant(BINARY_OPS[type(node.op)](node.left.value, node.right.value), node)
+            except (ArithmeticError, TypeError, ValueError):
+                return node
+            return folded or node
+        return self._reduce(node)
+
+    @staticmethod
+    def _too_large(node) -> bool:
+        """Operations whose result would be too big to compute before _constant can reject it."""
+        left, right = node.left.value, node.right.value
+        if isinstance(node.op, (ast.Pow, ast.LShift)) and isinstance(right, int) and abs(right) > 64:
+            return True
+        if isinstance(node.op, ast.Mult) and isinstance(left, str) != isinstance(right, str):
+            text, count = (left, right) if isinstance(left, str) else (right, left)
+            return isinstance(count, int) and len(text) * count > MAX_FOLDED_SIZE
+        return False
+
+    @staticmethod
+    def _bindings(func) -> Dict[str, List[Optional[ast.AST]]]:
+        """The values bound to each name in func. Names declared int and range loop variables get an int literal."""
+        int_value = ast.Constant(0)
+        def declared_int(annotation):
+            return isinstance(annotation, ast.Name) and annotation.id == "int"
+        bindings: Dict[str, List[Optional[ast.AST]]] = {}
+        bound = set()
+        def bind(target, value):
+            if isinstance(target, ast.Name):
+                bindings.setdefault(target.id, []).append(value)
+                bound.add(id(target))
+        for arg in func.args.posonlyargs + func.args.args + func.args.kwonlyargs:
+            bindings.setdefault(arg.arg, []).append(int_value if declared_int(arg.annotation) else None)
+        for node in ast.walk(func):
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    bind(target, node.value)
+            elif isinstance(node, ast.AnnAssign) and (node.value is not None or declared_int(node.annotation)):
+                bind(node.target, int_value if declared_int(node.annotation) else node.value)
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name):
+                bind(node.target, ast.BinOp(ast.Name(node.target.id, ast.Load()), node.op, node.value))
+            elif isinstance(node, (ast.For, ast.AsyncFor, ast.comprehension)):
+                is_range = (isinstance(node.iter, ast.Call) and isinstance(node.iter.func, ast.Name)
+                            and node.iter.func.id == "range")
+                bind(node.target, int_value if is_range else None)
+            elif isinstance(node, ast.NamedExpr):
+                bind(node.target, node.value)
+        # Any other store (tuple targets, with ... as, nested defs' names...) binds an unknown value
+        for node in ast.walk(func):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store) and id(node) not in bound:
+                bindings.setdefault(node.id, []).append(None)
+        return bindings
+
+    def _provably_int(self, node) -> bool:
+        """
+        Int whatever the arguments turn out to be: int literals, names whose
+        every binding is provably int (arguments and locals annotated int,
+        range loop variables), len()/int() and integer arithmetic on those.
+        """
+        if isinstance(node, ast.Constant):
+            return type(node.value) is int
+        if isinstance(node, ast.Name):
+            values = self.bindings.get(node.id)
+            if not values:
+                return False
+            if node.id in self._proving:
+                # Bindings in terms of the name itself (n += 1) hold if the others do
+                return True
+            self._proving.add(node.id)
+            try:
+                return all(value is not None and self._provably_int(value) for value in values)
+            finally:
+                self._proving.discard(node.id)
+        if isinstance(node, ast.Call):
+            return isinstance(node.func, ast.Name) and node.func.id in ("len", "int")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd, ast.Invert)):
+            return self._provably_int(node.operand)
+        if isinstance(node, ast.BinOp) and not isinstance(node.op, (ast.Div, ast.Pow, ast.MatMult)):
+            return self._provably_int(node.left) and self._provably_int(node.right)
+        return False
+
+    def _reduce(self, node):
+        left_t = self._type(node.left)
+        shift = self._power_of_two(node.right)
+        if shift is not None and left_t == INT and self._provably_int(node.left):
+            if isinstance(node.op, ast.Mod):
+                return ast.copy_location(ast.BinOp(node.left, ast.BitAnd(), ast.Constant(node.right.value - 1)), node)
+            if isinstance(node.op, ast.FloorDiv):
+                return ast.copy_location(ast.BinOp(node.left, ast.RShift(), ast.Constant(shift)), node)
+        if shift is not None and isinstance(node.op, ast.Div) and left_t == FLOAT:
+            # Exact: the reciprocal of a power of two is representable. Int operands
+            # keep the division, which the backends already widen to floating point
+            return ast.copy_location(ast.BinOp(node.left, ast.Mult(), ast.Constant(1.0 / node.right.value)), node)
+        if (isinstance(node.op, ast.Pow) and isinstance(node.left, ast.Name) and left_t in (INT, FLOAT)
+                and isinstance(node.right, ast.Constant) and type(node.right.value) is int and node.right.value in (2, 3)):
+            product = node.left
+            for _ in range(node.right.value - 1):
+                product = ast.BinOp(product, ast.Mult(), ast.Name(node.left.id, ast.Load()))
+            return ast.copy_location(product, node)
+        # Identities that keep the operand's type: x + 0, x - 0, x * 1
+        identity = {ast.Add: 0, ast.Sub: 0, ast.Mult: 1}.get(type(node.op))
+        if (identity is not None and left_t in (INT, FLOAT) and isinstance(node.right, ast.Constant)
+                and type(node.right.value) is int and node.right.value == identity):
+            return node.left
+        return node
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if self._literal(node.operand) and type(node.op) in UNARY_OPS:
+            try:
+                return self._constant(UNARY_OPS[type(node.op)](node.operand.value), node) or node
+            except TypeError:
+                return node
+        return node
+
+    def visit_Compare(self, node):
+        self.generic_visit(node)
+        operands = [node.left] + node.comparators
+        if all(self._literal(o) for o in operands) and all(type(op) in COMPARE_OPS for op in node.ops):
+            try:
+                result = all(COMPARE_OPS[type(op)](a.value, b.value)
+                             for op, a, b in zip(node.ops, operands, operands[1:]))
+            except TypeError:
+                return node
+            return self._constant(result, node)
+        return node
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        # Python returns the deciding operand, so only leading constants can be dropped
+        values = list(node.values)
+        while len(values) > 1 and self._literal(values[0]):
+            decides = bool(values[0].value) != isinstance(node.op, ast.And)
+            if decides:
+                return values[0]
+            values.pop(0)
+        if len(values) == 1:
+            return values[0]
+        node.values = values
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        if self._literal(node.test):
+            return node.body if node.test.value else node.orelse
+        return node
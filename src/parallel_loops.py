@@ -0,0 +1,172 @@
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+# Calls without side effects that may appear in a parallel loop body
+PURE_CALLS = ("abs", "min", "max", "int", "float", "bool", "len", "pow", "round")
+
+# AugAssign operators that form associative, commutative reductions
+REDUCTION_OPS = {ast.Add: "+", ast.Mult: "*", ast.BitOr: "|", ast.BitAnd: "&", ast.BitXor: "^"}
+
+# Constructs a parallel loop body may not contain anywhere
+_BARRIERS = (ast.Return, ast.Yield, ast.YieldFrom, ast.Await, ast.Global, ast.Nonlocal, ast.Raise,
+             ast.Try, ast.With, ast.AsyncWith, ast.Delete, ast.NamedExpr, ast.Lambda,
+             ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+PARALLEL_MIN_TRIP_COUNT = 1000
+
+@dataclass
+class ParallelLoop:
+    """A range() loop whose iterations are independent apart from its reductions."""
+    target: str
+    # accumulator -> operator (+, *, |, &, ^, min, max)
+    reductions: Dict[str, str] = field(default_factory=dict)
+    # Names written before they are read in every iteration and unused outside the loop
+    private: Set[str] = field(default_factory=set)
+    # Number of iterations when the bounds are constants
+    trip_count: Optional[int] = None
+
+class LoopDependenceAnalyzer:
+    """
+    Detects `for` loops over range() whose iterations can run in parallel.
+
+    Every name the body assigns must be either private to an iteration or a
+    reduction accumulator, updated only as `acc op= expr` or
+    `acc = min(acc, expr)` / `max(...)` and read nowhere else. Bodies that
+    store into containers or attributes, call anything but pure builtins, or
+    leave the loop early are rejected, as are loops without a reduction.
+    Loops whose constant trip count is below min_trip_count are not worth the
+    threading overhead; min_trip_count <= 0 disables parallelisation.
+    """
+    def __init__(self, min_trip_count: int = PARALLEL_MIN_TRIP_COUNT):
+        self.min_trip_count = min_trip_count
+
+    def analyze(self, loop: ast.AST, function: ast.AST) -> Optional[ParallelLoop]:
+        if self.min_trip_count <= 0 or not isinstance(loop, ast.For) or loop.orelse:
+            return None
+        if not isinstance(loop.target, ast.Name) or not self._unit_range(loop.iter):
+            return None
+        trip_count = self._trip_count(loop.iter)
+        if trip_count is not None and trip_count < self.min_trip_count:
+            return None
+        if not self._independent_body(loop.body):
+            return None
+
+        result = ParallelLoop(loop.target.id, trip_count=trip_count)
+        outside = self._names_outside(function, loop)
+        for name in sorted(self._assigned(loop.body)):
+            if name == loop.target.id:
+                return None
+            op = self._reduction(name, loop.body)
+            if op:
+                result.reductions[name] = op
+            elif name not in outside and self._written_first(name, loop.body):
+                result.private.add(name)
+            else:
+                return None
+        return result if result.reductions else None
+
+    # --- Loop shape --------------------------------------------------------
+
+    @staticmethod
+    def _unit_range(node) -> bool:
+        return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "range"
+                and 1 <= len(node.args) <= 2 and not node.keywords)
+
+    @staticmethod
+    def _trip_count(node) -> Optional[int]:
+        bounds = [a.value if isinstance(a, ast.Constant) and isinstance(a.value, int) else None for a in node.args]
+        if None in bounds:
+            return None
+        start, stop = (0, bounds[0]) if len(bounds) == 1 else bounds
+        return max(stop - start, 0)
+
+    def _independent_body(self, body: List[ast.stmt]) -> bool:
+        if any(self._leaves_loop(stmt) for stmt in body):
+            return False
+        for node in (n for stmt in body for n in ast.walk(stmt)):
+            if isinstance(node, _BARRIERS):
+                return False
+            if isinstance(node, (ast.Subscript, ast.Attribute, ast.Starred)) and isinstance(node.ctx, ast.Store):
+                return False
+            if isinstance(node, ast.Assign) and not all(isinstance(t, ast.Name) for t in node.targets):
+                return False
+            if isinstance(node, ast.Call) and not self._pure_call(node):
+                return False
+        return True
+
+    def _leaves_loop(self, node) -> bool:
+        """True for a break that exits the analysed loop (inner loops may break freely)."""
+        if isinstance(node, ast.Break):
+            return True
+        if isinstance(node, (ast.For, ast.AsyncFor, ast.While)):
+            return any(self._leaves_loop(stmt) for stmt in node.orelse)
+        return any(self._leaves_loop(child) for child in ast.iter_child_nodes(node) if isinstance(child, ast.stmt))
+
+    @staticmethod
+    def _pure_call(node: ast.Call) -> bool:
+        func = node.func
+        if isinstance(func, ast.Name):
+            return func.id in PURE_CALLS or func.id == "range"
+        return isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id == "math"
+
+    # --- Names -------------------------------------------------------------
+
+    @staticmethod
+    def _assigned(body: List[ast.stmt]) -> Set[str]:
+        names = set()
+        for node in (n for stmt in body for n in ast.walk(stmt)):
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                names.add(node.id)
+        # Comprehension variables are local to their comprehension
+        for node in (n for stmt in body for n in ast.walk(stmt)):
+            if isinstance(node, ast.comprehension):
+                names -= {t.id for t in ast.walk(node.target) if isinstance(t, ast.Name)}
+        return names
+
+    @staticmethod
+    def _names_outside(function: ast.AST, loop: ast.AST) -> Set[str]:
+        inside = {id(n) for n in ast.walk(loop)}
+        return {n.id for n in ast.walk(function) if isinstance(n, ast.Name) and id(n) not in inside} | \
+               {a.arg for a in ast.walk(function) if isinstance(a, ast.arg)}
+
+    @staticmethod
+    def _mentions(node, name: str) -> int:
+        return sum(1 for n in ast.walk(node) if isinstance(n, ast.Name) and n.id == name)
+
+    def _reduction(self, name: str, body: List[ast.stmt]) -> Optional[str]:
+        ops, uses = set(), 0
+        for node in (n for stmt in body for n in ast.walk(stmt)):
+            if isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name) and node.target.id == name:
+                op = REDUCTION_OPS.get(type(node.op))
+                if op is None or self._mentions(node.value, name):
+                    return None
+                ops.add(op)
+                uses += 1
+            elif isinstance(node, ast.Assign) and isinstance(node.targets[0], ast.Name) and node.targets[0].id == name:
+                value = node.value
+                if not (isinstance(value, ast.Call) and isinstance(value.func, ast.Name)
+                        and value.func.id in ("min", "max") and len(value.args) == 2
+                        and isinstance(value.args[0], ast.Name) and value.args[0].id == name
+                        and not self._mentions(value.args[1], name)):
+                    return None
+                ops.add(value.func.id)
+                # The accumulator is read once, as min/max's first argument
+                uses += 2
+        if len(ops) != 1:
+            return None
+        # Every mention must belong to an update: no other iteration may observe a partial value
+        mentions = sum(self._mentions(stmt, name) for stmt in body)
+        return ops.pop() if mentions == uses else None
+
+    def _written_first(self, name: str, body: List[ast.stmt]) -> bool:
+        """True when the first top-level statement mentioning name assigns it without reading it."""
+        for stmt in body:
+            if not self._mentions(stmt, name):
+                continue
+            if isinstance(stmt, ast.Assign):
+                return stmt.targets[0].id == name and not self._mentions(stmt.value, name)
+            if isinstance(stmt, ast.For):
+                return isinstance(stmt.target, ast.Name) and stmt.target.id == name and not self._mentions(stmt.iter, name)
+            return False
+        return False
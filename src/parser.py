@@ -1,73 +1,256 @@
 import ast
 import inspect
+import mmap
+import os
+import re
+from bisect import bisect_right
 from dataclasses import dataclass, field
-from typing import List, Optional, Any
+from typing import List, Optional, Any, Tuple, Union
+
+# Same line terminators the tokenizer (and ast line numbers) recognise.
+_NEWLINE_RE = re.compile(r"\r\n?|\n")
+_NEWLINE_RE_BYTES = re.compile(rb"\r\n?|\n")
+
+class LineIndex:
+    """
+    Shared source buffer for one file plus its precomputed line-start offsets.
+
+    Built once per file so that node and line-range text can be sliced in
+    O(segment length), instead of re-splitting the whole source for every
+    node the way ast.get_source_segment does.
+
+    The buffer is either a str (offsets are characters) or a bytes-like
+    object such as a read-only mmap of the file (offsets are bytes, and
+    text is decoded only when sliced).
+    """
+    def __init__(self, source: Union[str, bytes, mmap.mmap]):
+        self.source = source
+        self._is_text = isinstance(source, str)
+        pattern = _NEWLINE_RE if self._is_text else _NEWLINE_RE_BYTES
+        self.line_starts = [0] + [m.end() for m in pattern.finditer(source)]
+        # ast column offsets are UTF-8 byte offsets; only non-ASCII text lines need converting.
+        self._ascii = not self._is_text or source.isascii()
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_starts)
+
+    def text(self, start: int, end: int) -> str:
+        """Materializes the buffer range [start, end) as a str."""
+        chunk = self.source[start:end]
+        return chunk if self._is_text else chunk.decode("utf-8")
+
+    def find(self, sub: str, start: int, end: int) -> int:
+        """Offset of sub within [start, end) of the buffer, or -1."""
+        return self.source.find(sub if self._is_text else sub.encode("utf-8"), start, end)
+
+    def line_of(self, offset: int) -> int:
+        """1-based line number containing the given buffer offset."""
+        return bisect_right(self.line_starts, offset)
+
+    def offset(self, lineno: int, col_offset: int = 0) -> int:
+        """Buffer offset of a 1-based line and a UTF-8 byte column."""
+        start = self.line_starts[lineno - 1]
+        if col_offset and not self._ascii:
+            line = self.source[start:self._line_end(lineno)]
+            if not line.isascii():
+                col_offset = len(line.encode("utf-8")[:col_offset].decode("utf-8", errors="ignore"))
+        return start + col_offset
+
+    def node_range(self, node: ast.AST) -> Optional[Tuple[int, int]]:
+        """Buffer range [start, end) covered by an AST node, or None without position info."""
+        try:
+            if node.end_lineno is None or node.end_col_offset is None:
+                return None
+            return (self.offset(node.lineno, node.col_offset),
+                    self.offset(node.end_lineno, node.end_col_offset))
+        except AttributeError:
+            return None
+
+    def node_segment(self, node: ast.AST) -> Optional[str]:
+        """Equivalent of ast.get_source_segment(source, node) without the re-split."""
+        span = self.node_range(node)
+        if span is None:
+            return None
+        return self.text(*span)
+
+    def line_range(self, start_line: int, end_line: int) -> Tuple[int, int]:
+        """Buffer range of lines start_line..end_line (1-based, inclusive) without the final newline."""
+        return self.line_starts[start_line - 1], self._line_end(end_line)
+
+    def line_span(self, start_line: int, end_line: int) -> str:
+        """Text of lines start_line..end_line (1-based, inclusive) without the final newline."""
+        return self.text(*self.line_range(start_line, end_line))
+
+    def _line_end(self, lineno: int) -> int:
+        # Offset just before the line terminator of the given line.
+        if lineno >= len(self.line_starts):
+            return len(self.source)
+        end = self.line_starts[lineno]
+        if self.source[end - 1:end] in ("\n", b"\n"):
+            end -= 1
+            if end > 0 and self.source[end - 1:end] in ("\r", b"\r"):
+                end -= 1
+        else:
+            end -= 1
+        return end
 
 @dataclass
 class SourceSegment:
-    """Represents a contiguous segment of code."""
+    """
+    Represents a contiguous segment of code.
+
+    The text is an offset range [start_offset, end_offset) into the file's
+    shared LineIndex buffer and is only materialized when `code` is read.
+    Segments built from free-standing text (no index) keep it in `text`.
+    """
     id: str
-    code: str
     start_line: int
     end_line: int
     ast_node: Optional[ast.AST] = None
     tags: List[str] = field(default_factory=list)
     complexity_score: float = 0.0
+    # Shared per-file buffer and line index; never copied per segment.
+    index: Optional[LineIndex] = field(default=None, repr=False, compare=False)
+    start_offset: int = 0
+    end_offset: int = 0
+    text: Optional[str] = field(default=None, repr=False)
+
+    @property
+    def code(self) -> str:
+        if self.text is not None:
+            return self.text
+        if self.index is None:
+            return ""
+        return self.index.text(self.start_offset, self.end_offset)
+
+    @property
+    def line_count(self) -> int:
+        return self.end_line - self.start_line + 1
+
+    @property
+    def size(self) -> int:
+        """Length of the segment text, without materializing it."""
+        if self.text is not None:
+            return len(self.text)
+        return self.end_offset - self.start_offset
+
+    def find_lines(self, needle: str) -> List[int]:
+        """Absolute line numbers of the lines containing needle, searched in place."""
+        if self.index is None or self.text is not None:
+            return [self.start_line + i for i, line in enumerate(self.code.splitlines()) if needle in line]
+        found = []
+        pos = self.index.find(needle, self.start_offset, self.end_offset)
+        while pos != -1:
+            lineno = self.index.line_of(pos)
+            found.append(lineno)
+            if lineno >= self.index.line_count:
+                break
+            pos = self.index.find(needle, self.index.line_starts[lineno], self.end_offset)
+        return found
+
+    def lines_view(self, start_line: int, end_line: int, id: str, tags: List[str]) -> "SourceSegment":
+        """
+        New segment covering absolute lines start_line..end_line of this one.
+        Shares the buffer when available; otherwise slices the stored text.
+        """
+        if self.index is not None and self.text is None:
+            start, end = self.index.line_range(start_line, end_line)
+            return SourceSegment(id=id, start_line=start_line, end_line=end_line, tags=tags,
+                                 index=self.index, start_offset=start, end_offset=end)
+        lines = self.code.splitlines()
+        text = "\n".join(lines[start_line - self.start_line:end_line - self.start_line + 1])
+        return SourceSegment(id=id, start_line=start_line, end_line=end_line, tags=tags, text=text)
 
 @dataclass
 class ParsedModule:
     """Represents the parsed source file structure."""
     path: str
-    source: str
+    index: LineIndex
     segments: List[SourceSegment] = field(default_factory=list)
 
+    @property
+    def source(self) -> str:
+        return self.index.text(0, len(self.index))
+
+    def close(self):
+        """
+        Releases a memory-mapped buffer. Segments still viewing it get their
+        text copied first, so they stay usable; a str buffer needs nothing.
+        """
+        if isinstance(self.index.source, mmap.mmap) and not self.index.source.closed:
+            for seg in self.segments:
+                if seg.text is None and seg.index is self.index:
+                    seg.text = seg.code
+            self.index.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 class CodeParser:
-    def __init__(self):
-        pass
+    def __init__(self, mmap_threshold: int = 8 * 1024 * 1024):
+        # Files at least this large are memory-mapped instead of read into a str.
+        self.mmap_threshold = mmap_threshold
 
     def parse_file(self, file_path: str) -> ParsedModule:
+        if os.path.getsize(file_path) >= self.mmap_threshold:
+            with open(file_path, 'rb') as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self.parse_buffer(buffer, file_path)
+
         with open(file_path, 'r', encoding='utf-8') as f:
             source = f.read()
-        
+
         return self.parse_source(source, file_path)
 
     def parse_source(self, source: str, file_path: str = "<string>") -> ParsedModule:
-        tree = ast.parse(source)
+        return self.parse_buffer(source, file_path)
+
+    def parse_buffer(self, source: Union[str, bytes, mmap.mmap], file_path: str = "<string>") -> ParsedModule:
+        # ast needs a contiguous str/bytes; the temporary copy is dropped after parsing.
+        tree = ast.parse(source if isinstance(source, (str, bytes)) else source[:])
         segments = []
-        
-        # We want to identify split candidates. 
+
+        # We want to identify split candidates.
         # For this V5, we treat every top-level function/class as a primary block,
         # and then we might split INSIDE those blocks if they are large.
         # Or we treat top-level statements as the atomic units.
-        
+
         # Let's go with a granular approach: Extract statements.
         # But to keep context, let's iterate top-level nodes.
-        
-        lines = source.splitlines()
-        
+
+        index = LineIndex(source)
+
         for i, node in enumerate(tree.body):
-            # Get source lines for this node
-            # ast.get_source_segment is available in Python 3.8+
-            segment_code = ast.get_source_segment(source, node)
-            if not segment_code:
+            # Segments reference the node's range in the shared buffer
+            span = index.node_range(node)
+            if not span or span[0] == span[1]:
                 continue
-                
+
             start_line = node.lineno
             end_line = node.end_lineno if hasattr(node, 'end_lineno') else start_line
-            
+
             seg = SourceSegment(
                 id=f"seg_{i}",
-                code=segment_code,
                 start_line=start_line,
                 end_line=end_line,
-                ast_node=node
+                ast_node=node,
+                index=index,
+                start_offset=span[0],
+                end_offset=span[1]
             )
-            
+
             # Calculate basic complexity
             seg.complexity_score = self._calculate_complexity(node)
             segments.append(seg)
-            
-        return ParsedModule(path=file_path, source=source, segments=segments)
+
+        return ParsedModule(path=file_path, index=index, segments=segments)
 
     def _calculate_complexity(self, node: ast.AST) -> float:
         # Simple heuristic: count nodes in the subtree
@@ -0,0 +1,114 @@
+import ast
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.parser import LineIndex
+from src.analyzer import FeatureAnalyzer, CodeFeatures
+from src.decision_engine import DecisionEngine, CostModel
+from src.call_graph import CallGraphBuilder, CallGraphIndex
+from src.neural_classifier import NeuralClassifier
+from src.polyglot import PolyglotTranspiler
+
+def split_segments(tree: ast.Module, source_code: str) -> List[dict]:
+    """Top-level functions and classes as segments; the whole module when it has none."""
+    index = LineIndex(source_code)
+    segments = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            seg_type = "class" if isinstance(node, ast.ClassDef) else "function"
+            segments.append({"ast": node, "code": index.node_segment(node), "type": seg_type, "name": node.name,
+                             "start_line": node.lineno, "end_line": node.end_lineno})
+    if not segments:
+        segments.append({"ast": tree, "code": source_code, "type": "module", "name": None,
+                         "start_line": 1, "end_line": index.line_count})
+    return segments
+
+def neural_vector(features: CodeFeatures) -> List[float]:
+    # [math, io, loops, conditionals, functions, classes, async, recursion, strings]
+    return [
+        features.math_ops, features.io_ops, features.loops,
+        features.conditionals, features.functions, features.classes,
+        features.async_ops, int(features.recursion), features.string_ops
+    ]
+
+class Pipeline:
+    """
+    The split, analysis and decision stages of main.py. The neural classifier
+    is built once per Pipeline, so a long-running process (see service.py)
+    pays for torch only at start-up. Safe to share between threads: every
+    call has its own analyzer and call graph, and inference is serialised.
+    """
+    def __init__(self, compiled_models: bool = False):
+        self.decision_engine = DecisionEngine(use_neural_fallback=True)
+        self.neural_net = NeuralClassifier(compiled=compiled_models)
+        self._predict_lock = threading.Lock()
+
+    def decide(self, features: CodeFeatures) -> dict:
+        """The language for one segment: {"lang", "score", "source", "scores"}."""
+        decision = self.decision_engine.decide(features)
+        if decision is None:
+            # Inconclusive -> Neural Net
+            with self._predict_lock:
+                best_lang, _ = self.neural_net.predict(neural_vector(features))
+            # NN doesn't return cost score same way
+            return {"lang": best_lang, "score": 0.0, "source": "NeuralNet", "scores": None}
+        best_lang, scores = decision
+        return {"lang": best_lang, "score": scores[best_lang], "source": "CostFunction", "scores": scores}
+
+    def analyze(self, source_code: str, module_name: str = "module",
+                other_modules: Optional[Dict[str, ast.Module]] = None,
+                assignment: str = "call-graph") -> List[dict]:
+        """
+        Splits, analyses and assigns a language to every segment of source_code.
+        other_modules join the module-wide call graph. With the "call-graph"
+        assignment, segments moved to avoid boundary crossings record the
+        language they were moved from in "moved_from".
+        """
+        tree = ast.parse(source_code)
+        segments = split_segments(tree, source_code)
+        # The module-wide call graph lets each segment see recursion, depth and
+        # hotness that only show up across segments (or modules)
+        call_index = CallGraphIndex()
+        call_index.index({**(other_modules or {}), module_name: tree})
+        analyzer = FeatureAnalyzer()
+
+        results = []
+        for seg in segments:
+            seg_start = time.perf_counter()
+            features = analyzer.analyze(seg["ast"])
+            call_index.annotate(features, module_name, seg["ast"])
+            features.vector_ops = PolyglotTranspiler.vector_ops(seg["code"])
+            decision = self.decide(features)
+            results.append({
+                "features": features,
+                "lang": decision["lang"],
+                "score": decision["score"],
+                "source": decision["source"],
+                "type": seg["type"],
+                "name": seg["name"],
+                "ast": seg["ast"],
+                "original": seg["code"],
+                "start_line": seg["start_line"],
+                "end_line": seg["end_line"],
+                "complexity": float(sum(1 for _ in ast.walk(seg["ast"]))),
+                "elapsed": time.perf_counter() - seg_start
+            })
+
+        if assignment == "call-graph":
+            # Whole-module pass: trade per-segment suitability against calls that
+            # would cross a language boundary
+            named = {res["name"]: res for res in results if res["name"]}
+            call_graph = CallGraphBuilder().build({name: res["ast"] for name, res in named.items()})
+            assigned = self.decision_engine.assign_module(
+                {name: res["features"] for name, res in named.items()}, call_graph,
+                initial={name: res["lang"] for name, res in named.items()}
+            )
+            for name, lang in assigned.items():
+                res = named[name]
+                if lang != res["lang"]:
+                    res["moved_from"] = res["lang"]
+                    res["lang"] = lang
+                    res["score"] = CostModel.calculate_score(res["features"], lang)
+                    res["source"] = "CallGraph"
+        return results
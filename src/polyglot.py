@@ -1,16 +1,109 @@
 import ast
+import copy
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from src.ir import (IRBuilder, IRConst, IRName, IRCast, IRBinary, IRCompare, IRUnary, IRLogical, Syntax,
+                    BINARY_NAMES, COMPARE_NAMES, C_OPERATORS, RUST_SYNTAX, CPP_SYNTAX, GO_SYNTAX, JAVA_SYNTAX)
+from src.optimizer import Optimizer
+from src.parallel_loops import LoopDependenceAnalyzer, PARALLEL_MIN_TRIP_COUNT
+from src.recursion import (RecursionTransformer, is_memoized, MEMO_SUFFIX, MEMO_ARG_TYPES, MEMO_RETURN_TYPES,
+                           MEMO_MAX_ARGS)
+from src.shared_memory import CPP_HELPERS, GO_HELPERS, GO_IMPORTS, JAVA_HELPERS, RUST_HELPERS
+from src.type_inference import (TypeInference, FunctionTypes, INT, FLOAT, BOOL, STR, NONE, UNKNOWN,
+                                is_list, element_type, join)
+
+# Languages whose functions can be built as C-ABI shared libraries
+SHARED_LIB_LANGS = ("Rust", "C++")
+
+# Pseudo-target that leaves a segment as the original Python (e.g. cold code)
+PYTHON_LANG = "Python"
+
+# Calls that exchange data through the runner's shared memory region
+SHM_INTRINSICS = ("shm_read", "shm_write")
+
+# Builtins lowered to native loops when applied to a comprehension or a list
+REDUCTIONS = ("sum", "min", "max", "any", "all")
+
+def uses_shared_memory(tree: ast.AST) -> bool:
+    return any(isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in SHM_INTRINSICS
+               for n in ast.walk(tree))
+
+@dataclass
+class NativeExport:
+    """A function exported with C linkage from a shared-library segment."""
+    name: str
+    args: List[Tuple[str, str]] = field(default_factory=list) # (name, abstract type)
+    returns: Optional[str] = None
 
 class PolyglotTranspiler:
     """
-    AST-based transpiler that translates Python code to Rust, C++, Go, and Java.
+    AST-based transpiler that translates Python code to Rust, C++, Go, and Java,
+    or to Python vectorised with NumPy.
     """
     
     @staticmethod
-    def transpile(code_segment: str, target_lang: str) -> str:
+    def transpile(code_segment: str, target_lang: str, parallel_threshold: int = PARALLEL_MIN_TRIP_COUNT) -> str:
+        return PolyglotTranspiler._transpile(code_segment, target_lang, False, parallel_threshold)[0]
+
+    @staticmethod
+    def transpile_shared(code_segment: str, target_lang: str,
+                         parallel_threshold: int = PARALLEL_MIN_TRIP_COUNT) -> Tuple[str, List[NativeExport]]:
+        """
+        Transpiles top-level functions with C linkage and no `main`, for building
+        a shared library (Rust cdylib / C++ -shared). Returns the code and its exports.
+        """
+        if target_lang not in SHARED_LIB_LANGS:
+            raise ValueError(f"Shared libraries are not supported for {target_lang}")
+        return PolyglotTranspiler._transpile(code_segment, target_lang, True, parallel_threshold)
+
+    @staticmethod
+    def transpile_all(code_segment: str, target_langs: List[str],
+                      parallel_threshold: int = PARALLEL_MIN_TRIP_COUNT) -> Dict[str, str]:
+        """
+        Transpiles one segment to several targets, e.g. to benchmark alternatives.
+        The segment is parsed, optimised, typed and lowered to the IR once; each
+        target only prints it.
+        """
+        tree, ir = PolyglotTranspiler._lower(code_segment)
+        return {lang: PolyglotTranspiler._emit(code_segment, tree, ir, lang, False, parallel_threshold)[0]
+                for lang in target_langs}
+
+    @staticmethod
+    def vector_ops(code_segment: str) -> int:
+        """Arithmetic operations of the segment that the NumPy target turns into array expressions."""
+        tree, ir = PolyglotTranspiler._lower(code_segment)
+        transpiler = NumpyTranspiler()
+        transpiler.types, transpiler.ir = ir.types, ir
+        transpiler.visit(tree)
+        return transpiler.vector_ops
+
+    @staticmethod
+    def _transpile(code_segment: str, target_lang: str, shared: bool,
+                   parallel_threshold: int = PARALLEL_MIN_TRIP_COUNT) -> Tuple[str, List[NativeExport]]:
+        if target_lang == PYTHON_LANG:
+            # Kept verbatim, so it need not be something the passes understand
+            return code_segment, []
+        tree, ir = PolyglotTranspiler._lower(code_segment)
+        return PolyglotTranspiler._emit(code_segment, tree, ir, target_lang, shared, parallel_threshold)
+
+    @staticmethod
+    def _lower(code_segment: str) -> Tuple[ast.AST, IRBuilder]:
+        """The target-independent work: parsing, the rewriting passes and type inference."""
         tree = ast.parse(code_segment)
+        # Both passes rewrite by inferred type; the backends then see the rewritten tree
+        tree = RecursionTransformer(TypeInference().infer(tree)).transform(tree)
+        tree = Optimizer(TypeInference().infer(tree)).optimize(tree)
+        return tree, IRBuilder(TypeInference().infer(tree))
+
+    @staticmethod
+    def _emit(code_segment: str, tree: ast.AST, ir: IRBuilder, target_lang: str, shared: bool,
+              parallel_threshold: int) -> Tuple[str, List[NativeExport]]:
         transpiler = None
-        
-        if target_lang == "Rust":
+
+        if target_lang == PYTHON_LANG:
+            return code_segment, []
+        elif target_lang == "Rust":
             transpiler = RustTranspiler()
         elif target_lang == "C++":
             transpiler = CppTranspiler()
@@ -18,17 +111,54 @@ class PolyglotTranspiler:
             transpiler = GoTranspiler()
         elif target_lang == "Java":
             transpiler = JavaTranspiler()
+        elif target_lang == "NumPy":
+            transpiler = NumpyTranspiler()
+            # Vectorisation rewrites the tree in place; other targets may still print it
+            tree = copy.deepcopy(tree)
             
         if transpiler:
-            return transpiler.visit(tree)
+            transpiler.shared = shared
+            transpiler.types = ir.types
+            transpiler.ir = ir
+            transpiler.parallel = LoopDependenceAnalyzer(parallel_threshold)
+            return transpiler.visit(tree), transpiler.exports
         
-        return f"// Transpiler for {target_lang} not implemented properly yet.\n" + code_segment
+        return f"// Transpiler for {target_lang} not implemented properly yet.\n" + code_segment, []
 
 class BaseTranspiler(ast.NodeVisitor):
+    # Backend spelling of the shared memory intrinsics; {t} is the dtype suffix
+    shm_read_call = "shm_read_{t}({name})"
+    shm_write_call = "shm_write_{t}({name}, {value})"
+    shm_suffixes = {"int64": "i64", "float64": "f64", "str": "str"}
+    # Native spellings of the inferred types; unknown types use the integer type
+    type_names = {INT: "i64", FLOAT: "f64", BOOL: "bool", STR: "String"}
+    list_type = "Vec<{}>"
+    cast_format = "({expr} as {type})"
+    # Types that cross a C ABI (shared libraries), as NativeExport abstract types
+    abi_types = {INT: "int64", FLOAT: "float64", BOOL: "bool"}
+    statement_end = ";"
+    # list.append(value) as a statement; None when the backend has no growable list,
+    # where appends are left as a marker that fails the build
+    append_format = None
+    # Spelling of the typed IR's operators and literals
+    ir_syntax = Syntax(C_OPERATORS)
+
     def __init__(self):
         self.buffer = []
         self.indent_level = 0
         self.scope_stack = [set()]
+        # Shared-library mode: C linkage for top-level functions and no main
+        self.shared = False
+        self.exports: List[NativeExport] = []
+        self.types = TypeInference()
+        # Expressions are lowered to the typed IR once and printed from it
+        self.ir = IRBuilder(self.types)
+        self.current_types = FunctionTypes("<module>")
+        self.current_class: Optional[str] = None
+        # Loops with independent iterations run on all cores where the backend supports it
+        self.parallel = LoopDependenceAnalyzer()
+        self.current_function: Optional[ast.AST] = None
+        self.in_parallel = False
     
     def indent(self):
         return "    " * self.indent_level
@@ -55,6 +185,257 @@ class BaseTranspiler(ast.NodeVisitor):
     def define_var(self, name):
         self.scope_stack[-1].add(name)
 
+    def native_type(self, t: Optional[str]) -> str:
+        if is_list(t):
+            return self.list_type.format(self.native_type(element_type(t)))
+        return self.type_names.get(t, self.type_names[INT])
+
+    def _type(self, node) -> Optional[str]:
+        return self.types.expr_type(node, self.current_types)
+
+    def _expr(self, node) -> str:
+        shm = self._shm_call(node)
+        if shm: return shm
+        return self._print(self.ir.lower(node, self.current_types))
+
+    def _print(self, ir) -> str:
+        """Prints an IR expression with the backend's ir_syntax; what the tables lack goes to _expr_ast."""
+        syntax = self.ir_syntax
+        if isinstance(ir, IRConst):
+            if isinstance(ir.value, bool):
+                return syntax.true if ir.value else syntax.false
+            return str(ir.value)
+        if isinstance(ir, IRName):
+            return ir.id
+        if isinstance(ir, IRCast):
+            return self.cast_format.format(expr=self._print(ir.operand), type=self.native_type(ir.type))
+        if isinstance(ir, IRBinary):
+            template = (syntax.float_formats.get(ir.op) if ir.type == FLOAT else None) or syntax.formats.get(ir.op)
+            if template is None and ir.op in syntax.operators:
+                template = f"({{left}} {syntax.operators[ir.op]} {{right}})"
+            if template is not None:
+                return template.format(left=self._print(ir.left), right=self._print(ir.right))
+        elif isinstance(ir, IRCompare):
+            return f"{self._print(ir.left)} {syntax.compare[ir.op]} {self._print(ir.right)}"
+        elif isinstance(ir, IRUnary):
+            operand = self._print(ir.operand)
+            # Comparisons bind looser than the prefix operators in every backend
+            return f"{syntax.unary[ir.op]}({operand})" if isinstance(ir.operand, IRCompare) else f"{syntax.unary[ir.op]}{operand}"
+        elif isinstance(ir, IRLogical):
+            return "(" + syntax.logical[ir.op].join(self._print(v) for v in ir.values) + ")"
+        return self._expr_ast(ir.source)
+
+    def _expr_ast(self, node) -> str:
+        """Emits the constructs the IR leaves opaque, straight from the Python AST."""
+        raise NotImplementedError
+
+    def _op(self, op) -> str:
+        name = BINARY_NAMES.get(type(op))
+        if name in self.ir_syntax.operators:
+            return self.ir_syntax.operators[name]
+        # Left in the output so the build fails instead of computing something else
+        return f"<unsupported operator {type(op).__name__}>"
+
+    def _compound_op(self, op, target_type: Optional[str]) -> Optional[str]:
+        """The infix symbol for `target op= value`, or None when the operator is spelled with a template."""
+        syntax, name = self.ir_syntax, BINARY_NAMES.get(type(op))
+        if name not in syntax.operators or name in syntax.formats or (
+                target_type == FLOAT and name in syntax.float_formats):
+            return None
+        return syntax.operators[name]
+
+    def _aug_value(self, node, target_type: Optional[str]) -> str:
+        """`target op value` as one expression, for augmented assignments with no compound form (e.g. **=)."""
+        load = copy.copy(node.target)
+        load.ctx = ast.Load()
+        return self._coerce(ast.copy_location(ast.BinOp(load, node.op, node.value), node), target_type)
+
+    def _compare_ast(self, node) -> str:
+        """Comparisons outside the IR (chains, identity, membership) keep only their first operator."""
+        op = self.ir_syntax.compare.get(COMPARE_NAMES.get(type(node.ops[0])), "==")
+        return f"{self._expr(node.left)} {op} {self._expr(node.comparators[0])}"
+
+    def _literal(self, node) -> str:
+        value = node.value
+        if isinstance(value, bool):
+            return "true" if value else "false"
+        if isinstance(value, str):
+            return f'"{value}"'
+        return str(value)
+
+    def _coerce(self, node, target: Optional[str]) -> str:
+        """Emits node converted to target where Python would have widened it implicitly."""
+        expr = self._expr(node)
+        source = self._type(node)
+        if target == FLOAT and source in (INT, BOOL):
+            if isinstance(node, ast.Constant):
+                return str(float(node.value))
+            return self.cast_format.format(expr=expr, type=self.native_type(FLOAT))
+        if target == INT and source == BOOL:
+            return self.cast_format.format(expr=expr, type=self.native_type(INT))
+        return expr
+
+    def _export(self, node) -> Optional[NativeExport]:
+        """The C signature of a top-level function, or None if a type cannot cross the ABI."""
+        ft = self.current_types
+        args = []
+        for arg in node.args.args:
+            if arg.arg == "self":
+                continue
+            abi = self.abi_types.get(ft.args.get(arg.arg) or INT)
+            if abi is None:
+                return None
+            args.append((arg.arg, abi))
+        returns = None
+        if ft.returns not in (None, NONE):
+            returns = self.abi_types.get(ft.returns)
+            if returns is None:
+                return None
+        return NativeExport(node.name, args, returns)
+
+    def _visit_memoized(self, node, visit) -> bool:
+        """
+        Emits a functools.cache function as its body, renamed with MEMO_SUFFIX,
+        plus a wrapper under the original name that caches results by argument.
+        Returns False (and emits nothing) when the cache cannot be native: methods,
+        shared libraries and non-int arguments keep the plain function.
+        """
+        ft = self.types.function(node.name, self.current_class)
+        params = [a.arg for a in node.args.args]
+        if (not is_memoized(node) or self.shared or self.current_class
+                or not params or len(params) > MEMO_MAX_ARGS or ft.returns not in MEMO_RETURN_TYPES
+                or any(ft.args.get(p) not in MEMO_ARG_TYPES for p in params)):
+            return False
+        name, uncached = node.name, node.name + MEMO_SUFFIX
+        self.types.functions[uncached] = ft
+        self._memo_declaration(name, params, ft)
+        decorators, node.decorator_list, node.name = node.decorator_list, [], uncached
+        try:
+            visit(node)
+        finally:
+            node.decorator_list, node.name = decorators, name
+        self._memo_wrapper(name, params, ft)
+        return True
+
+    def _memo_declaration(self, name: str, params: List[str], ft: FunctionTypes):
+        """Anything the backend needs before the uncached body can call the wrapper."""
+        pass
+
+    def _memo_wrapper(self, name: str, params: List[str], ft: FunctionTypes):
+        raise NotImplementedError
+
+    def _assigned_names(self, node, loops: bool = True):
+        names = set()
+        for child in ast.walk(node):
+            if not loops and isinstance(child, (ast.For, ast.AsyncFor, ast.comprehension)):
+                continue
+            targets = child.targets if isinstance(child, ast.Assign) else [getattr(child, "target", None)]
+            for target in targets:
+                if isinstance(target, ast.Name):
+                    names.add(target.id)
+        return names
+
+    def emit_block(self, text):
+        for line in text.strip("\n").splitlines():
+            self.emit(line)
+
+    def _shm_call(self, node):
+        """Translates shm_read(name, dtype) / shm_write(name, values, dtype), else None."""
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SHM_INTRINSICS):
+            return None
+        reading = node.func.id == "shm_read"
+        dtype_pos = 1 if reading else 2
+        dtype = "int64"
+        if len(node.args) > dtype_pos and isinstance(node.args[dtype_pos], ast.Constant):
+            dtype = node.args[dtype_pos].value
+        for kw in node.keywords:
+            if kw.arg == "dtype" and isinstance(kw.value, ast.Constant):
+                dtype = kw.value.value
+        t = self.shm_suffixes.get(dtype, self.shm_suffixes["int64"])
+        name = node.args[0]
+        name = f'"{name.value}"' if isinstance(name, ast.Constant) else self._expr(name)
+        if reading:
+            return self.shm_read_call.format(t=t, name=name)
+        return self.shm_write_call.format(t=t, name=name, value=self._expr(node.args[1]))
+
+    def _call_statement(self, node) -> Optional[str]:
+        """Statement form of calls every backend lowers (shm intrinsics, list.append)."""
+        call = self._shm_call(node)
+        if call:
+            return call + self.statement_end
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and node.func.attr == "append" and len(node.args) == 1):
+            container = node.func.value
+            if self.append_format is None:
+                # Lists are fixed-size arrays here; fail the build rather than drop the element
+                return f"<unsupported list.append on {ast.unparse(container)}>"
+            value = self._coerce(node.args[0], element_type(self._type(container)))
+            return self.append_format.format(obj=self._expr(container), value=value)
+        return None
+
+    def visit_Expr(self, node):
+        call = self._call_statement(node.value)
+        if call:
+            self.emit(call)
+
+    def visit_Break(self, node):
+        self.emit("break" + self.statement_end)
+
+    def visit_Continue(self, node):
+        self.emit("continue" + self.statement_end)
+
+    def _reduction(self, node):
+        """
+        For sum/min/max/any/all over a comprehension or an iterable, returns
+        (kind, comprehension); an iterable v is treated as (x for x in v).
+        Returns None for anything else, including min/max of several values.
+        """
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                and node.func.id in REDUCTIONS and len(node.args) == 1 and not node.keywords):
+            return None
+        arg = node.args[0]
+        if isinstance(arg, (ast.GeneratorExp, ast.ListComp)):
+            return node.func.id, arg
+        item = "_item"
+        elem = element_type(self._type(arg))
+        if elem is None:
+            return None
+        self.current_types.locals.setdefault(item, elem)
+        target = ast.Name(id=item, ctx=ast.Store())
+        comp = ast.GeneratorExp(elt=ast.Name(id=item, ctx=ast.Load()),
+                                generators=[ast.comprehension(target=target, iter=arg, ifs=[], is_async=0)])
+        return node.func.id, comp
+
+    @staticmethod
+    def _range_args(node):
+        """(start, stop, step) nodes for range(...) calls, else None."""
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "range"):
+            return None
+        args = node.args
+        if len(args) == 1:
+            return ast.Constant(0), args[0], None
+        return args[0], args[1], args[2] if len(args) > 2 else None
+
+    @staticmethod
+    def _negative_step(step) -> bool:
+        return (isinstance(step, ast.UnaryOp) and isinstance(step.op, ast.USub)) or \
+               (isinstance(step, ast.Constant) and isinstance(step.value, (int, float)) and step.value < 0)
+
+    def _parallel_loop(self, node):
+        """The loop's parallelisation, or None; loops nested in a parallel loop stay sequential."""
+        if self.in_parallel or self.current_function is None:
+            return None
+        return self.parallel.analyze(node, self.current_function)
+
+    @staticmethod
+    def _has_value_return(node) -> bool:
+        """Whether node returns a value; unknown return types then fall back to the numeric default."""
+        return any(isinstance(n, ast.Return) and n.value is not None for n in ast.walk(node))
+
+    @staticmethod
+    def _simple_targets(comp) -> bool:
+        return all(isinstance(gen.target, ast.Name) for gen in comp.generators)
+
     def visit_Module(self, node):
         for child in node.body:
             self.visit(child)
@@ -67,51 +448,102 @@ class BaseTranspiler(ast.NodeVisitor):
         pass
 
 class RustTranspiler(BaseTranspiler):
+    ir_syntax = RUST_SYNTAX
+    shm_write_call = "shm_write_{t}({name}, &{value})"
+    append_format = "{obj}.push({value});"
+
     def visit_Module(self, node):
         self.emit("// Transpiled to Rust")
+        if uses_shared_memory(node):
+            self.emit_block(RUST_HELPERS)
+            self.emit("")
         super().visit_Module(node)
+        if self.shared:
+            return
         self.emit("fn main() {")
         self.indent_level += 1
         for child in node.body:
             if isinstance(child, ast.FunctionDef):
                 if "heavy" in child.name:
                     self.emit(f'println!("Matrix Result: {{}}", {child.name}());')
-                if "recursive" in child.name:
+                if "recursive" in child.name and len(child.args.args) == 1:
                     self.emit(f'println!("Factorial(5): {{}}", {child.name}(5));')
-                if "collatz" in child.name:
+                if "collatz" in child.name and not child.args.args:
                     self.emit(f'println!("Collatz Sum: {{}}", {child.name}());')
         self.indent_level -= 1
         self.emit("}")
 
     def visit_FunctionDef(self, node):
+        if self._visit_memoized(node, self.visit_FunctionDef):
+            return
         self.enter_scope()
+        self.current_types = self.types.function(node.name, self.current_class)
+        reassigned = self._assigned_names(node)
         args = []
         for arg in node.args.args:
             if arg.arg == "self": continue
-            args.append(f"{arg.arg}: i32")
+            mut = "mut " if arg.arg in reassigned else ""
+            args.append(f"{mut}{arg.arg}: {self.native_type(self.current_types.args.get(arg.arg))}")
             self.define_var(arg.arg)
             
-        has_return = any(isinstance(n, ast.Return) or (isinstance(n, ast.If) and self._has_return(n)) for n in node.body)
-        rtype = " -> i32" if has_return else ""
+        has_return = self._has_return(node.body)
+        rtype = f" -> {self.native_type(self.current_types.returns)}" if has_return else ""
         
-        self.emit(f"fn {node.name}({', '.join(args)}){rtype} {{")
+        export = self._export(node) if self.shared and self.indent_level == 0 else None
+        if export:
+            self.exports.append(export)
+            self.emit("#[no_mangle]")
+            params = ", ".join(args)
+            self.emit(f'pub extern "C" fn {node.name}({params}){rtype} {{')
+        else:
+            self.emit(f"fn {node.name}({', '.join(args)}){rtype} {{")
         self.indent_level += 1
+        self.current_function = node
         for stmt in node.body:
             self.visit(stmt)
+        self.current_function = None
         self.indent_level -= 1
         self.emit("}")
         self.exit_scope()
+        self.current_types = FunctionTypes("<module>")
+
+    def _memo_wrapper(self, name, params, ft):
+        key_type = self.native_type(INT) if len(params) == 1 else f"({', '.join(self.native_type(INT) for _ in params)})"
+        key = params[0] if len(params) == 1 else f"({', '.join(params)})"
+        value_type = self.native_type(ft.returns)
+        args = ", ".join(f"{p}: {self.native_type(INT)}" for p in params)
+        self.emit(f"fn {name}({args}) -> {value_type} {{")
+        self.indent_level += 1
+        self.emit("thread_local! {")
+        self.emit(f"    static CACHE: std::cell::RefCell<std::collections::HashMap<{key_type}, {value_type}>> = "
+                  "std::cell::RefCell::new(std::collections::HashMap::new());")
+        self.emit("}")
+        self.emit(f"if let Some(hit) = CACHE.with(|cache| cache.borrow().get(&{key}).copied()) {{")
+        self.emit("    return hit;")
+        self.emit("}")
+        self.emit(f"let result = {name}{MEMO_SUFFIX}({', '.join(params)});")
+        self.emit(f"CACHE.with(|cache| cache.borrow_mut().insert({key}, result));")
+        self.emit("result")
+        self.indent_level -= 1
+        self.emit("}")
 
     def _has_return(self, node):
         if isinstance(node, ast.Return): return True
         if isinstance(node, ast.If):
              return self._has_return(node.body) or self._has_return(node.orelse)
+        if isinstance(node, (ast.While, ast.For)):
+             return self._has_return(node.body)
         if isinstance(node, list):
              return any(self._has_return(x) for x in node)
         return False
 
     def visit_Assign(self, node):
         target_node = node.targets[0]
+        if isinstance(target_node, ast.Subscript):
+            target = self._expr(target_node)
+            val = self._coerce(node.value, self._type(target_node))
+            self.emit(f"{target} = {val};")
+            return
         if isinstance(target_node, ast.Name):
             target = target_node.id
         elif isinstance(target_node, ast.Attribute):
@@ -120,65 +552,191 @@ class RustTranspiler(BaseTranspiler):
             self.emit(f"// Complex assignment skipped")
             return
             
-        is_float_div = False
-        if isinstance(node.value, ast.BinOp) and isinstance(node.value.op, ast.Div):
-            is_float_div = True
-            
-        val = self._expr(node.value)
+        target_type = self._type(target_node)
+        val = self._coerce(node.value, target_type)
         
         if not self.is_defined(target):
-            if is_float_div:
-                self.emit(f"let mut {target} = {val} as i32;")
-            else:
-                self.emit(f"let mut {target} = {val};")
+            self.emit(f"let mut {target}: {self.native_type(target_type)} = {val};")
             self.define_var(target)
         else:
-            if is_float_div:
-                 self.emit(f"{target} = {val} as i32;")
-            else:
-                 self.emit(f"{target} = {val};")
+            self.emit(f"{target} = {val};")
 
     def visit_AugAssign(self, node):
-        target = node.target.id
-        op = self._op(node.op)
-        val = self._expr(node.value)
+        target = self._expr(node.target)
+        target_type = self._type(node.target)
+        if target_type == STR:
+            self.emit(f"{target} += &{self._expr(node.value)};")
+            return
+        op = self._compound_op(node.op, target_type)
+        if op is None:
+            self.emit(f"{target} = {self._aug_value(node, target_type)};")
+            return
+        val = self._coerce(node.value, target_type)
         self.emit(f"{target} {op}= {val};")
 
     def visit_Return(self, node):
-        val = self._expr(node.value)
+        val = self._coerce(node.value, self.current_types.returns)
         self.emit(f"return {val};")
         
     def visit_For(self, node):
+        parallel = self._parallel_loop(node)
+        if parallel:
+            self._parallel_for(node, parallel)
+            return
         self.enter_scope()
         target = node.target.id
         self.define_var(target)
         
-        if isinstance(node.iter, ast.Call) and node.iter.func.id == 'range':
-            args = node.iter.args
-            if len(args) == 1:
-                limit = self._expr(args[0])
-                self.emit(f"for {target} in 0..{limit} {{")
-            elif len(args) == 2:
-                start = self._expr(args[0])
-                limit = self._expr(args[1])
-                self.emit(f"for {target} in {start}..{limit} {{")
-            self.indent_level += 1
-            for stmt in node.body:
-                self.visit(stmt)
-            self.indent_level -= 1
-            self.emit("}")
-        
-        # Handle while loops
-        elif isinstance(node, ast.While):
-             # visit_While handled separately but logic is similar scope-wise
-             pass
+        if self._range_args(node.iter) and len(node.iter.args) < 3:
+            start, stop, _ = self._range_args(node.iter)
+            self.emit(f"for {target} in {self._expr(start)}..{self._expr(stop)} {{")
+        else:
+            self.emit(f"for {target} in {self._iter(node.iter)} {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+        self.exit_scope()
+
+    def _identity(self, op: str, t: Optional[str]) -> str:
+        if op in ("min", "max"):
+            bound = "MAX" if op == "min" else "MIN"
+            if t == FLOAT:
+                return "f64::INFINITY" if op == "min" else "f64::NEG_INFINITY"
+            return f"{self.native_type(t)}::{bound}"
+        if op == "&":
+            return "!0"
+        zero, one = ("0.0", "1.0") if t == FLOAT else ("0", "1")
+        return one if op == "*" else zero
+
+    def _parallel_for(self, node, parallel):
+        """
+        Splits the range into one contiguous chunk per core, each reduced by a
+        scoped thread into its own partial results, which are combined in
+        order. Only the standard library is used.
+        """
+        start, stop, _ = self._range_args(node.iter)
+        reductions = sorted(parallel.reductions.items())
+        types = {name: self._type(ast.Name(id=name, ctx=ast.Load())) for name, _ in reductions}
+        partial_type = "(" + "".join(f"{self.native_type(types[name])}, " for name, _ in reductions) + ")"
+        self.emit("{")
+        self.indent_level += 1
+        self.emit(f"let par_lo: i64 = {self._expr(start)};")
+        self.emit(f"let par_hi: i64 = {self._expr(stop)};")
+        self.emit(f"let par_workers: i64 = if par_hi - par_lo >= {self.parallel.min_trip_count} "
+                  "{ std::thread::available_parallelism().map_or(1, |cores| cores.get()) as i64 } else { 1 };")
+        self.emit("let par_chunk: i64 = ((par_hi - par_lo).max(0) + par_workers - 1) / par_workers;")
+        # Workers borrow the containers and strings they read; scalars are copied
+        borrowed = sorted({n.id for n in ast.walk(ast.Module(node.body, [])) if isinstance(n, ast.Name)
+                           and self.is_defined(n.id) and n.id not in parallel.reductions
+                           and (is_list(self.current_types.var(n.id)) or self.current_types.var(n.id) == STR)})
+        for name in borrowed:
+            self.emit(f"let {name} = &{name};")
+        self.emit(f"let par_partials: Vec<{partial_type}> = std::thread::scope(|par_scope| {{")
+        self.indent_level += 1
+        self.emit("let handles: Vec<_> = (0..par_workers).map(|par_w| {")
+        self.indent_level += 1
+        self.emit("let par_start = par_lo + par_w * par_chunk;")
+        self.emit("let par_end = (par_start + par_chunk).min(par_hi);")
+        self.emit("par_scope.spawn(move || {")
+        self.indent_level += 1
+        self.enter_scope()
+        for name, op in reductions:
+            self.emit(f"let mut {name}: {self.native_type(types[name])} = {self._identity(op, types[name])};")
+            self.define_var(name)
+        self.define_var(node.target.id)
+        self.emit(f"for {node.target.id} in par_start..par_end {{")
+        self.indent_level += 1
+        self.in_parallel = True
+        for stmt in node.body:
+            self.visit(stmt)
+        self.in_parallel = False
+        self.indent_level -= 1
+        self.emit("}")
         self.exit_scope()
+        self.emit("(" + "".join(f"{name}, " for name, _ in reductions) + ")")
+        self.indent_level -= 1
+        self.emit("})")
+        self.indent_level -= 1
+        self.emit("}).collect();")
+        self.emit("handles.into_iter().map(|h| h.join().unwrap()).collect()")
+        self.indent_level -= 1
+        self.emit("});")
+        self.emit("for par_partial in par_partials {")
+        self.indent_level += 1
+        for k, (name, op) in enumerate(reductions):
+            if op in ("min", "max"):
+                self.emit(f"{name} = {name}.{op}(par_partial.{k});")
+            else:
+                self.emit(f"{name} {op}= par_partial.{k};")
+        self.indent_level -= 1
+        self.emit("}")
+        self.indent_level -= 1
+        self.emit("}")
+
+    def _iter(self, node) -> str:
+        """A Rust iterator yielding the values Python iterates over."""
+        rng = self._range_args(node)
+        if rng:
+            start, stop, step = (self._expr(a) if a is not None else None for a in rng)
+            if step is None:
+                return f"({start}..{stop})"
+            if self._negative_step(rng[2]):
+                magnitude = self._expr(rng[2].operand) if isinstance(rng[2], ast.UnaryOp) else str(-rng[2].value)
+                return f"(({stop} + 1)..={start}).rev().step_by(({magnitude}) as usize)"
+            return f"({start}..{stop}).step_by(({step}) as usize)"
+        t = self._type(node)
+        if t == STR:
+            return f"{self._expr(node)}.chars().map(|c| c.to_string())"
+        if element_type(t) in (INT, FLOAT, BOOL) or t is None:
+            return f"{self._expr(node)}.iter().copied()"
+        return f"{self._expr(node)}.iter().cloned()"
+
+    def _chain(self, generators, tail: str) -> str:
+        gen = generators[0]
+        target = gen.target.id
+        chain = self._iter(gen.iter)
+        pattern = f"&{target}" if self._type(gen.target) in (INT, FLOAT, BOOL) else target
+        for cond in gen.ifs:
+            chain += f".filter(|{pattern}| {self._expr(cond)})"
+        if len(generators) == 1:
+            return chain + tail
+        return f"{chain}.flat_map(|{target}| {self._chain(generators[1:], tail)})"
+
+    def _lower(self, kind: str, comp) -> str:
+        """Comprehensions and reductions as one iterator chain, with no intermediate Vec."""
+        elem = self._type(comp.elt)
+        last = comp.generators[-1].target.id
+        if kind in ("any", "all") and len(comp.generators) == 1:
+            # The predicate goes straight into any/all, which short-circuit
+            return f"{self._chain(comp.generators, '')}.{kind}(|{last}| {self._expr(comp.elt)})"
+        tail = ""
+        if not (isinstance(comp.elt, ast.Name) and comp.elt.id == last):
+            # Inner closures of nested generators outlive the outer loop variable
+            move = "move " if len(comp.generators) > 1 else ""
+            tail = f".map({move}|{last}| {self._expr(comp.elt)})"
+        chain = self._chain(comp.generators, tail)
+        if kind == "list":
+            return f"{chain}.collect::<{self.native_type(f'list[{elem}]')}>()"
+        if kind == "sum":
+            return f"{chain}.sum::<{self.native_type(elem)}>()"
+        if kind in ("min", "max"):
+            if elem == FLOAT:
+                start = "f64::INFINITY" if kind == "min" else "f64::NEG_INFINITY"
+                return f"{chain}.fold({start}, f64::{kind})"
+            return f"{chain}.{kind}().unwrap()"
+        return f"{chain}.{kind}(|b| b)"
 
     def visit_While(self, node):
         self.enter_scope()
         cond = self._expr(node.test)
-        # Python while n != 1 -> Rust while n != 1
-        self.emit(f"while {cond} {{")
+        # Python while n != 1 -> Rust while n != 1; `loop` lets rustc see that
+        # `while True` only leaves through its returns
+        if isinstance(node.test, ast.Constant) and node.test.value is True:
+            self.emit("loop {")
+        else:
+            self.emit(f"while {cond} {{")
         self.indent_level += 1
         for stmt in node.body:
             self.visit(stmt)
@@ -205,51 +763,97 @@ class RustTranspiler(BaseTranspiler):
             self.indent_level -= 1
         self.emit("}")
 
-    def _op(self, op):
-        if isinstance(op, ast.Add): return "+"
-        if isinstance(op, ast.Sub): return "-"
-        if isinstance(op, ast.Mult): return "*"
-        if isinstance(op, ast.Div): return "/"
-        if isinstance(op, ast.Mod): return "%"
-        return "?"
-
-    def _expr(self, node):
-        if isinstance(node, ast.Name): return node.id
-        elif isinstance(node, ast.Constant):
-            if isinstance(node.value, str): return f'"{node.value}"'
-            return str(node.value)
+    def _clone_arg(self, node):
+        # Strings and vectors are moved into calls; clone names so they stay usable
+        expr = self._expr(node)
+        if isinstance(node, ast.Name) and (self._type(node) == STR or is_list(self._type(node))):
+            return f"{expr}.clone()"
+        return expr
+
+    def _expr_ast(self, node):
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, str): return f'String::from("{node.value}")'
+            return self._literal(node)
         elif isinstance(node, ast.BinOp):
+            result = self._type(node)
+            if result == STR and isinstance(node.op, ast.Add):
+                return f'format!("{{}}{{}}", {self._expr(node.left)}, {self._expr(node.right)})'
+            if isinstance(node.op, ast.Mult) and isinstance(node.left, ast.List) and len(node.left.elts) == 1:
+                elem = self._coerce(node.left.elts[0], element_type(result))
+                return f"vec![{elem}; ({self._expr(node.right)}) as usize]"
             if isinstance(node.op, ast.Pow):
-                return f"i32::pow({self._expr(node.left)}, {self._expr(node.right)} as u32)"
-            if isinstance(node.op, ast.Div):
-                pass
+                if result == FLOAT:
+                    return f"({self._coerce(node.left, FLOAT)}).powf({self._coerce(node.right, FLOAT)})"
+                return f"i64::pow({self._expr(node.left)}, ({self._expr(node.right)}) as u32)"
             return f"({self._expr(node.left)} {self._op(node.op)} {self._expr(node.right)})"
+        elif isinstance(node, ast.List):
+            elem = element_type(self._type(node))
+            return "vec![" + ", ".join(self._coerce(e, elem) for e in node.elts) + "]"
+        elif isinstance(node, ast.Subscript):
+            index = node.slice
+            idx = self._expr(index) if isinstance(index, ast.Constant) else f"({self._expr(index)}) as usize"
+            return f"{self._expr(node.value)}[{idx}]"
+        elif isinstance(node, (ast.ListComp, ast.GeneratorExp)) and self._simple_targets(node):
+            return self._lower("list", node)
         elif isinstance(node, ast.Call):
+             reduction = self._reduction(node)
+             if reduction and self._simple_targets(reduction[1]):
+                  return self._lower(*reduction)
              if isinstance(node.func, ast.Name):
-                  args = ", ".join([self._expr(a) for a in node.args])
-                  return f"{node.func.id}({args})"
+                  name = node.func.id
+                  if name in ("min", "max") and len(node.args) > 1:
+                      common = self._type(node)
+                      result = self._coerce(node.args[0], common)
+                      for arg in node.args[1:]:
+                          result = f"({result}).{name}({self._coerce(arg, common)})"
+                      return result
+                  if name == "len" and node.args:
+                      return f"({self._expr(node.args[0])}.len() as i64)"
+                  if name in ("float", "int") and node.args:
+                      return self.cast_format.format(expr=self._expr(node.args[0]), type=self.native_type(self._type(node)))
+                  if name == "abs" and node.args:
+                      return f"({self._expr(node.args[0])}).abs()"
+                  if name == "str" and node.args:
+                      return f"({self._expr(node.args[0])}).to_string()"
+                  callee = self.types.functions.get(name)
+                  if callee:
+                      params = list(callee.args.values())
+                      args = ", ".join(self._coerce(a, params[i]) if i < len(params) and params[i] in (INT, FLOAT)
+                                       else self._clone_arg(a) for i, a in enumerate(node.args))
+                  else:
+                      args = ", ".join([self._expr(a) for a in node.args])
+                  return f"{name}({args})"
         elif isinstance(node, ast.Compare):
-             left = self._expr(node.left)
-             op = "<=" 
-             # Basic comparison op mapping
-             if isinstance(node.ops[0], ast.NotEq): op = "!="
-             elif isinstance(node.ops[0], ast.Eq): op = "=="
-             elif isinstance(node.ops[0], ast.Lt): op = "<"
-             elif isinstance(node.ops[0], ast.Gt): op = ">"
-             elif isinstance(node.ops[0], ast.GtE): op = ">="
-             
-             right = self._expr(node.comparators[0])
-             return f"{left} {op} {right}"
+             return self._compare_ast(node)
         return "0"
 
 class CppTranspiler(BaseTranspiler):
+    ir_syntax = CPP_SYNTAX
+    type_names = {INT: "int64_t", FLOAT: "double", BOOL: "bool", STR: "string"}
+    list_type = "vector<{}>"
+    cast_format = "static_cast<{type}>({expr})"
+    append_format = "{obj}.push_back({value});"
+
     def visit_Module(self, node):
         self.emit("// Transpiled to C++")
+        self.emit("#include <algorithm>")
         self.emit("#include <iostream>")
         self.emit("#include <cmath>")
+        self.emit("#include <stdexcept>")
+        self.emit("#include <cstdint>")
+        self.emit("#include <string>")
         self.emit("#include <vector>")
+        if any(is_memoized(child) for child in node.body):
+            self.emit("#include <map>")
+            self.emit("#include <tuple>")
+            self.emit("#include <unordered_map>")
         self.emit("using namespace std;")
+        if uses_shared_memory(node):
+            self.emit_block(CPP_HELPERS)
+            self.emit("")
         super().visit_Module(node)
+        if self.shared:
+            return
         self.emit("int main() {")
         self.indent_level += 1
         for child in node.body:
@@ -265,26 +869,81 @@ class CppTranspiler(BaseTranspiler):
         self.emit("}")
 
     def visit_FunctionDef(self, node):
+        if self._visit_memoized(node, self.visit_FunctionDef):
+            return
+        self.current_types = self.types.function(node.name, self.current_class)
+        ft = self.current_types
         args = []
         for arg in node.args.args:
-            args.append(f"int {arg.arg}")
-        self.emit(f"int {node.name}({', '.join(args)}) {{")
+            args.append(f"{self.native_type(ft.args.get(arg.arg))} {arg.arg}")
+        returns_value = ft.returns not in (None, NONE) or self._has_value_return(node)
+        rtype = self.native_type(ft.returns) if returns_value else "void"
+        export = self._export(node) if self.shared and self.indent_level == 0 else None
+        if export:
+            self.exports.append(export)
+            params = ", ".join(args)
+            self.emit(f'extern "C" {rtype} {node.name}({params}) {{')
+        else:
+            self.emit(f"{rtype} {node.name}({', '.join(args)}) {{")
         self.indent_level += 1
+        # Locals are hoisted so Python's function scoping survives C++ block scoping;
+        # loop and comprehension variables are declared by their loops
+        assigned = self._assigned_names(node, loops=False)
+        self.hoisted = set()
+        for name, t in ft.locals.items():
+            if name not in ft.args and name in assigned:
+                self.emit(f"{self.native_type(t)} {name}{{}};")
+                self.hoisted.add(name)
+        self.current_function = node
         for stmt in node.body:
             self.visit(stmt)
+        self.current_function = None
+        self.indent_level -= 1
+        if returns_value:
+            # Ensure all paths return - this was the fix for warnings/garbage logic
+            self.emit("return {}; // Fallback")
+        self.emit("}")
+        self.current_types = FunctionTypes("<module>")
+
+    def _memo_signature(self, name, params, ft) -> str:
+        args = ", ".join(f"{self.native_type(INT)} {p}" for p in params)
+        return f"{self.native_type(ft.returns)} {name}({args})"
+
+    def _memo_declaration(self, name, params, ft):
+        # The uncached body calls the wrapper, which is defined after it
+        self.emit(self._memo_signature(name, params, ft) + ";")
+
+    def _memo_wrapper(self, name, params, ft):
+        value_type = self.native_type(ft.returns)
+        if len(params) == 1:
+            cache_type, key = f"unordered_map<{self.native_type(INT)}, {value_type}>", params[0]
+        else:
+            key_type = f"tuple<{', '.join(self.native_type(INT) for _ in params)}>"
+            cache_type, key = f"map<{key_type}, {value_type}>", f"make_tuple({', '.join(params)})"
+        self.emit(self._memo_signature(name, params, ft) + " {")
+        self.indent_level += 1
+        self.emit(f"static {cache_type} cache;")
+        self.emit(f"auto key = {key};")
+        self.emit("auto hit = cache.find(key);")
+        self.emit("if (hit != cache.end()) return hit->second;")
+        self.emit(f"{value_type} result = {name}{MEMO_SUFFIX}({', '.join(params)});")
+        self.emit("cache.emplace(key, result);")
+        self.emit("return result;")
         self.indent_level -= 1
-        # Ensure all paths return - this was the fix for warnings/garbage logic
-        self.emit("return 0; // Fallback")
         self.emit("}")
 
     def visit_Return(self, node):
-        val = self._expr(node.value)
+        if node.value is None:
+            self.emit("return;")
+            return
+        val = self._coerce(node.value, self.current_types.returns)
         self.emit(f"return {val};")
 
     def visit_Assign(self, node):
         target_node = node.targets[0]
+        target_type = self._type(target_node)
         is_subscript = isinstance(target_node, ast.Subscript)
-        val = self._expr(node.value)
+        val = self._coerce(node.value, target_type)
         if is_subscript:
              target = self._expr(target_node)
              self.emit(f"{target} = {val};")
@@ -294,15 +953,112 @@ class CppTranspiler(BaseTranspiler):
         else:
             self.emit(f"// Complex assignment skipped")
             return
-        if isinstance(node.value, ast.BinOp) and isinstance(node.value.left, ast.List):
+        if isinstance(node.value, ast.BinOp) and isinstance(node.value.left, ast.List) and node.value.left.elts:
              size_expr = self._expr(node.value.right)
-             self.emit(f"vector<int> {target}({size_expr}, 0);")
+             fill = self._coerce(node.value.left.elts[0], element_type(target_type))
+             self.emit(f"{target}.assign({size_expr}, {fill});")
              return
-        self.emit(f"int {target} = {val};")
+        self.emit(f"{target} = {val};")
+
+    def visit_AugAssign(self, node):
+        target = self._expr(node.target)
+        target_type = self._type(node.target)
+        op = self._compound_op(node.op, target_type)
+        if op is None:
+            self.emit(f"{target} = {self._aug_value(node, target_type)};")
+            return
+        self.emit(f"{target} {op}= {self._coerce(node.value, target_type)};")
 
     def visit_Subscript(self, node):
         return f"{self._expr(node.value)}[{self._expr(node.slice)}]"
 
+    def _loop_header(self, target: str, iter_node) -> str:
+        rng = self._range_args(iter_node)
+        if rng:
+            start, stop, step = rng
+            decl = f"for ({self.native_type(INT)} {target} = {self._expr(start)};"
+            if step is None:
+                return f"{decl} {target} < {self._expr(stop)}; ++{target})"
+            cmp = ">" if self._negative_step(step) else "<"
+            return f"{decl} {target} {cmp} {self._expr(stop)}; {target} += {self._expr(step)})"
+        return f"for (auto {target} : {self._expr(iter_node)})"
+
+    def visit_For(self, node):
+        if not isinstance(node.target, ast.Name):
+            self.emit("// Complex loop target skipped")
+            return
+        parallel = self._parallel_loop(node)
+        if parallel:
+            self.emit(self._omp_pragma(parallel, node.iter))
+        self.emit(f"{self._loop_header(node.target.id, node.iter)} {{")
+        self.indent_level += 1
+        self.in_parallel = self.in_parallel or parallel is not None
+        for stmt in node.body:
+            self.visit(stmt)
+        if parallel:
+            self.in_parallel = False
+        self.indent_level -= 1
+        self.emit("}")
+
+    def _omp_pragma(self, parallel, iter_node) -> str:
+        """OpenMP work sharing for a loop; without -fopenmp the pragma is ignored and the loop runs serially."""
+        clauses = [f"reduction({op}:{name})" for name, op in sorted(parallel.reductions.items())]
+        # Hoisted locals are function-scoped, so each thread needs its own copy
+        private = sorted(parallel.private & self.hoisted)
+        if private:
+            clauses.append(f"private({', '.join(private)})")
+        if parallel.trip_count is None:
+            start, stop, _ = self._range_args(iter_node)
+            clauses.append(f"if({self._expr(stop)} - {self._expr(start)} >= {self.parallel.min_trip_count})")
+        return f"#pragma omp parallel for {' '.join(clauses)}"
+
+    def visit_While(self, node):
+        self.emit(f"while ({self._expr(node.test)}) {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+
+    def _lower(self, kind: str, comp) -> str:
+        """
+        Comprehensions and reductions as loops inside an immediately invoked
+        lambda: lists are reserved up front, reductions never build a vector.
+        """
+        elem = self._type(comp.elt)
+        t = self.native_type(elem)
+        elt = self._expr(comp.elt)
+        reserve, check = "", ""
+        if kind == "list":
+            init = f"{self.list_type.format(t)} out; "
+            gen = comp.generators[0]
+            rng = self._range_args(gen.iter)
+            if len(comp.generators) == 1 and rng and rng[2] is None:
+                reserve = f"out.reserve(max<{self.native_type(INT)}>(0, {self._expr(rng[1])} - {self._expr(rng[0])})); "
+            elif len(comp.generators) == 1 and not rng:
+                reserve = f"out.reserve({self._expr(gen.iter)}.size()); "
+            body, result = f"out.push_back({elt});", "out"
+        elif kind == "sum":
+            init, body, result = f"{t} acc = 0; ", f"acc += {elt};", "acc"
+        elif kind in ("min", "max"):
+            better = "<" if kind == "min" else ">"
+            init = f"{t} acc{{}}; bool first = true; "
+            body = f"{t} v = {elt}; if (first || v {better} acc) {{ acc = v; first = false; }}"
+            result = "acc"
+            # Python raises ValueError rather than inventing a value
+            check = f'if (first) throw invalid_argument("{kind}() arg is an empty sequence"); '
+        elif kind == "any":
+            init, body, result = "", f"if ({elt}) return true;", "false"
+        else:
+            init, body, result = "", f"if (!({elt})) return false;", "true"
+        loops, closing = "", ""
+        for gen in comp.generators:
+            loops += f"{self._loop_header(gen.target.id, gen.iter)} {{ "
+            for cond in gen.ifs:
+                loops += f"if (!({self._expr(cond)})) continue; "
+            closing += "} "
+        return f"[&]() {{ {init}{reserve}{loops}{body} {closing}{check}return {result}; }}()"
+
     def visit_If(self, node):
         cond = self._expr(node.test)
         self.emit(f"if ({cond}) {{")
@@ -318,84 +1074,479 @@ class CppTranspiler(BaseTranspiler):
             self.indent_level -= 1
         self.emit("}")
         
-    def _op_cmp(self, op):
-        if isinstance(op, ast.Eq): return "=="
-        if isinstance(op, ast.NotEq): return "!="
-        if isinstance(op, ast.Lt): return "<"
-        if isinstance(op, ast.LtE): return "<="
-        if isinstance(op, ast.Gt): return ">"
-        if isinstance(op, ast.GtE): return ">="
-        return "=="
-
-    def _expr(self, node):
-        if isinstance(node, ast.Name): return node.id
-        if isinstance(node, ast.Constant): return str(node.value)
+    def _expr_ast(self, node):
+        if isinstance(node, ast.Constant): return self._literal(node)
         if isinstance(node, ast.BinOp):
-             if isinstance(node.op, ast.Mult): op = "*"
-             elif isinstance(node.op, ast.Sub): op = "-"
-             elif isinstance(node.op, ast.Add): op = "+"
-             else: op = "+"
-             return f"{self._expr(node.left)} {op} {self._expr(node.right)}"
+             result = self._type(node)
+             if result == STR and isinstance(node.op, ast.Add):
+                 left = self._expr(node.left)
+                 if isinstance(node.left, ast.Constant):
+                     left = f"string({left})"
+                 return f"({left} + {self._expr(node.right)})"
+             if isinstance(node.op, ast.Pow):
+                 power = f"pow({self._expr(node.left)}, {self._expr(node.right)})"
+                 return power if result == FLOAT else self.cast_format.format(expr=power, type=self.native_type(INT))
+             return f"({self._expr(node.left)} {self._op(node.op)} {self._expr(node.right)})"
         if isinstance(node, ast.Compare):
-             op = self._op_cmp(node.ops[0])
-             return f"{self._expr(node.left)} {op} {self._expr(node.comparators[0])}"
+             return self._compare_ast(node)
+        if isinstance(node, (ast.ListComp, ast.GeneratorExp)) and self._simple_targets(node):
+             return self._lower("list", node)
         if isinstance(node, ast.Call):
-             args = ", ".join([self._expr(a) for a in node.args])
-             return f"{node.func.id}({args})"
+             reduction = self._reduction(node)
+             if reduction and self._simple_targets(reduction[1]):
+                 return self._lower(*reduction)
+             name = getattr(node.func, "id", None)
+             if name in ("min", "max") and len(node.args) > 1:
+                 common = self._type(node)
+                 args = ", ".join(self._coerce(a, common) for a in node.args)
+                 return f"{name}<{self.native_type(common)}>({{{args}}})"
+             if name == "len" and node.args:
+                 return self.cast_format.format(expr=f"{self._expr(node.args[0])}.size()", type=self.native_type(INT))
+             if name in ("float", "int") and node.args:
+                 return self.cast_format.format(expr=self._expr(node.args[0]), type=self.native_type(self._type(node)))
+             if name == "str" and node.args:
+                 arg = self._expr(node.args[0])
+                 return arg if self._type(node.args[0]) == STR else f"to_string({arg})"
+             callee = self.types.functions.get(name)
+             params = list(callee.args.values()) if callee else []
+             args = ", ".join(self._coerce(a, params[i] if i < len(params) else None) for i, a in enumerate(node.args))
+             return f"{name}({args})"
         if isinstance(node, ast.Subscript):
              return f"{self._expr(node.value)}[{self._expr(node.slice)}]"
+        if isinstance(node, ast.List):
+             elem = element_type(self._type(node))
+             return "{" + ", ".join(self._coerce(e, elem) for e in node.elts) + "}"
         return "0"
 
 class GoTranspiler(BaseTranspiler):
+    ir_syntax = GO_SYNTAX
+    shm_read_call = "shmRead{t}({name})"
+    shm_write_call = "shmWrite{t}({name}, {value})"
+    shm_suffixes = {"int64": "I64", "float64": "F64", "str": "Str"}
+    # Go's int is 64-bit on every supported 64-bit platform and is what := infers
+    type_names = {INT: "int", FLOAT: "float64", BOOL: "bool", STR: "string"}
+    list_type = "[]{}"
+    cast_format = "{type}({expr})"
+    statement_end = ""
+    append_format = "{obj} = append({obj}, {value})"
+    # Buffer of the channels standing in for asyncio.Queue() and async generators,
+    # which Python leaves unbounded
+    queue_capacity = 1024
+    QUEUE_OPS = ("put", "put_nowait", "get", "get_nowait", "task_done", "join")
+
     def visit_Module(self, node):
         self.emit("// Transpiled to Go")
         self.emit("package main")
-        self.emit('import "fmt"')
-        self.emit('import "time"')
+        # Go rejects unused imports, so they are collected while emitting
+        self.imports = set()
+        self.generators = {n.name for n in node.body if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+                           and any(isinstance(c, ast.Yield) for c in ast.walk(n))}
+        self.temp_count = 0
+        self.queues, self.tasks, self.received = set(), {}, set()
+        self.in_generator = False
+        import_at = len(self.buffer)
+        if uses_shared_memory(node):
+            self.imports.update(GO_IMPORTS)
+            self.emit_block(GO_HELPERS)
         self.emit("")
         super().visit_Module(node)
         self.emit("func main() {")
         self.indent_level += 1
         for child in node.body:
             if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                if "log" in child.name:
+                if "log" in child.name and not child.args.args:
                     self.emit(f"{child.name}()")
         self.indent_level -= 1
         self.emit("}")
+        self.buffer[import_at:import_at] = [f'import "{imp}"' for imp in sorted(self.imports)]
 
-    def visit_AsyncFunctionDef(self, node):
-        self.emit(f"func {node.name}() {{")
+    def visit_FunctionDef(self, node):
+        # Go functions have no sync/async distinction
+        if not self._visit_memoized(node, self.visit_AsyncFunctionDef):
+            self.visit_AsyncFunctionDef(node)
+
+    def _memo_wrapper(self, name, params, ft):
+        int_type, value_type = self.native_type(INT), self.native_type(ft.returns)
+        if len(params) == 1:
+            key_type, key = int_type, params[0]
+        else:
+            # Arrays are comparable, so they can key a map directly
+            key_type = f"[{len(params)}]{int_type}"
+            key = f"{key_type}{{{', '.join(params)}}}"
+        # Goroutines (e.g. from asyncio.gather) share the cache; the lock is not
+        # held across the uncached call, which recurses through this wrapper
+        self.imports.add("sync")
+        cache, lock = f"{name}Cache", f"{name}CacheMu"
+        self.emit(f"var {cache} = map[{key_type}]{value_type}{{}}")
+        self.emit(f"var {lock} sync.Mutex")
+        self.emit(f"func {name}({', '.join(params)} {int_type}) {value_type} {{")
         self.indent_level += 1
+        self.emit(f"key := {key}")
+        self.emit(f"{lock}.Lock()")
+        self.emit(f"hit, ok := {cache}[key]")
+        self.emit(f"{lock}.Unlock()")
+        self.emit("if ok {")
+        self.emit("    return hit")
+        self.emit("}")
+        self.emit(f"result := {name}{MEMO_SUFFIX}({', '.join(params)})")
+        self.emit(f"{lock}.Lock()")
+        self.emit(f"{cache}[key] = result")
+        self.emit(f"{lock}.Unlock()")
+        self.emit("return result")
+        self.indent_level -= 1
+        self.emit("}")
+
+    def visit_ClassDef(self, node):
+        # Methods are not lowered to Go; classes are routed to the object-oriented backends
+        pass
+
+    def visit_AsyncFunctionDef(self, node):
+        self.enter_scope()
+        self.current_types = self.types.function(node.name, self.current_class)
+        self.queues = {c.func.value.id for c in ast.walk(node) if isinstance(c, ast.Call)
+                       and isinstance(c.func, ast.Attribute) and isinstance(c.func.value, ast.Name)
+                       and c.func.value.id != "asyncio" and c.func.attr in self.QUEUE_OPS}
+        self.queues |= {t.id for a in ast.walk(node) if isinstance(a, ast.Assign) and self._asyncio_call(a.value, "Queue")
+                        for t in a.targets if isinstance(t, ast.Name)}
+        self.tasks, self.received = {}, set()
+        # Items compared against None come from a queue closed by its sentinel
+        self.none_checked = {c.left.id for c in ast.walk(node) if isinstance(c, ast.Compare)
+                             and isinstance(c.left, ast.Name) and isinstance(c.ops[0], (ast.Is, ast.IsNot))}
+        args = []
+        for arg in node.args.args:
+            args.append(f"{arg.arg} {self._var_type(arg.arg, self.current_types.args.get(arg.arg))}")
+            self.define_var(arg.arg)
+        returns = self.current_types.returns
+        self.in_generator = node.name in self.generators
+        if self.in_generator:
+            # Async generators become a goroutine streaming into the returned channel
+            elem = self.native_type(element_type(returns))
+            self.emit(f"func {node.name}({', '.join(args)}) <-chan {elem} {{")
+            self.indent_level += 1
+            self.emit(f"yieldCh := make(chan {elem}, {self.queue_capacity})")
+            self.emit("go func() {")
+            self.indent_level += 1
+            self.emit("defer close(yieldCh)")
+        else:
+            returns_value = returns not in (None, NONE) or self._has_value_return(node)
+            rtype = f" {self.native_type(returns)}" if returns_value else ""
+            self.emit(f"func {node.name}({', '.join(args)}){rtype} {{")
+            self.indent_level += 1
         for stmt in node.body:
             self.visit(stmt)
+        if self.in_generator:
+            self.indent_level -= 1
+            self.emit("}()")
+            self.emit("return yieldCh")
         self.indent_level -= 1
         self.emit("}")
+        self.exit_scope()
+        self.in_generator = False
+        self.current_types = FunctionTypes("<module>")
+
+    def _var_type(self, name: str, t) -> str:
+        if name in self.queues:
+            return f"chan {self.native_type(element_type(t))}"
+        return self.native_type(t)
+
+    @staticmethod
+    def _asyncio_call(node, *attrs) -> bool:
+        return (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id == "asyncio"
+                and node.func.attr in attrs)
+
+    def _queue_call(self, node, *attrs):
+        """Returns the queue name when node is queue.<attr>(...) on a known queue."""
+        if (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)
+                and isinstance(node.func.value, ast.Name) and node.func.value.id in self.queues
+                and node.func.attr in attrs):
+            return node.func.value.id
+        return None
+
+    def _temp(self) -> int:
+        self.temp_count += 1
+        return self.temp_count
+
+    def _spawn(self, body: List[str], params: str = "", args: str = ""):
+        self.emit(f"go func({params}) {{")
+        self.indent_level += 1
+        for line in body:
+            self.emit(line)
+        self.indent_level -= 1
+        self.emit(f"}}({args})")
+
+    def _gather(self, call, targets: Optional[List[str]]):
+        """
+        Runs every awaitable of asyncio.gather in its own goroutine. Results are
+        collected through one buffered channel per call, received in argument
+        order; when no result is kept a sync.WaitGroup waits for completion.
+        """
+        n = self._temp()
+        spread = (len(call.args) == 1 and isinstance(call.args[0], ast.Starred)
+                  and isinstance(call.args[0].value, (ast.ListComp, ast.GeneratorExp))
+                  and len(call.args[0].value.generators) == 1
+                  and isinstance(call.args[0].value.generators[0].target, ast.Name))
+        jobs = [call.args[0].value.elt] if spread else call.args
+        elem = None
+        for job in jobs:
+            elem = join(elem, self._type(job))
+        keep = targets is not None and elem not in (None, NONE)
+        t = self.native_type(elem)
+        if spread:
+            comp = call.args[0].value
+            gen = comp.generators[0]
+            var = gen.target.id
+            var_t = self.native_type(element_type(self._type(gen.iter)))
+            if not keep:
+                self.imports.add("sync")
+                self.emit(f"var wg{n} sync.WaitGroup")
+            else:
+                self.emit(f"futures{n} := make([]chan {t}, 0)")
+            self.emit(f"{self._loop_header(var, gen.iter)} {{")
+            self.indent_level += 1
+            for cond in gen.ifs:
+                self.emit(f"if !({self._expr(cond)}) {{ continue }}")
+            if not keep:
+                self.emit(f"wg{n}.Add(1)")
+                self._spawn([f"defer wg{n}.Done()", self._expr(comp.elt)], f"{var} {var_t}", var)
+            else:
+                self.emit(f"future := make(chan {t}, 1)")
+                self._spawn([f"future <- {self._coerce(comp.elt, elem)}"], f"{var} {var_t}", var)
+                self.emit(f"futures{n} = append(futures{n}, future)")
+            self.indent_level -= 1
+            self.emit("}")
+            if not keep:
+                self.emit(f"wg{n}.Wait()")
+                return
+            self._bind(targets[0], f"make([]{t}, len(futures{n}))")
+            self.emit(f"for k, future := range futures{n} {{")
+            self.emit(f"    {targets[0]}[k] = <-future")
+            self.emit("}")
+            return
+        received = []
+        if not keep:
+            spawned = [job for job in jobs if not (isinstance(job, ast.Name) and job.id in self.tasks)]
+            if spawned:
+                self.imports.add("sync")
+                self.emit(f"var wg{n} sync.WaitGroup")
+                self.emit(f"wg{n}.Add({len(spawned)})")
+            for job in jobs:
+                if job in spawned:
+                    self._spawn([f"defer wg{n}.Done()", self._expr(job)])
+                else:
+                    self.emit(f"<-{job.id}")
+            if spawned:
+                self.emit(f"wg{n}.Wait()")
+            return
+        for k, job in enumerate(jobs):
+            if isinstance(job, ast.Name) and job.id in self.tasks:
+                received.append(f"<-{job.id}")
+                continue
+            self.emit(f"future{n}_{k} := make(chan {t}, 1)")
+            self._spawn([f"future{n}_{k} <- {self._coerce(job, elem)}"])
+            received.append(f"<-future{n}_{k}")
+        if len(targets) == len(received) and len(targets) > 1:
+            for target, value in zip(targets, received):
+                self._bind(target, value)
+        else:
+            self._bind(targets[0], f"[]{t}{{{', '.join(received)}}}")
+
+    def _bind(self, target: str, value: str):
+        if self.is_defined(target):
+            self.emit(f"{target} = {value}")
+        else:
+            self.emit(f"{target} := {value}")
+            self.define_var(target)
+
+    def _create_task(self, target: str, call):
+        """A task is a goroutine reporting its result (or completion) on a one-slot channel."""
+        coro = call.args[0]
+        t = self._type(coro)
+        if t in (None, NONE):
+            self.tasks[target] = True
+            self._bind(target, "make(chan struct{})")
+            self._spawn([self._expr(coro), f"close({target})"])
+        else:
+            self.tasks[target] = False
+            self._bind(target, f"make(chan {self.native_type(t)}, 1)")
+            self._spawn([f"{target} <- {self._expr(coro)}"])
+
+    def _async_statement(self, value) -> Optional[str]:
+        """Go statement for an asyncio expression statement, or None when value is not one."""
+        awaited = value.value if isinstance(value, ast.Await) else value
+        if self._asyncio_call(awaited, "create_task", "ensure_future"):
+            return f"go {self._expr(awaited.args[0])}"
+        queue = self._queue_call(awaited, "put", "put_nowait")
+        if queue:
+            item = awaited.args[0]
+            if isinstance(item, ast.Constant) and item.value is None:
+                # The None sentinel ends the stream: consumers see a closed channel
+                return f"close({queue})"
+            return f"{queue} <- {self._coerce(item, element_type(self._type(awaited.func.value)))}"
+        if self._queue_call(awaited, "task_done", "join"):
+            # Channels carry no per-item acknowledgement; consumers drain until the channel closes
+            return ""
+        if isinstance(awaited, ast.Name) and awaited.id in self.tasks:
+            return f"<-{awaited.id}"
+        if isinstance(value, ast.Yield) and self.in_generator:
+            return f"yieldCh <- {self._coerce(value.value, element_type(self.current_types.returns))}"
+        return None
 
     def visit_Expr(self, node):
-        if isinstance(node.value, ast.Await):
+        call = self._call_statement(node.value)
+        statement = self._async_statement(node.value)
+        if call:
+            self.emit(call)
+        elif statement is not None:
+            if statement:
+                self.emit(statement)
+        elif isinstance(node.value, ast.Await) and self._asyncio_call(node.value.value, "gather"):
+            self._gather(node.value.value, None)
+        elif isinstance(node.value, ast.Await):
              call = node.value.value
              if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "sleep":
                  arg = self._expr(call.args[0])
                  # Go time.Sleep takes Duration (int64 nanoseconds).
                  # We need: time.Duration(float64(time.Second) * arg)
+                 self.imports.add("time")
                  self.emit(f"time.Sleep(time.Duration(float64(time.Second) * {arg}))")
+             elif isinstance(call, ast.Call):
+                 # Awaiting a coroutine directly runs it to completion
+                 self.emit(self._expr(call))
         elif isinstance(node.value, ast.Call):
              self.emit(self._expr(node.value))
              
+    def _loop_header(self, target: str, iter_node) -> str:
+        rng = self._range_args(iter_node)
+        if rng:
+            start, stop, step = rng
+            if step is None:
+                return f"for {target} := {self._expr(start)}; {target} < {self._expr(stop)}; {target}++"
+            cmp = ">" if self._negative_step(step) else "<"
+            return f"for {target} := {self._expr(start)}; {target} {cmp} {self._expr(stop)}; {target} += {self._expr(step)}"
+        if (isinstance(iter_node, ast.Call) and isinstance(iter_node.func, ast.Name)
+                and iter_node.func.id in self.generators) or (isinstance(iter_node, ast.Name) and iter_node.id in self.queues):
+            # Ranging over a channel yields its items until it is closed
+            return f"for {target} := range {self._expr(iter_node)}"
+        return f"for _, {target} := range {self._expr(iter_node)}"
+
     def visit_For(self, node):
         target = node.target.id
-        if isinstance(node.iter, ast.Call) and node.iter.func.id == 'range':
-            args = node.iter.args
-            limit = self._expr(args[0])
-            self.emit(f"for {target} := 0; {target} < {limit}; {target}++ {{")
+        self.enter_scope()
+        self.define_var(target)
+        self.emit(f"{self._loop_header(target, node.iter)} {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+        self.exit_scope()
+
+    visit_AsyncFor = visit_For
+
+    def visit_While(self, node):
+        # A bare `for` is a terminating statement, so functions ending in one need no return after it
+        infinite = isinstance(node.test, ast.Constant) and node.test.value is True
+        self.emit("for {" if infinite else f"for {self._expr(node.test)} {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+
+    def visit_If(self, node):
+        self.emit(f"if {self._expr(node.test)} {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        if node.orelse:
+            self.emit("} else {")
             self.indent_level += 1
-            for stmt in node.body:
+            for stmt in node.orelse:
                 self.visit(stmt)
             self.indent_level -= 1
-            self.emit("}")
+        self.emit("}")
+
+    def visit_Return(self, node):
+        if node.value is None or self.in_generator:
+            self.emit("return")
+            return
+        self.emit(f"return {self._coerce(node.value, self.current_types.returns)}")
+
+    def visit_AugAssign(self, node):
+        target_type = self._type(node.target)
+        op = self._compound_op(node.op, target_type)
+        if op is None:
+            self.emit(f"{self._expr(node.target)} = {self._aug_value(node, target_type)}")
+            return
+        self.emit(f"{self._expr(node.target)} {op}= {self._coerce(node.value, target_type)}")
+
+    def _lower(self, kind: str, comp) -> str:
+        """Comprehensions and reductions as for-loops inside an immediately called func literal."""
+        elem = self._type(comp.elt)
+        t = self.native_type(elem)
+        elt = self._expr(comp.elt)
+        check = ""
+        if kind == "list":
+            gen = comp.generators[0]
+            capacity = ""
+            if len(comp.generators) == 1 and not self._range_args(gen.iter):
+                capacity = f", len({self._expr(gen.iter)})"
+            rtype = self.list_type.format(t)
+            init, body, result = f"out := make({rtype}, 0{capacity}); ", f"out = append(out, {elt})", "out"
+        elif kind == "sum":
+            rtype, init, body, result = t, f"var acc {t}; ", f"acc += {elt}", "acc"
+        elif kind in ("min", "max"):
+            better = "<" if kind == "min" else ">"
+            rtype, init, result = t, f"var acc {t}; first := true; ", "acc"
+            body = f"if v := {elt}; first || v {better} acc {{ acc, first = v, false }}"
+            # Python raises ValueError rather than inventing a value
+            check = f'if first {{ panic("{kind}() arg is an empty sequence") }}; '
+        elif kind == "any":
+            rtype, init, body, result = "bool", "", f"if {elt} {{ return true }}", "false"
+        else:
+            rtype, init, body, result = "bool", "", f"if !({elt}) {{ return false }}", "true"
+        loops, closing = "", ""
+        for gen in comp.generators:
+            loops += f"{self._loop_header(gen.target.id, gen.iter)} {{ "
+            for cond in gen.ifs:
+                loops += f"if !({self._expr(cond)}) {{ continue }}; "
+            closing += " }"
+        return f"func() {rtype} {{ {init}{loops}{body}{closing}; {check}return {result} }}()"
 
     def visit_Assign(self, node):
         target_node = node.targets[0]
+        value = node.value.value if isinstance(node.value, ast.Await) else node.value
+        if self._asyncio_call(value, "gather") and isinstance(node.value, ast.Await):
+            if isinstance(target_node, ast.Tuple) and all(isinstance(e, ast.Name) for e in target_node.elts):
+                self._gather(value, [e.id for e in target_node.elts])
+                return
+            if isinstance(target_node, ast.Name):
+                self._gather(value, [target_node.id])
+                return
+        if isinstance(target_node, ast.Name) and self._asyncio_call(value, "create_task", "ensure_future"):
+            self._create_task(target_node.id, value)
+            return
+        if isinstance(target_node, ast.Name) and self._asyncio_call(value, "Queue"):
+            capacity = self.queue_capacity
+            for kw in value.keywords:
+                if kw.arg == "maxsize" and isinstance(kw.value, ast.Constant) and kw.value.value > 0:
+                    capacity = kw.value.value
+            self._bind(target_node.id, f"make({self._var_type(target_node.id, self._type(target_node))}, {capacity})")
+            return
+        queue = self._queue_call(value, "get", "get_nowait")
+        if isinstance(target_node, ast.Name) and queue:
+            name = target_node.id
+            if name in self.none_checked:
+                # The ok flag stands in for the None sentinel once the producer closes the channel
+                op = "=" if self.is_defined(name) else ":="
+                self.emit(f"{name}, {name}Ok {op} <-{queue}")
+                self.define_var(name)
+                self.received.add(name)
+            else:
+                self._bind(name, f"<-{queue}")
+            return
         if isinstance(target_node, ast.Name):
             target = target_node.id
         elif isinstance(target_node, ast.Attribute):
@@ -404,28 +1555,75 @@ class GoTranspiler(BaseTranspiler):
             self.emit(f"// Complex assignment skipped")
             return
 
-        val = self._expr(node.value)
+        val = self._coerce(node.value, self._type(target_node))
         if target == "_":
              self.emit(f"_ = {val}")
              return
+        if self.is_defined(target):
+             self.emit(f"{target} = {val}")
+             return
              
         self.emit(f"{target} := {val}")
+        self.define_var(target)
         if "processed" in target or "data" in target:
              self.emit(f"_ = {target}")
 
-    def _expr(self, node):
-        if isinstance(node, ast.Constant): 
-            if isinstance(node.value, str): return f'"{node.value}"'
-            return str(node.value)
-        if isinstance(node, ast.Name): return node.id
+    def _print(self, ir) -> str:
+        if isinstance(ir, IRBinary) and ir.type == FLOAT and ir.op in self.ir_syntax.float_formats:
+            self.imports.add("math")
+        return super()._print(ir)
+
+    def _expr_ast(self, node):
+        if isinstance(node, ast.Constant): return self._literal(node)
         if isinstance(node, ast.BinOp):
-            return f"{self._expr(node.left)} + {self._expr(node.right)}"
+            result = self._type(node)
+            if isinstance(node.op, ast.Pow):
+                self.imports.add("math")
+                power = f"math.Pow({self._coerce(node.left, FLOAT)}, {self._coerce(node.right, FLOAT)})"
+                return power if result == FLOAT else self.cast_format.format(expr=power, type=self.native_type(INT))
+            return f"({self._expr(node.left)} {self._op(node.op)} {self._expr(node.right)})"
+        if isinstance(node, ast.Await):
+            queue = self._queue_call(node.value, "get", "get_nowait")
+            if queue:
+                return f"<-{queue}"
+            if isinstance(node.value, ast.Name) and node.value.id in self.tasks:
+                return f"<-{node.value.id}"
+            return self._expr(node.value)
+        if isinstance(node, ast.Compare) and isinstance(node.left, ast.Name) and node.left.id in self.received:
+            return f"!{node.left.id}Ok" if isinstance(node.ops[0], ast.Is) else f"{node.left.id}Ok"
+        if isinstance(node, ast.Compare):
+            return self._compare_ast(node)
+        if isinstance(node, ast.Subscript):
+            return f"{self._expr(node.value)}[{self._expr(node.slice)}]"
+        if isinstance(node, ast.List):
+            elem = element_type(self._type(node))
+            return self.list_type.format(self.native_type(elem)) + "{" + ", ".join(self._coerce(e, elem) for e in node.elts) + "}"
+        if isinstance(node, (ast.ListComp, ast.GeneratorExp)) and self._simple_targets(node):
+            return self._lower("list", node)
         if isinstance(node, ast.Call):
+             reduction = self._reduction(node)
+             if reduction and self._simple_targets(reduction[1]):
+                 return self._lower(*reduction)
              if isinstance(node.func, ast.Name) and node.func.id == "print":
+                 self.imports.add("fmt")
                  if len(node.args) == 1 and isinstance(node.args[0], ast.JoinedStr):
                       return self._expr(node.args[0])
                  args = ", ".join([self._expr(a) for a in node.args])
                  return f"fmt.Println({args})"
+             if isinstance(node.func, ast.Name):
+                 name = node.func.id
+                 if name in ("min", "max") and len(node.args) > 1:
+                     common = self._type(node)
+                     return f"{name}({', '.join(self._coerce(a, common) for a in node.args)})"
+                 if name in ("float", "int") and node.args:
+                     return self.cast_format.format(expr=self._expr(node.args[0]), type=self.native_type(self._type(node)))
+                 if name == "str" and node.args:
+                     self.imports.add("fmt")
+                     return f"fmt.Sprint({self._expr(node.args[0])})"
+                 callee = self.types.functions.get(name)
+                 params = list(callee.args.values()) if callee else []
+                 args = ", ".join(self._coerce(a, params[i] if i < len(params) else None) for i, a in enumerate(node.args))
+                 return f"{name}({args})"
         if isinstance(node, ast.JoinedStr):
              fmt = ""
              args = []
@@ -434,17 +1632,28 @@ class GoTranspiler(BaseTranspiler):
                  elif isinstance(val, ast.FormattedValue): 
                       fmt += "%v"
                       args.append(self._expr(val.value))
+             self.imports.add("fmt")
              return f'fmt.Printf("{fmt}\\n", {", ".join(args)})'
-        if isinstance(node, ast.BinOp):
-             if isinstance(node.op, ast.Mult): op = "*"
-             return f"{self._expr(node.left)} {op} {self._expr(node.right)}"
         return ""
 
 class JavaTranspiler(BaseTranspiler):
+    ir_syntax = JAVA_SYNTAX
+    shm_read_call = "Shm.read{t}({name})"
+    shm_write_call = "Shm.write{t}({name}, {value})"
+    shm_suffixes = {"int64": "I64", "float64": "F64", "str": "Str"}
+    type_names = {INT: "long", FLOAT: "double", BOOL: "boolean", STR: "String"}
+    list_type = "{}[]"
+    cast_format = "(({type}) {expr})"
+    # Primitive stream flavour per element type; anything else is a Stream<T>
+    stream_kinds = {INT: "Long", FLOAT: "Double"}
+    boxed_types = {INT: "Long", FLOAT: "Double", BOOL: "Boolean"}
+
     def visit_Module(self, node):
         self.emit("// Transpiled to Java")
         self.emit("public class Main {")
         self.indent_level += 1
+        if uses_shared_memory(node):
+            self.emit_block(JAVA_HELPERS)
         class_defs = [n for n in node.body if isinstance(n, ast.ClassDef)]
         super().visit_Module(node)
         self.emit("public static void main(String[] args) {")
@@ -467,24 +1676,61 @@ class JavaTranspiler(BaseTranspiler):
         self.current_class = node.name
         self.emit(f"static class {node.name} {{")
         self.indent_level += 1
-        self.emit("String id;")
-        self.emit("int quantity;")
-        self.emit("String name;")
-        self.emit("int balance;")
-        self.emit("String status;")
-        self.emit("String sku;")
+        fields = {"id": "String", "quantity": "int", "name": "String", "balance": "int", "status": "String", "sku": "String"}
+        for attr, t in self.types.attributes.get(node.name, {}).items():
+            if t not in (None, UNKNOWN):
+                fields[attr] = self.native_type(t)
+        for attr, type_label in fields.items():
+            self.emit(f"{type_label} {attr};")
         for child in node.body:
             if isinstance(child, ast.FunctionDef):
                 self.visit_Method(child)
         self.indent_level -= 1
         self.emit("}")
 
+    def visit_FunctionDef(self, node):
+        # Top-level functions become static methods of Main
+        if not self._visit_memoized(node, self.visit_Method):
+            self.visit_Method(node)
+        self.current_types = FunctionTypes("<module>")
+
+    def _memo_wrapper(self, name, params, ft):
+        value_type, boxed = self.native_type(ft.returns), self.boxed_types.get(ft.returns, "Long")
+        if len(params) == 1:
+            key_type, key = "Long", params[0]
+        else:
+            key_type, key = "java.util.List<Long>", f"java.util.List.of({', '.join(params)})"
+        cache = f"{name}Cache"
+        self.emit(f"private static final java.util.HashMap<{key_type}, {boxed}> {cache} = new java.util.HashMap<>();")
+        args = ", ".join(f"{self.native_type(INT)} {p}" for p in params)
+        self.emit(f"public static {value_type} {name}({args}) {{")
+        self.indent_level += 1
+        self.emit(f"{key_type} key = {key};")
+        self.emit(f"{boxed} hit = {cache}.get(key);")
+        self.emit("if (hit != null) return hit;")
+        self.emit(f"{value_type} result = {name}{MEMO_SUFFIX}({', '.join(params)});")
+        self.emit(f"{cache}.put(key, result);")
+        self.emit("return result;")
+        self.indent_level -= 1
+        self.emit("}")
+
     def visit_Method(self, node):
+        self.current_types = self.types.function(node.name, self.current_class)
+        self.enter_scope()
         args = []
+        operands = {n.id for b in ast.walk(node) if isinstance(b, ast.BinOp)
+                    for n in (b.left, b.right) if isinstance(n, ast.Name)}
         for arg in node.args.args:
             if arg.arg == "self": continue
-            type_label = "int" if "amount" in arg.arg else "String"
+            # Arguments with no typing evidence are most often identifiers and labels,
+            # unless they only meet other untyped values in arithmetic
+            t = self.current_types.args.get(arg.arg)
+            if t in (None, UNKNOWN):
+                type_label = self.native_type(INT) if arg.arg in operands else "String"
+            else:
+                type_label = self.native_type(t)
             args.append(f"{type_label} {arg.arg}")
+            self.define_var(arg.arg)
         if node.name == "__init__":
             self.emit(f"public {self.current_class}({', '.join(args)}) {{")
             self.indent_level += 1
@@ -498,14 +1744,17 @@ class JavaTranspiler(BaseTranspiler):
             self.indent_level -= 1
             self.emit("}")
         else:
-            rtype = "String"
-            if node.name == "validate": rtype = "boolean"
-            self.emit(f"public {rtype} {node.name}({', '.join(args)}) {{")
+            returns = self.current_types.returns
+            returns_value = returns not in (None, NONE) or self._has_value_return(node)
+            rtype = self.native_type(returns) if returns_value else "void"
+            static = "static " if self.current_class is None else ""
+            self.emit(f"public {static}{rtype} {node.name}({', '.join(args)}) {{")
             self.indent_level += 1
             for stmt in node.body:
                 self.visit(stmt)
             self.indent_level -= 1
             self.emit("}")
+        self.exit_scope()
 
     def visit_If(self, node):
         cond = self._expr(node.test)
@@ -522,12 +1771,41 @@ class JavaTranspiler(BaseTranspiler):
             self.indent_level -= 1
         self.emit("}")
 
+    def _loop_header(self, target: str, iter_node) -> str:
+        rng = self._range_args(iter_node)
+        if rng:
+            start, stop, step = rng
+            step_expr = f"{target}++" if step is None else f"{target} += {self._expr(step)}"
+            cmp = ">" if step is not None and self._negative_step(step) else "<"
+            return f"for (long {target} = {self._expr(start)}; {target} {cmp} {self._expr(stop)}; {step_expr})"
+        elem = self.native_type(element_type(self._type(iter_node)))
+        return f"for ({elem} {target} : {self._expr(iter_node)})"
+
+    def visit_For(self, node):
+        self.enter_scope()
+        self.define_var(node.target.id)
+        self.emit(f"{self._loop_header(node.target.id, node.iter)} {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+        self.exit_scope()
+
+    def visit_While(self, node):
+        self.emit(f"while ({self._expr(node.test)}) {{")
+        self.indent_level += 1
+        for stmt in node.body:
+            self.visit(stmt)
+        self.indent_level -= 1
+        self.emit("}")
+
     def visit_Return(self, node):
         if isinstance(node.value, ast.Call) and isinstance(node.value.func, ast.Name) and node.value.func.id == "isinstance":
              obj = self._expr(node.value.args[0])
              self.emit(f"return {obj} instanceof String;")
              return
-        val = self._expr(node.value)
+        val = self._coerce(node.value, self.current_types.returns)
         self.emit(f"return {val};")
         
     def visit_Assign(self, node):
@@ -535,32 +1813,384 @@ class JavaTranspiler(BaseTranspiler):
              target = "this." + node.targets[0].attr
              val = self._expr(node.value)
              self.emit(f"{target} = {val};")
+        elif isinstance(node.targets[0], ast.Name) and len(self.scope_stack) > 1:
+             # Module-level assignments have no place in the Main class
+             name = node.targets[0].id
+             t = self.current_types.var(name)
+             val = self._coerce(node.value, t)
+             if self.is_defined(name):
+                 self.emit(f"{name} = {val};")
+             else:
+                 self.define_var(name)
+                 self.emit(f"{self.native_type(t)} {name} = {val};")
 
     def visit_AugAssign(self, node):
         target = node.target
+        target_type = self._type(target)
+        op = self._compound_op(node.op, target_type)
         if isinstance(target, ast.Attribute):
-             target_str = "this." + target.attr
-             op = "+" if isinstance(node.op, ast.Add) else "-"
-             val = self._expr(node.value)
-             self.emit(f"{target_str} {op}= {val};")
+             name = f"this.{target.attr}"
+        elif isinstance(target, ast.Name):
+             name = target.id
+        else:
+             return
+        if op is None:
+             self.emit(f"{name} = {self._aug_value(node, target_type)};")
+        else:
+             self.emit(f"{name} {op}= {self._coerce(node.value, target_type)};")
 
-    def _expr(self, node):
+    def _stream_source(self, iter_node):
+        """Returns (stream expression, element type) for a generator's iterable."""
+        rng = self._range_args(iter_node)
+        if rng:
+            start, stop, step = rng
+            if step is None:
+                return f"java.util.stream.LongStream.range({self._expr(start)}, {self._expr(stop)})", INT
+            cmp = ">" if self._negative_step(step) else "<"
+            return (f"java.util.stream.LongStream.iterate({self._expr(start)}, t -> t {cmp} {self._expr(stop)}, "
+                    f"t -> t + {self._expr(step)})"), INT
+        return f"java.util.Arrays.stream({self._expr(iter_node)})", element_type(self._type(iter_node))
+
+    def _map(self, source: Optional[str], target: Optional[str]) -> str:
+        kind = self.stream_kinds.get(target)
+        if kind is None:
+            return "mapToObj" if source in self.stream_kinds else "map"
+        return "map" if self.stream_kinds.get(source) == kind else f"mapTo{kind}"
+
+    def _stream(self, generators, elt) -> Optional[str]:
+        """Builds a stream of elt over the generators; nested generators go through flatMap."""
+        gen, rest = generators[0], generators[1:]
+        var = gen.target.id
+        stream, elem = self._stream_source(gen.iter)
+        for cond in gen.ifs:
+            stream += f".filter({var} -> {self._expr(cond)})"
+        if rest:
+            inner = self._stream(rest, elt)
+            # flatMap keeps the stream flavour, so the inner stream must match it
+            if inner is None or self.stream_kinds.get(self._type(elt)) != self.stream_kinds.get(elem):
+                return None
+            return f"{stream}.flatMap({var} -> {inner})"
+        if not (isinstance(elt, ast.Name) and elt.id == var and self._type(elt) == elem):
+            stream += f".{self._map(elem, self._type(elt))}({var} -> {self._expr(elt)})"
+        return stream
+
+    def _lower(self, kind: str, comp) -> str:
+        """Comprehensions and reductions as primitive streams, without boxing or intermediate arrays."""
+        if kind in ("any", "all"):
+            # The predicate is applied directly, so no boolean stream is needed
+            gen = comp.generators[0]
+            if len(comp.generators) > 1:
+                return ""
+            stream, _ = self._stream_source(gen.iter)
+            for cond in gen.ifs:
+                stream += f".filter({gen.target.id} -> {self._expr(cond)})"
+            match = "anyMatch" if kind == "any" else "allMatch"
+            return f"{stream}.{match}({gen.target.id} -> {self._expr(comp.elt)})"
+        stream = self._stream(comp.generators, comp.elt)
+        if stream is None:
+            return ""
+        elem = self._type(comp.elt)
+        if kind == "list":
+            if elem in self.stream_kinds:
+                return f"{stream}.toArray()"
+            return f"{stream}.toArray({self.native_type(elem)}[]::new)"
+        if kind == "sum":
+            return f"{stream}.sum()"
+        return f"{stream}.{kind}().getAs{self.stream_kinds.get(elem, 'Long')}()"
+
+    def _expr_ast(self, node):
         if isinstance(node, ast.BinOp):
-             op = "+"
-             if isinstance(node.op, ast.Sub): op = "-"
-             return f"{self._expr(node.left)} {op} {self._expr(node.right)}"
+             return f"({self._expr(node.left)} {self._op(node.op)} {self._expr(node.right)})"
         if isinstance(node, ast.Attribute):
              return "this." + node.attr
-        if isinstance(node, ast.Name): return node.id
-        if isinstance(node, ast.Constant): return f'"{node.value}"' if isinstance(node.value, str) else str(node.value)
+        if isinstance(node, ast.Constant): return self._literal(node)
+        if isinstance(node, ast.Subscript):
+             return f"{self._expr(node.value)}[(int) {self._expr(node.slice)}]"
+        if isinstance(node, ast.List):
+             elem = element_type(self._type(node))
+             items = ", ".join(self._coerce(e, elem) for e in node.elts)
+             return f"new {self.native_type(elem)}[] {{{items}}}"
+        if isinstance(node, (ast.ListComp, ast.GeneratorExp)) and self._simple_targets(node):
+             return self._lower("list", node)
         if isinstance(node, ast.Call):
+             reduction = self._reduction(node)
+             if reduction and self._simple_targets(reduction[1]):
+                 return self._lower(*reduction)
              if isinstance(node.func, ast.Attribute) and node.func.attr == "upper":
                  return f"{self._expr(node.func.value)}.toUpperCase()"
              if isinstance(node.func, ast.Name) and node.func.id == "str":
                  return f"String.valueOf({self._expr(node.args[0])})"
+             if isinstance(node.func, ast.Name) and node.func.id == "len":
+                 arg = node.args[0]
+                 size = "length()" if self._type(arg) == STR else "length"
+                 return f"((long) {self._expr(arg)}.{size})"
+             if isinstance(node.func, ast.Name) and node.func.id in ("float", "int") and node.args:
+                 return self.cast_format.format(expr=self._expr(node.args[0]), type=self.native_type(self._type(node)))
+             if isinstance(node.func, ast.Name) and node.func.id in ("min", "max") and len(node.args) > 1:
+                 common = self._type(node)
+                 result = self._coerce(node.args[0], common)
+                 for arg in node.args[1:]:
+                     result = f"Math.{node.func.id}({result}, {self._coerce(arg, common)})"
+                 return result
              if isinstance(node.func, ast.Name):
                   args = ", ".join([self._expr(a) for a in node.args])
                   return f"{node.func.id}({args})"
         if isinstance(node, ast.Compare):
-             return f"{self._expr(node.left)} >= {self._expr(node.comparators[0])}"
+             right = node.comparators[0]
+             if self._type(node.left) == STR and isinstance(node.ops[0], (ast.Eq, ast.NotEq)):
+                 equals = f"{self._expr(node.left)}.equals({self._expr(right)})"
+                 return equals if isinstance(node.ops[0], ast.Eq) else f"!{equals}"
+             return self._compare_ast(node)
         return ""
+
+class NumpyTranspiler(BaseTranspiler):
+    """
+    Keeps the segment as Python, rewriting element-wise loops, comprehensions
+    and reductions over numeric ranges and lists into NumPy array expressions.
+
+    Only expressions built from arithmetic, comparisons, conditionals and
+    ufunc-like builtins over numeric operands are vectorised; everything else
+    is left untouched, so the output always runs. Integer arrays are int64,
+    so results differ from Python only where Python would need big integers.
+    """
+    # Element-wise builtins and math functions with a NumPy ufunc equivalent
+    ufuncs = {"abs": "np.abs", "math.sqrt": "np.sqrt", "math.exp": "np.exp", "math.log": "np.log",
+              "math.sin": "np.sin", "math.cos": "np.cos", "math.tan": "np.tan", "math.fabs": "np.fabs"}
+    binary_ops = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/", ast.FloorDiv: "//", ast.Mod: "%", ast.Pow: "**"}
+    compare_ops = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+    numeric = (INT, FLOAT, BOOL)
+
+    def visit_Module(self, node):
+        self.vectorized = 0
+        self.vector_ops = 0
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._rewrite_function(child, None)
+            elif isinstance(child, ast.ClassDef):
+                for method in child.body:
+                    if isinstance(method, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        self._rewrite_function(method, child.name)
+        self.emit("# Transpiled to NumPy")
+        # Segments are cut out of their module, so the stdlib modules they use are imported again
+        imported = {alias.asname or alias.name for n in node.body if isinstance(n, ast.Import) for alias in n.names}
+        modules = {n.value.id for n in ast.walk(node) if isinstance(n, ast.Attribute)
+                   and isinstance(n.value, ast.Name) and n.value.id in sys.stdlib_module_names} - imported
+        if any(isinstance(child, ast.AsyncFunctionDef) for child in node.body) and "asyncio" not in modules | imported:
+            modules.add("asyncio")
+        for module in sorted(modules):
+            self.emit(f"import {module}")
+        if self.vectorized:
+            self.emit("import numpy as np")
+        if uses_shared_memory(node):
+            # Provided next to the segments by the runner
+            self.emit("from polyglot_shm import shm_read, shm_write")
+        self.emit("")
+        self.emit_block(ast.unparse(ast.fix_missing_locations(node)))
+        self.emit("")
+        self.emit('if __name__ == "__main__":')
+        self.indent_level += 1
+        demos = [c for c in node.body if isinstance(c, (ast.FunctionDef, ast.AsyncFunctionDef)) and not c.args.args]
+        for child in demos:
+            call = f"asyncio.run({child.name}())" if isinstance(child, ast.AsyncFunctionDef) else f"{child.name}()"
+            self.emit(f"result = {call}")
+            self.emit("if result is not None:")
+            self.emit(f'    print("{child.name}:", result)')
+        if not demos:
+            self.emit("pass")
+        self.indent_level -= 1
+
+    def _rewrite_function(self, node, class_name):
+        self.current_types = self.types.function(node.name, class_name)
+        self.current_function = node
+        node.body = self._rewrite_block(node.body)
+        self.current_function = None
+        self.current_types = FunctionTypes("<module>")
+
+    def _rewrite_block(self, body):
+        rewritten = []
+        for stmt in body:
+            loop = self._vectorize_loop(stmt) if isinstance(stmt, ast.For) else None
+            if loop is not None:
+                rewritten.append(loop)
+                continue
+            for attr in ("body", "orelse", "finalbody"):
+                if isinstance(getattr(stmt, attr, None), list) and getattr(stmt, attr):
+                    setattr(stmt, attr, self._rewrite_block(getattr(stmt, attr)))
+            rewritten.append(_ReductionRewriter(self).visit(stmt))
+        return rewritten
+
+    # --- Vectorised expressions -------------------------------------------
+
+    def _source(self, iter_node):
+        """Returns (array expression, slice for indexing other lists) for a loop's iterable, or None."""
+        rng = self._range_args(iter_node)
+        if rng:
+            start, stop, step = rng
+            parts = [ast.unparse(start), ast.unparse(stop)] + ([ast.unparse(step)] if step is not None else [])
+            if any(self._type(a) != INT for a in (start, stop, step) if a is not None):
+                return None
+            return f"np.arange({', '.join(parts)})", ":".join(parts)
+        if element_type(self._type(iter_node)) in self.numeric:
+            return f"np.asarray({ast.unparse(iter_node)})", None
+        return None
+
+    def _vec(self, node, var: str, array: str, index: Optional[str]) -> Optional[str]:
+        """The element-wise expression node as an array expression over the loop variable, or None."""
+        if isinstance(node, ast.Constant):
+            return repr(node.value) if isinstance(node.value, (int, float)) else None
+        if isinstance(node, ast.Name):
+            if node.id == var:
+                return array
+            return node.id if self._type(node) in self.numeric else None
+        if isinstance(node, ast.Subscript):
+            if isinstance(node.slice, ast.Name) and node.slice.id == var:
+                if index is None or not isinstance(node.value, ast.Name) or element_type(self._type(node.value)) not in self.numeric:
+                    return None
+                return f"np.asarray({node.value.id})[{index}]"
+            mentions = any(isinstance(n, ast.Name) and n.id == var for n in ast.walk(node))
+            return ast.unparse(node) if not mentions and self._type(node) in self.numeric else None
+        if isinstance(node, ast.BinOp) and type(node.op) in self.binary_ops:
+            left, right = self._vec(node.left, var, array, index), self._vec(node.right, var, array, index)
+            if left is None or right is None:
+                return None
+            return f"({left} {self.binary_ops[type(node.op)]} {right})"
+        if isinstance(node, ast.UnaryOp):
+            operand = self._vec(node.operand, var, array, index)
+            if operand is None:
+                return None
+            if isinstance(node.op, ast.Not):
+                return f"np.logical_not({operand})"
+            return f"({'-' if isinstance(node.op, ast.USub) else '+'}{operand})" if not isinstance(node.op, ast.Invert) else None
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in self.compare_ops:
+            left, right = self._vec(node.left, var, array, index), self._vec(node.comparators[0], var, array, index)
+            if left is None or right is None:
+                return None
+            return f"({left} {self.compare_ops[type(node.ops[0])]} {right})"
+        if isinstance(node, ast.BoolOp):
+            values = [self._vec(v, var, array, index) for v in node.values]
+            if None in values:
+                return None
+            func = "np.logical_and" if isinstance(node.op, ast.And) else "np.logical_or"
+            result = values[0]
+            for value in values[1:]:
+                result = f"{func}({result}, {value})"
+            return result
+        if isinstance(node, ast.IfExp):
+            parts = [self._vec(n, var, array, index) for n in (node.test, node.body, node.orelse)]
+            return None if None in parts else f"np.where({parts[0]}, {parts[1]}, {parts[2]})"
+        if isinstance(node, ast.Call) and not node.keywords:
+            name = ast.unparse(node.func)
+            args = [self._vec(a, var, array, index) for a in node.args]
+            if None in args:
+                return None
+            if name in self.ufuncs and len(args) == 1:
+                return f"{self.ufuncs[name]}({args[0]})"
+            if name in ("min", "max") and len(args) == 2:
+                return f"np.{'minimum' if name == 'min' else 'maximum'}({args[0]}, {args[1]})"
+            if name == "float" and len(args) == 1:
+                return f"np.asarray({args[0]}, dtype=np.float64)"
+        return None
+
+    def _vectorize(self, comp) -> Optional[str]:
+        """Array expression for a single-generator comprehension, masked by its conditions."""
+        if len(comp.generators) != 1 or not isinstance(comp.generators[0].target, ast.Name):
+            return None
+        gen = comp.generators[0]
+        source = self._source(gen.iter)
+        if source is None:
+            return None
+        array, index = source
+        var = gen.target.id
+        if not any(isinstance(n, ast.Name) and n.id == var for n in ast.walk(comp.elt)):
+            return None
+        result = self._vec(comp.elt, var, array, index)
+        masks = [self._vec(cond, var, array, index) for cond in gen.ifs]
+        if result is None or None in masks:
+            return None
+        for mask in masks:
+            result = f"({result})[{mask}]"
+        self.vectorized += 1
+        self.vector_ops += sum(isinstance(n, ast.BinOp) for part in [comp.elt] + gen.ifs for n in ast.walk(part))
+        return result
+
+    def _vectorize_loop(self, node: ast.For) -> Optional[ast.stmt]:
+        """
+        Rewrites `acc += expr`, `out.append(expr)` and `out[i] = expr` loops
+        (optionally guarded by one if) into a single array statement. Stores
+        become a slice assignment only where the range stays inside the list;
+        otherwise the values are computed as one array and stored one by one.
+        """
+        if node.orelse or not isinstance(node.target, ast.Name) or len(node.body) != 1:
+            return None
+        var = node.target.id
+        # Python leaves the loop variable bound after the loop
+        inside = {id(n) for n in ast.walk(node)}
+        if any(isinstance(n, ast.Name) and n.id == var and id(n) not in inside for n in ast.walk(self.current_function)):
+            return None
+        stmt, cond = node.body[0], None
+        if isinstance(stmt, ast.If) and not stmt.orelse and len(stmt.body) == 1:
+            stmt, cond = stmt.body[0], stmt.test
+        if isinstance(stmt, ast.AugAssign) and isinstance(stmt.op, (ast.Add, ast.Sub)) and isinstance(stmt.target, ast.Name):
+            if any(isinstance(n, ast.Name) and n.id == stmt.target.id for n in ast.walk(stmt.value)):
+                return None
+            kind, value = "sum", stmt.value
+        elif (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Call) and isinstance(stmt.value.func, ast.Attribute)
+              and stmt.value.func.attr == "append" and len(stmt.value.args) == 1 and isinstance(stmt.value.func.value, ast.Name)):
+            kind, value = "append", stmt.value.args[0]
+        elif (isinstance(stmt, ast.Assign) and len(stmt.targets) == 1 and isinstance(stmt.targets[0], ast.Subscript)
+              and isinstance(stmt.targets[0].slice, ast.Name) and stmt.targets[0].slice.id == var and cond is None):
+            kind, value = "store", stmt.value
+        else:
+            return None
+        source = self._source(node.iter)
+        # Stores index other lists by the loop variable, which needs a range
+        if source is None or (kind == "store" and source[1] is None):
+            return None
+        comp = ast.ListComp(elt=value, generators=[ast.comprehension(target=node.target, iter=node.iter,
+                                                                      ifs=[cond] if cond is not None else [], is_async=0)])
+        array = self._vectorize(comp)
+        if array is None:
+            return None
+        if kind == "sum":
+            op = "+=" if isinstance(stmt.op, ast.Add) else "-="
+            code = f"{stmt.target.id} {op} np.sum({array}).item()"
+        elif kind == "append":
+            code = f"{stmt.value.func.value.id}.extend(({array}).tolist())"
+        else:
+            out = ast.unparse(stmt.targets[0].value)
+            if self._within(node.iter, stmt.targets[0].value):
+                code = f"{out}[{source[1]}] = ({array}).tolist()"
+            else:
+                # A slice would insert or wrap around where the indices do not stay inside
+                # the list, so the stores keep Python's indexing (and its IndexError)
+                code = f"for {var}, _{var}_value in zip({ast.unparse(node.iter)}, ({array}).tolist()): {out}[{var}] = _{var}_value"
+        return ast.parse(code).body[0]
+
+    def _within(self, iter_node, out) -> bool:
+        """Whether every index of the range(...) iter_node is a position of out, so a slice stores exactly there."""
+        start, stop, step = self._range_args(iter_node)
+        def constant(n, low):
+            return isinstance(n, ast.Constant) and type(n.value) is int and n.value >= low
+        return (constant(start, 0) and (step is None or constant(step, 1))
+                and isinstance(stop, ast.Call) and isinstance(stop.func, ast.Name) and stop.func.id == "len"
+                and len(stop.args) == 1 and ast.dump(stop.args[0]) == ast.dump(out))
+
+class _ReductionRewriter(ast.NodeTransformer):
+    """Replaces vectorisable comprehensions and reductions inside one statement."""
+    # .item() and bool() hand back Python scalars, as the builtins would
+    templates = {"list": "({}).tolist()", "sum": "np.sum({}).item()", "min": "np.min({}).item()",
+                 "max": "np.max({}).item()", "any": "bool(np.any({}))", "all": "bool(np.all({}))"}
+
+    def __init__(self, transpiler: NumpyTranspiler):
+        self.transpiler = transpiler
+
+    def _replace(self, kind: str, comp):
+        array = self.transpiler._vectorize(comp)
+        return ast.parse(self.templates[kind].format(array), mode="eval").body if array is not None else None
+
+    def visit_Call(self, node):
+        reduction = self.transpiler._reduction(node)
+        return (reduction and self._replace(*reduction)) or self.generic_visit(node)
+
+    def visit_ListComp(self, node):
+        return self._replace("list", node) or self.generic_visit(node)
@@ -0,0 +1,80 @@
+import os
+import pstats
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+# Share of the profiled run time a segment needs to be worth transpiling
+DEFAULT_HOT_THRESHOLD = 0.05
+
+# How a segment's time is measured: time in its own code, or including its callees
+PROFILE_METRICS = ("self", "cumulative")
+
+@dataclass
+class FunctionProfile:
+    """Time one function of the profiled module took over the whole run."""
+    name: str
+    lineno: int
+    calls: int
+    self_time: float
+    cumulative_time: float
+
+@dataclass
+class ProgramProfile:
+    """The functions of one module seen during a profiling run."""
+    functions: List[FunctionProfile]
+    total_time: float
+
+    def ranked(self, metric: str = "self") -> List[FunctionProfile]:
+        """Functions hottest first by metric ("self" or "cumulative")."""
+        key = (lambda f: f.self_time) if metric == "self" else (lambda f: f.cumulative_time)
+        return sorted(self.functions, key=key, reverse=True)
+
+    def share(self, start_line: int, end_line: int, metric: str = "self") -> float:
+        """
+        Fraction of the run spent in the functions defined between start_line
+        and end_line. Self times add up; cumulative times nest (a method's
+        includes the methods it calls), so the largest one counts.
+        """
+        inside = [f for f in self.functions if start_line <= f.lineno <= end_line]
+        if not inside or self.total_time <= 0:
+            return 0.0
+        if metric == "self":
+            spent = sum(f.self_time for f in inside)
+        else:
+            spent = max(f.cumulative_time for f in inside)
+        return min(1.0, spent / self.total_time)
+
+def profile_program(input_file: str, driver: Optional[str] = None, args: Sequence[str] = (),
+                    timeout: Optional[float] = None) -> ProgramProfile:
+    """
+    Runs driver (by default input_file itself) under cProfile in a separate
+    interpreter and collects the functions defined in input_file. A driver
+    can `import` the input module: its directory is put on PYTHONPATH.
+    A run longer than timeout seconds is killed and raises RuntimeError.
+    """
+    target = os.path.realpath(input_file)
+    script = os.path.realpath(driver or input_file)
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (os.path.dirname(target), env.get("PYTHONPATH")) if p)
+    with tempfile.TemporaryDirectory() as tmp:
+        stats_path = os.path.join(tmp, "profile.out")
+        # cProfile writes its stats even when the program exits with an error
+        try:
+            run = subprocess.run([sys.executable, "-m", "cProfile", "-o", stats_path, script, *args],
+                                 cwd=os.path.dirname(script), env=env, capture_output=True, text=True,
+                                 timeout=timeout)
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Profiling {script} did not finish within {timeout}s")
+        if not os.path.exists(stats_path):
+            raise RuntimeError(f"Profiling {script} produced no statistics: {run.stderr.strip()[-500:]}")
+        stats = pstats.Stats(stats_path)
+    functions = []
+    for (filename, lineno, name), (_, calls, self_time, cumulative_time, _) in stats.stats.items():
+        # <module> is the whole script body, whose cumulative time is the entire run
+        if filename.startswith("<") or name == "<module>" or os.path.realpath(filename) != target:
+            continue
+        functions.append(FunctionProfile(name, lineno, calls, self_time, cumulative_time))
+    return ProgramProfile(functions, stats.total_tt)
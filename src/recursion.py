@@ -0,0 +1,236 @@
+import ast
+from typing import List, Optional
+
+from src.parallel_loops import PURE_CALLS
+from src.type_inference import TypeInference, INT, FLOAT, BOOL
+
+# Decorator marking functions whose results the backends cache by argument
+MEMO_DECORATOR = "functools.cache"
+
+# Suffix of the uncached body a backend emits next to a memoized function
+MEMO_SUFFIX = "_uncached"
+
+# Operators a linear recursion may combine its results with; all are associative
+# and commutative on ints, so the results can be accumulated in any order
+ACCUMULATORS = {ast.Add: 0, ast.Mult: 1}
+
+# Types memoized results and arguments may have (cache keys must be hashable natively)
+MEMO_ARG_TYPES = (INT,)
+MEMO_RETURN_TYPES = (INT, FLOAT, BOOL)
+MEMO_MAX_ARGS = 3
+
+def is_memoized(node: ast.AST) -> bool:
+    """True for functions decorated with functools.cache / lru_cache (bare or called)."""
+    for decorator in getattr(node, "decorator_list", []):
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+        name = decorator.attr if isinstance(decorator, ast.Attribute) else getattr(decorator, "id", None)
+        if name in ("cache", "lru_cache"):
+            return True
+    return False
+
+class RecursionTransformer:
+    """
+    Rewrites self-recursive top-level functions so native code neither
+    recomputes subproblems nor grows the stack:
+
+    - tail recursion (every self-call is `return f(...)` outside loops)
+      becomes a `while True` loop that reassigns the parameters;
+    - linear recursion of the form `if base: return b` / `return e op f(...)`
+      with op + or * on ints becomes an accumulator loop;
+    - pure functions of int arguments that call themselves more than once per
+      evaluation (overlapping subproblems, e.g. fibonacci) are decorated with
+      functools.cache, which every backend lowers to a hash-map cache.
+    """
+    def __init__(self, types: Optional[TypeInference] = None):
+        self.types = types
+
+    def transform(self, tree: ast.AST) -> ast.AST:
+        if self.types is None:
+            self.types = TypeInference().infer(tree)
+        body = tree.body if isinstance(tree, ast.Module) else [tree]
+        for node in body:
+            if isinstance(node, ast.FunctionDef) and self._simple_signature(node) and self._self_calls(node):
+                self._transform_function(node)
+        return ast.fix_missing_locations(tree)
+
+    def _transform_function(self, func: ast.FunctionDef):
+        if self._tail_recursive(func):
+            func.body = self._loop(func, func.body)
+        elif self._linear(func):
+            self._linear_to_loop(func)
+        elif self._overlapping(func) and self._memoizable(func):
+            func.decorator_list.append(ast.parse(MEMO_DECORATOR, mode="eval").body)
+
+    # --- Shape checks --------------------------------------------------------
+
+    @staticmethod
+    def _simple_signature(func: ast.FunctionDef) -> bool:
+        args = func.args
+        return (not func.decorator_list and not args.vararg and not args.kwarg and not args.kwonlyargs
+                and not args.posonlyargs and not args.defaults and bool(args.args)
+                and not any(isinstance(n, (ast.Lambda, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef,
+                                           ast.Global, ast.Nonlocal, ast.Yield, ast.YieldFrom))
+                            for stmt in func.body for n in ast.walk(stmt)))
+
+    @staticmethod
+    def _is_self_call(node, func) -> bool:
+        return isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == func.name
+
+    def _self_calls(self, node, func=None) -> List[ast.Call]:
+        func = func or node
+        roots = node.body if node is func else [node]
+        return [n for root in roots for n in ast.walk(root) if self._is_self_call(n, func)]
+
+    def _direct_call(self, call: ast.Call, func) -> bool:
+        """A self-call passing one plain positional argument per parameter."""
+        return (len(call.args) == len(func.args.args) and not call.keywords
+                and not any(isinstance(a, ast.Starred) for a in call.args)
+                and not any(self._self_calls(a, func) for a in call.args))
+
+    def _tail_calls(self, body: List[ast.stmt], func) -> Optional[List[ast.Return]]:
+        """The `return f(...)` statements reachable through if-blocks only; None when a call hides in a loop or try."""
+        tails = []
+        for stmt in body:
+            if isinstance(stmt, ast.Return) and self._is_self_call(stmt.value, func):
+                if not self._direct_call(stmt.value, func):
+                    return None
+                tails.append(stmt)
+            elif isinstance(stmt, ast.If) and not self._self_calls(stmt.test, func):
+                inner = [self._tail_calls(block, func) for block in (stmt.body, stmt.orelse)]
+                if None in inner:
+                    return None
+                tails.extend(inner[0] + inner[1])
+            elif self._self_calls(stmt, func):
+                return None
+        return tails
+
+    def _tail_recursive(self, func) -> bool:
+        tails = self._tail_calls(func.body, func)
+        return bool(tails) and len(tails) == len(self._self_calls(func))
+
+    def _linear(self, func) -> bool:
+        """`if test: return base` followed (or else-d) by `return e op f(...)` on ints."""
+        body = func.body
+        if len(body) == 1 and isinstance(body[0], ast.If) and len(body[0].orelse) == 1:
+            body = [ast.If(body[0].test, body[0].body, []), body[0].orelse[0]]
+        if len(body) != 2 or not isinstance(body[0], ast.If) or body[0].orelse:
+            return False
+        guard, step = body
+        if not (len(guard.body) == 1 and isinstance(guard.body[0], ast.Return) and guard.body[0].value is not None):
+            return False
+        if not (isinstance(step, ast.Return) and isinstance(step.value, ast.BinOp)
+                and type(step.value.op) in ACCUMULATORS and len(self._self_calls(func)) == 1):
+            return False
+        call = self._step_call(step.value, func)
+        return call is not None and self._direct_call(call, func) and self.types.function(func.name).returns == INT
+
+    def _step_call(self, expr: ast.BinOp, func) -> Optional[ast.Call]:
+        for side in (expr.left, expr.right):
+            if self._is_self_call(side, func):
+                return side
+        return None
+
+    def _overlapping(self, func) -> bool:
+        """True when one evaluation can reach the same subproblem twice: several calls in a statement or a loop."""
+        for node in ast.walk(func):
+            if isinstance(node, (ast.For, ast.While)) and self._self_calls(node, func):
+                return True
+            if isinstance(node, (ast.Return, ast.Assign, ast.AugAssign, ast.Expr)) and len(self._self_calls(node, func)) > 1:
+                return True
+        return False
+
+    def _memoizable(self, func) -> bool:
+        """Pure functions of ints: results depend on the arguments only."""
+        ft = self.types.function(func.name)
+        if len(func.args.args) > MEMO_MAX_ARGS or ft.returns not in MEMO_RETURN_TYPES:
+            return False
+        if any(ft.args.get(a.arg) not in MEMO_ARG_TYPES for a in func.args.args):
+            return False
+        for node in (n for stmt in func.body for n in ast.walk(stmt)):
+            if isinstance(node, (ast.Attribute, ast.Subscript, ast.Starred)) and isinstance(node.ctx, ast.Store):
+                return False
+            if isinstance(node, ast.Call) and not (self._is_self_call(node, func) or (
+                    isinstance(node.func, ast.Name) and node.func.id in PURE_CALLS)):
+                return False
+            if isinstance(node, (ast.Await, ast.Raise, ast.Try, ast.With, ast.Delete)):
+                return False
+        return True
+
+    # --- Rewrites -----------------------------------------------------------
+
+    def _linear_to_loop(self, func):
+        body = func.body
+        guard, step = (body if len(body) == 2 else [ast.If(body[0].test, body[0].body, []), body[0].orelse[0]])
+        op = step.value.op
+        call = self._step_call(step.value, func)
+        factor = step.value.right if call is step.value.left else step.value.left
+        acc = self._fresh(func, "acc")
+        loop_body = [
+            ast.If(guard.test, [ast.Return(self._combine(acc, op, guard.body[0].value))], []),
+            ast.Assign([ast.Name(acc, ast.Store())], self._combine(acc, op, factor)),
+            ast.Return(call),
+        ]
+        init = ast.Assign([ast.Name(acc, ast.Store())], ast.Constant(ACCUMULATORS[type(op)]))
+        func.body = [init] + self._loop(func, loop_body)
+
+    @staticmethod
+    def _combine(acc: str, op, value):
+        return ast.BinOp(ast.Name(acc, ast.Load()), type(op)(), value)
+
+    def _loop(self, func, body: List[ast.stmt]) -> List[ast.stmt]:
+        """Wraps body in `while True`, turning each tail call into parameter updates."""
+        # Judged before the rewrite, while tail calls are still returns
+        terminates = self._terminates(body)
+        body = self._replace_tails(func, body, last=terminates)
+        if not terminates:
+            body.append(ast.Break())
+        return [ast.While(ast.Constant(True), body, [])]
+
+    def _replace_tails(self, func, body: List[ast.stmt], last: bool) -> List[ast.stmt]:
+        result = []
+        for i, stmt in enumerate(body):
+            at_end = last and i == len(body) - 1
+            if isinstance(stmt, ast.Return) and self._is_self_call(stmt.value, func):
+                result.extend(self._rebind(func, stmt.value))
+                if not at_end:
+                    result.append(ast.Continue())
+            elif isinstance(stmt, ast.If):
+                stmt.body = self._replace_tails(func, stmt.body, at_end)
+                stmt.orelse = self._replace_tails(func, stmt.orelse, at_end)
+                result.append(stmt)
+            else:
+                result.append(stmt)
+        return result
+
+    def _rebind(self, func, call: ast.Call) -> List[ast.stmt]:
+        """Assigns the call's arguments to the parameters, through temporaries when they depend on each other."""
+        params = [a.arg for a in func.args.args]
+        pairs = [(p, v) for p, v in zip(params, call.args) if not (isinstance(v, ast.Name) and v.id == p)]
+        assigned = set()
+        direct = True
+        for param, value in pairs:
+            if any(isinstance(n, ast.Name) and n.id in assigned for n in ast.walk(value)):
+                direct = False
+            assigned.add(param)
+        if direct:
+            return [ast.Assign([ast.Name(p, ast.Store())], v) for p, v in pairs]
+        temps = [self._fresh(func, f"next_{p}") for p, _ in pairs]
+        return ([ast.Assign([ast.Name(t, ast.Store())], v) for t, (_, v) in zip(temps, pairs)] +
+                [ast.Assign([ast.Name(p, ast.Store())], ast.Name(t, ast.Load())) for t, (p, _) in zip(temps, pairs)])
+
+    def _terminates(self, body: List[ast.stmt]) -> bool:
+        if not body:
+            return False
+        last = body[-1]
+        if isinstance(last, (ast.Return, ast.Raise)):
+            return True
+        return isinstance(last, ast.If) and self._terminates(last.body) and self._terminates(last.orelse)
+
+    @staticmethod
+    def _fresh(func, base: str) -> str:
+        used = {n.id for n in ast.walk(func) if isinstance(n, ast.Name)} | {a.arg for a in func.args.args} | {func.name}
+        name, i = base, 1
+        while name in used:
+            name, i = f"{base}{i}", i + 1
+        return name
@@ -0,0 +1,77 @@
+import ast
+import re
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import networkx as nx
+
+from src.polyglot import SHM_INTRINSICS
+
+# Explicit run-order annotation inside a segment: `# polyglot: after name1, name2`
+AFTER_PATTERN = re.compile(r"#[ \t]*polyglot:[ \t]*after[ \t]+([\w \t,]+)")
+
+# Segment kinds that run in the runner's Python interpreter (and may load shared libraries)
+PYTHON_SIDE_LANGS = ("NumPy", "Python")
+
+def _shm_names(tree: ast.AST) -> Tuple[Set[str], Set[str], bool]:
+    """Buffer names a segment reads and writes, and whether any name is only known at run time."""
+    reads, writes, dynamic = set(), set(), False
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in SHM_INTRINSICS:
+            name = node.args[0] if node.args else None
+            if isinstance(name, ast.Constant) and isinstance(name.value, str):
+                (reads if node.func.id == "shm_read" else writes).add(name.value)
+            else:
+                dynamic = True
+    return reads, writes, dynamic
+
+def segment_dependencies(segments: Sequence[dict], call_graph: Optional[nx.DiGraph] = None) -> List[List[int]]:
+    """
+    For each segment (a dict with "name", "ast", "original", "lang" and
+    "kind"), the indices of the segments it must run after. A segment waits for:
+
+    - earlier segments it shares a call-graph edge with, so related code keeps
+      its file order;
+    - earlier segments writing a shared memory buffer it reads or writes, or
+      reading one it writes (any segment with computed buffer names waits for
+      all earlier shared memory users);
+    - earlier shared-library segments, when it runs in Python and could load
+      them through native_shim;
+    - the segments named in a `# polyglot: after ...` comment, unless that
+      would create a cycle.
+    """
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(len(segments)))
+    index = {seg["name"]: i for i, seg in enumerate(segments) if seg.get("name")}
+    shm = [_shm_names(seg["ast"]) for seg in segments]
+    for i, seg in enumerate(segments):
+        reads, writes, dynamic = shm[i]
+        for j in range(i):
+            other = segments[j]
+            other_reads, other_writes, other_dynamic = shm[j]
+            related = call_graph is not None and seg.get("name") and other.get("name") and (
+                call_graph.has_edge(seg["name"], other["name"]) or call_graph.has_edge(other["name"], seg["name"]))
+            shares_memory = (other_writes & (reads | writes)) or (other_reads & writes) or (
+                (dynamic or other_dynamic) and any(shm[i]) and any(shm[j]))
+            loads_library = other.get("kind") == "shared" and seg.get("lang") in PYTHON_SIDE_LANGS
+            if related or shares_memory or loads_library:
+                graph.add_edge(j, i)
+    for i, seg in enumerate(segments):
+        for match in AFTER_PATTERN.finditer(seg.get("original", "")):
+            for name in (n.strip() for n in match.group(1).split(",")):
+                j = index.get(name)
+                if j is not None and j != i and not nx.has_path(graph, i, j):
+                    graph.add_edge(j, i)
+    return [sorted(graph.predecessors(i)) for i in range(len(segments))]
+
+def merge_dependencies(dependencies: List[List[int]], groups: Dict[int, int]) -> Dict[int, List[int]]:
+    """
+    Dependencies between groups of segments (e.g. compile units), given the
+    group of every segment. Only edges to earlier groups are kept: merging
+    can put both ends of a chain in one group, and the run order must stay acyclic.
+    """
+    merged: Dict[int, Set[int]] = {g: set() for g in groups.values()}
+    for i, deps in enumerate(dependencies):
+        for j in deps:
+            if groups[j] < groups[i]:
+                merged[groups[i]].add(groups[j])
+    return {g: sorted(deps) for g, deps in merged.items()}
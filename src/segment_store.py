@@ -0,0 +1,191 @@
+import dataclasses
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from src.analyzer import CodeFeatures
+
+@dataclass
+class SegmentRecord:
+    """One analysed segment as stored in the project-wide index."""
+    segment_id: str
+    start_line: int
+    end_line: int
+    code_hash: str
+    complexity: float = 0.0
+    features: Optional[CodeFeatures] = None
+    lang: Optional[str] = None
+    score: Optional[float] = None
+    decision_source: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+    elapsed: float = 0.0
+    build_profile: Optional[str] = None
+
+def hash_text(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class SegmentStore:
+    """
+    Indexed SQLite store of every segment analysed by the CLIs.
+
+    Rows are keyed by (absolute file path, tool) so both CLIs can share one
+    database. Feature columns mirror CodeFeatures and are added to existing
+    databases when new features appear.
+    """
+    FEATURE_COLUMNS = [f.name for f in dataclasses.fields(CodeFeatures)]
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self._create_schema()
+
+    def _create_schema(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                hash TEXT NOT NULL,
+                analyzed_at REAL NOT NULL,
+                elapsed REAL NOT NULL,
+                PRIMARY KEY (path, tool)
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                path TEXT NOT NULL,
+                tool TEXT NOT NULL,
+                segment_id TEXT NOT NULL,
+                start_line INTEGER NOT NULL,
+                end_line INTEGER NOT NULL,
+                code_hash TEXT NOT NULL,
+                complexity REAL,
+                lang TEXT,
+                score REAL,
+                decision_source TEXT,
+                tags TEXT,
+                elapsed REAL,
+                build_profile TEXT,
+                PRIMARY KEY (path, tool, segment_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_segments_lang ON segments (lang);
+            CREATE INDEX IF NOT EXISTS idx_segments_hash ON segments (code_hash);
+        """)
+        existing = {row["name"] for row in self.conn.execute("PRAGMA table_info(segments)")}
+        if "build_profile" not in existing:
+            self.conn.execute("ALTER TABLE segments ADD COLUMN build_profile TEXT")
+        for column in self.FEATURE_COLUMNS:
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE segments ADD COLUMN {column} REAL")
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_segments_recursion_math ON segments (recursion, math_ops)"
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_unchanged(self, file_path: str, tool: str, file_hash: str) -> bool:
+        row = self.conn.execute(
+            "SELECT hash FROM files WHERE path = ? AND tool = ?",
+            (os.path.abspath(file_path), tool)
+        ).fetchone()
+        return row is not None and row["hash"] == file_hash
+
+    def changed_files(self, file_hashes: Dict[str, str], tool: str) -> List[str]:
+        """
+        Returns the files whose hash differs from (or is missing in) the index,
+        resolved with a single join against a temporary table.
+        """
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS candidates (path TEXT PRIMARY KEY, hash TEXT)")
+        self.conn.execute("DELETE FROM candidates")
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO candidates (path, hash) VALUES (?, ?)",
+            [(os.path.abspath(p), h) for p, h in file_hashes.items()]
+        )
+        rows = self.conn.execute("""
+            SELECT c.path FROM candidates c
+            LEFT JOIN files f ON f.path = c.path AND f.tool = ?
+            WHERE f.hash IS NULL OR f.hash != c.hash
+            ORDER BY c.path
+        """, (tool,)).fetchall()
+        return [row["path"] for row in rows]
+
+    def record_file(self, file_path: str, tool: str, file_hash: str,
+                    segments: Iterable[SegmentRecord], elapsed: float = 0.0):
+        """Replaces everything stored for (file_path, tool) in one transaction."""
+        path = os.path.abspath(file_path)
+        columns = ["path", "tool", "segment_id", "start_line", "end_line", "code_hash",
+                   "complexity", "lang", "score", "decision_source", "tags", "elapsed",
+                   "build_profile"] + self.FEATURE_COLUMNS
+        insert = f"INSERT INTO segments ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+        rows = []
+        for rec in segments:
+            features = dataclasses.asdict(rec.features) if rec.features else {}
+            rows.append([
+                path, tool, rec.segment_id, rec.start_line, rec.end_line, rec.code_hash,
+                rec.complexity, rec.lang, rec.score, rec.decision_source, json.dumps(rec.tags), rec.elapsed,
+                rec.build_profile
+            ] + [self._feature_value(features.get(name)) for name in self.FEATURE_COLUMNS])
+        with self.conn:
+            self.conn.execute("DELETE FROM segments WHERE path = ? AND tool = ?", (path, tool))
+            self.conn.executemany(insert, rows)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO files (path, tool, hash, analyzed_at, elapsed) VALUES (?, ?, ?, ?, ?)",
+                (path, tool, file_hash, time.time(), elapsed)
+            )
+
+    @staticmethod
+    def _feature_value(value):
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def query(self, lang: Optional[str] = None, recursive: Optional[bool] = None,
+              min_math: int = 0, min_loops: int = 0, path: Optional[str] = None,
+              tool: Optional[str] = None, limit: int = 100) -> List[sqlite3.Row]:
+        clauses, params = [], []
+        if lang:
+            clauses.append("lang = ?")
+            params.append(lang)
+        if recursive is not None:
+            clauses.append("recursion = ?")
+            params.append(int(recursive))
+        if min_math:
+            clauses.append("math_ops >= ?")
+            params.append(min_math)
+        if min_loops:
+            clauses.append("loops >= ?")
+            params.append(min_loops)
+        if path:
+            clauses.append("path LIKE ?")
+            params.append(f"%{path}%")
+        if tool:
+            clauses.append("tool = ?")
+            params.append(tool)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        return self.conn.execute(
+            f"SELECT * FROM segments {where} ORDER BY path, start_line LIMIT ?", params
+        ).fetchall()
+
+    def files(self) -> List[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM files ORDER BY path, tool").fetchall()
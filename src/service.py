@@ -0,0 +1,171 @@
+import dataclasses
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Optional
+
+from src.decision_engine import CostModel
+from src.parallel_loops import PARALLEL_MIN_TRIP_COUNT
+from src.pipeline import Pipeline
+from src.polyglot import PolyglotTranspiler, PYTHON_LANG
+from src.service_client import DEFAULT_SOCKET
+
+class TranspileService:
+    """
+    Answers analyze / decide / transpile requests from a warm Pipeline, so
+    clients skip the torch import and model set-up that every main.py run pays.
+
+    Requests are dicts with an "op" and its fields:
+    - ping: uptime and the number of requests served;
+    - analyze (code, module): the features of every segment;
+    - decide (code, module, assignment): features plus the chosen language;
+    - transpile (code, lang, parallel_threshold): the code in lang or, without
+      lang, every segment in the language decided for it;
+    - shutdown: stops the server once the response is sent.
+    Responses are {"ok": true, "result": ...} or {"ok": false, "error": ...}.
+    """
+    def __init__(self, compiled_models: bool = False):
+        self.pipeline = Pipeline(compiled_models=compiled_models)
+        self.started = time.time()
+        self.requests = 0
+        self.stopping = False
+        self._count_lock = threading.Lock()
+        self.operations = {
+            "ping": self.ping, "analyze": self.analyze, "decide": self.decide,
+            "transpile": self.transpile, "shutdown": self.shutdown,
+        }
+
+    def handle(self, request: dict) -> dict:
+        with self._count_lock:
+            self.requests += 1
+        handler = self.operations.get(request.get("op"))
+        if handler is None:
+            return {"ok": False, "error": f"Unknown operation: {request.get('op')}"}
+        try:
+            return {"ok": True, "result": handler(request)}
+        except Exception as e:
+            # A bad request must not take the service down
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    def ping(self, request: dict) -> dict:
+        return {"pid": os.getpid(), "uptime": time.time() - self.started, "requests": self.requests}
+
+    @staticmethod
+    def _segment(res: dict, decided: bool) -> dict:
+        summary = {"name": res["name"], "type": res["type"], "start_line": res["start_line"],
+                   "end_line": res["end_line"], "features": dataclasses.asdict(res["features"])}
+        if decided:
+            summary.update(lang=res["lang"], score=res["score"], source=res["source"])
+        return summary
+
+    def _results(self, request: dict):
+        return self.pipeline.analyze(request["code"], request.get("module", "module"),
+                                     assignment=request.get("assignment", "call-graph"))
+
+    def analyze(self, request: dict) -> list:
+        return [self._segment(res, False) for res in self._results(request)]
+
+    def decide(self, request: dict) -> list:
+        return [self._segment(res, True) for res in self._results(request)]
+
+    def transpile(self, request: dict):
+        threshold = request.get("parallel_threshold", PARALLEL_MIN_TRIP_COUNT)
+        lang = request.get("lang")
+        if lang:
+            if lang not in CostModel.WEIGHTS and lang != PYTHON_LANG:
+                raise ValueError(f"Unknown target language: {lang}")
+            return {"lang": lang, "code": PolyglotTranspiler.transpile(request["code"], lang, threshold)}
+        return [dict(self._segment(res, True), code=PolyglotTranspiler.transpile(res["original"], res["lang"],
+                                                                                 threshold))
+                for res in self._results(request)]
+
+    def shutdown(self, request: dict) -> dict:
+        self.stopping = True
+        return {"requests": self.requests}
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """One thread per connection; a connection may send any number of requests, one JSON object per line."""
+    def handle(self):
+        service = self.server.service
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                response = {"ok": False, "error": f"Invalid JSON: {e}"}
+            else:
+                response = service.handle(request) if isinstance(request, dict) else \
+                    {"ok": False, "error": "A request must be a JSON object"}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if service.stopping:
+                # From another thread: shutdown() waits for the serving loop to stop
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None # Windows: localhost TCP only
+
+def _listening(socket_path: str) -> bool:
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+def _private_directory(path: str):
+    """Creates path owner-only, or checks that it already is: nobody else may plant or reach a socket in it."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.stat(path)
+    if info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise RuntimeError(f"{path} must be a directory only its owner can access")
+
+def make_server(service: TranspileService, socket_path: str = DEFAULT_SOCKET,
+                port: Optional[int] = None) -> socketserver.BaseServer:
+    """A threading server for service on a Unix socket (owner-only), or on localhost TCP when port is given."""
+    if port:
+        server = _TcpServer(("127.0.0.1", port), _RequestHandler)
+    else:
+        if _UnixServer is None:
+            raise RuntimeError("Unix domain sockets are not available on this platform; use a TCP port")
+        if socket_path == DEFAULT_SOCKET:
+            _private_directory(os.path.dirname(socket_path))
+        if os.path.exists(socket_path):
+            if _listening(socket_path):
+                raise RuntimeError(f"A transpile service is already listening on {socket_path}")
+            # Left behind by a service that did not shut down cleanly
+            os.unlink(socket_path)
+        # The socket is created owner-only, rather than changed after it is already reachable
+        umask = os.umask(0o177)
+        try:
+            server = _UnixServer(socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+    server.service = service
+    return server
+
+def serve(server: socketserver.BaseServer):
+    """Serves until a shutdown request (or KeyboardInterrupt), then removes the socket file."""
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        address = server.server_address
+        if isinstance(address, str) and os.path.exists(address):
+            os.unlink(address)
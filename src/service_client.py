@@ -0,0 +1,66 @@
+import getpass
+import json
+import os
+import socket
+import tempfile
+from typing import Optional
+
+def _default_socket() -> str:
+    """In $XDG_RUNTIME_DIR when set, else in a per-user directory of the temp dir (created owner-only by the service)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "polyglot-transpiler.sock")
+    user = os.getuid() if hasattr(os, "getuid") else getpass.getuser()
+    return os.path.join(tempfile.gettempdir(), f"polyglot-transpiler-{user}", "service.sock")
+
+# Where the transpile service listens unless told otherwise
+DEFAULT_SOCKET = _default_socket()
+
+class ServiceClient:
+    """
+    Client for the transpile service (see service.py). Requests and responses
+    are JSON objects, one per line; the connection is kept open, so repeated
+    requests only pay for the round trip. Only the standard library is
+    imported here, so clients start without loading torch.
+    """
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, port: Optional[int] = None, timeout: float = 60.0):
+        self.socket_path = socket_path
+        self.port = port
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._reader = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        if self.port:
+            self._sock = socket.create_connection(("127.0.0.1", self.port), timeout=self.timeout)
+        else:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(self.timeout)
+            self._sock.connect(self.socket_path)
+        self._reader = self._sock.makefile("rb")
+
+    def request(self, op: str, **params) -> dict:
+        """Sends one request and returns its result; errors reported by the service raise RuntimeError."""
+        if self._sock is None:
+            self._connect()
+        self._sock.sendall(json.dumps({"op": op, **params}).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            self.close()
+            raise RuntimeError("The transpile service closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error", "Unknown service error"))
+        return response["result"]
+
+    def close(self):
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+            self._sock, self._reader = None, None
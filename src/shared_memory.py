@@ -0,0 +1,590 @@
+"""
+Runner-managed shared memory for passing data between polyglot segments.
+
+The region is a memory-mapped file that every segment maps directly, so
+arrays and strings are handed from one segment to the next without being
+printed and parsed. Layout (all integers little-endian):
+
+    header  (64 bytes)  magic[8] capacity:u64 count:u32 reserved:u32 next_offset:u64
+    entries (64 x 64)   name[40] dtype:u32 reserved:u32 offset:u64 length:u64
+    data                8-byte aligned buffers, bump-allocated from next_offset
+
+A buffer is written by reserving space at next_offset, copying the data and
+then publishing its entry; readers look entries up by name, newest first, so
+writing a name again replaces it. Allocation is not locked: segments sharing
+a region must not write concurrently.
+
+This module only uses the standard library: it is copied next to the
+generated runner, which uses it to create the region, and Python segments
+can import it to use the same shm_read/shm_write intrinsics.
+"""
+import mmap
+import os
+import struct
+from array import array
+from typing import List, Optional, Union
+
+ENV_VAR = "POLYGLOT_SHM"
+MAGIC = b"PGSHM001"
+HEADER_SIZE = 64
+ENTRY_SIZE = 64
+MAX_BUFFERS = 64
+NAME_LEN = 40
+DATA_START = HEADER_SIZE + ENTRY_SIZE * MAX_BUFFERS
+DEFAULT_CAPACITY = 64 * 1024 * 1024
+
+# dtype name -> (code, array typecode)
+DTYPES = {
+    "int64": (1, "q"),
+    "float64": (2, "d"),
+    "str": (3, None),
+}
+
+_HEADER = struct.Struct("<8sQIIQ")
+_ENTRY = struct.Struct("<40sIIQQ")
+
+def shm_dtype(values) -> str:
+    """Infers the buffer dtype for a Python value."""
+    if isinstance(values, str):
+        return "str"
+    if any(isinstance(v, float) for v in values):
+        return "float64"
+    return "int64"
+
+class SharedRegion:
+    """A mapped shared memory region holding named, typed buffers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.capacity, _, _, _ = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a polyglot shared memory region")
+
+    @classmethod
+    def create(cls, path: str, capacity: int = DEFAULT_CAPACITY) -> "SharedRegion":
+        """Creates (or resets) a region file of the given size in bytes."""
+        capacity = max(capacity, DATA_START)
+        with open(path, "wb") as f:
+            f.truncate(capacity) # Sparse: pages are only allocated when written
+            f.write(_HEADER.pack(MAGIC, capacity, 0, 0, DATA_START))
+        return cls(path)
+
+    def _count(self) -> int:
+        return _HEADER.unpack_from(self._map, 0)[2]
+
+    def _entries(self):
+        for i in range(self._count()):
+            name, code, _, offset, length = _ENTRY.unpack_from(self._map, HEADER_SIZE + i * ENTRY_SIZE)
+            yield name.rstrip(b"\0").decode("utf-8"), code, offset, length
+
+    def names(self) -> List[str]:
+        return list(dict.fromkeys(name for name, _, _, _ in self._entries()))
+
+    def write(self, name: str, values, dtype: str = None):
+        dtype = dtype or shm_dtype(values)
+        code, typecode = DTYPES[dtype]
+        if typecode is None:
+            data = values.encode("utf-8")
+            length = len(data)
+        else:
+            data = array(typecode, values).tobytes()
+            length = len(values)
+
+        count = self._count()
+        offset = _HEADER.unpack_from(self._map, 0)[4]
+        if count >= MAX_BUFFERS or offset + len(data) > self.capacity:
+            raise MemoryError(f"Shared memory region {self.path} is full")
+        self._map[offset:offset + len(data)] = data
+        encoded = name.encode("utf-8")[:NAME_LEN - 1]
+        _ENTRY.pack_into(self._map, HEADER_SIZE + count * ENTRY_SIZE, encoded, code, 0, offset, length)
+        # Publishing the count last makes the entry visible only once complete
+        _HEADER.pack_into(self._map, 0, MAGIC, self.capacity, count + 1, 0, (offset + len(data) + 7) & ~7)
+
+    def read(self, name: str, dtype: Optional[str] = None) -> Union[List[int], List[float], str]:
+        """The latest buffer written under name; with dtype, it must have been written as that type."""
+        for entry_name, code, offset, length in reversed(list(self._entries())):
+            if entry_name != name:
+                continue
+            stored = next(d for d, (c, _) in DTYPES.items() if c == code)
+            if dtype is not None and dtype != stored:
+                raise ValueError(f"Shared buffer {name} holds {stored}, not {dtype}")
+            typecode = DTYPES[stored][1]
+            if typecode is None:
+                return bytes(self._map[offset:offset + length]).decode("utf-8")
+            values = array(typecode)
+            values.frombytes(self._map[offset:offset + length * values.itemsize])
+            return values.tolist()
+        raise KeyError(f"Shared buffer not found: {name}")
+
+    def close(self):
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_region = None
+
+def _default_region() -> SharedRegion:
+    global _region
+    if _region is None:
+        path = os.environ.get(ENV_VAR)
+        if not path:
+            raise RuntimeError(f"{ENV_VAR} is not set; run segments through the generated runner")
+        _region = SharedRegion(path)
+    return _region
+
+def shm_read(name: str, dtype: str = "int64"):
+    """
+    Reads a named buffer from the runner's region. dtype must match the type
+    it was written as, as the native backends read it through a typed accessor.
+    """
+    return _default_region().read(name, dtype)
+
+def shm_write(name: str, values, dtype: str = None):
+    """Writes a named buffer to the runner's region."""
+    _default_region().write(name, values, dtype)
+
+# Generated per-backend helpers implementing shm_read_*/shm_write_* over the same layout
+RUST_HELPERS = r'''
+mod shm {
+    use std::fs::OpenOptions;
+    use std::os::raw::{c_int, c_long, c_void};
+    use std::os::unix::io::AsRawFd;
+    use std::sync::OnceLock;
+
+    extern "C" {
+        fn mmap(addr: *mut c_void, len: usize, prot: c_int, flags: c_int, fd: c_int, off: c_long) -> *mut c_void;
+    }
+
+    const HEADER: usize = 64;
+    const ENTRY: usize = 64;
+    const MAX_BUFFERS: usize = 64;
+    const NAME_LEN: usize = 40;
+    static REGION: OnceLock<usize> = OnceLock::new();
+
+    pub fn base() -> *mut u8 {
+        *REGION.get_or_init(|| {
+            let path = std::env::var("POLYGLOT_SHM").expect("POLYGLOT_SHM is not set");
+            let file = OpenOptions::new().read(true).write(true).open(&path).expect("cannot open shared memory region");
+            let len = file.metadata().expect("cannot stat shared memory region").len() as usize;
+            // PROT_READ | PROT_WRITE, MAP_SHARED
+            let ptr = unsafe { mmap(std::ptr::null_mut(), len, 3, 1, file.as_raw_fd(), 0) };
+            if ptr as isize == -1 { panic!("mmap of {} failed", path); }
+            ptr as usize
+        }) as *mut u8
+    }
+
+    pub fn get_u32(off: usize) -> u32 { unsafe { (base().add(off) as *const u32).read_unaligned() } }
+    pub fn get_u64(off: usize) -> u64 { unsafe { (base().add(off) as *const u64).read_unaligned() } }
+    fn set_u32(off: usize, v: u32) { unsafe { (base().add(off) as *mut u32).write_unaligned(v) } }
+    fn set_u64(off: usize, v: u64) { unsafe { (base().add(off) as *mut u64).write_unaligned(v) } }
+
+    pub fn find(name: &str, dtype: u32) -> (usize, usize) {
+        for i in (0..get_u32(16) as usize).rev() {
+            let e = HEADER + i * ENTRY;
+            let raw = unsafe { std::slice::from_raw_parts(base().add(e), NAME_LEN) };
+            let end = raw.iter().position(|&b| b == 0).unwrap_or(NAME_LEN);
+            if &raw[..end] == name.as_bytes() {
+                // The latest buffer of that name, as in Python: an older one of the right type would be stale
+                if get_u32(e + 40) != dtype { panic!("shared buffer {} holds dtype {}, not {}", name, get_u32(e + 40), dtype); }
+                return (get_u64(e + 48) as usize, get_u64(e + 56) as usize);
+            }
+        }
+        panic!("shared buffer not found: {}", name);
+    }
+
+    pub fn reserve(nbytes: usize) -> usize {
+        let offset = get_u64(24) as usize;
+        if get_u32(16) as usize >= MAX_BUFFERS || offset + nbytes > get_u64(8) as usize {
+            panic!("shared memory region is full");
+        }
+        offset
+    }
+
+    pub fn publish(name: &str, dtype: u32, length: usize, offset: usize, nbytes: usize) {
+        let count = get_u32(16) as usize;
+        let e = HEADER + count * ENTRY;
+        let bytes = name.as_bytes();
+        let n = bytes.len().min(NAME_LEN - 1);
+        unsafe {
+            std::ptr::write_bytes(base().add(e), 0, NAME_LEN);
+            std::ptr::copy_nonoverlapping(bytes.as_ptr(), base().add(e), n);
+        }
+        set_u32(e + 40, dtype);
+        set_u64(e + 48, offset as u64);
+        set_u64(e + 56, length as u64);
+        set_u64(24, ((offset + nbytes + 7) & !7) as u64);
+        set_u32(16, (count + 1) as u32);
+    }
+}
+
+fn shm_read_i64(name: &str) -> Vec<i64> {
+    let (off, n) = shm::find(name, 1);
+    unsafe { std::slice::from_raw_parts(shm::base().add(off) as *const i64, n) }.to_vec()
+}
+
+fn shm_read_f64(name: &str) -> Vec<f64> {
+    let (off, n) = shm::find(name, 2);
+    unsafe { std::slice::from_raw_parts(shm::base().add(off) as *const f64, n) }.to_vec()
+}
+
+fn shm_read_str(name: &str) -> String {
+    let (off, n) = shm::find(name, 3);
+    String::from_utf8_lossy(unsafe { std::slice::from_raw_parts(shm::base().add(off), n) }).into_owned()
+}
+
+fn shm_write_i64(name: &str, values: &[i64]) {
+    let nbytes = values.len() * 8;
+    let off = shm::reserve(nbytes);
+    unsafe { std::ptr::copy_nonoverlapping(values.as_ptr() as *const u8, shm::base().add(off), nbytes) };
+    shm::publish(name, 1, values.len(), off, nbytes);
+}
+
+fn shm_write_f64(name: &str, values: &[f64]) {
+    let nbytes = values.len() * 8;
+    let off = shm::reserve(nbytes);
+    unsafe { std::ptr::copy_nonoverlapping(values.as_ptr() as *const u8, shm::base().add(off), nbytes) };
+    shm::publish(name, 2, values.len(), off, nbytes);
+}
+
+fn shm_write_str(name: &str, value: &str) {
+    let off = shm::reserve(value.len());
+    unsafe { std::ptr::copy_nonoverlapping(value.as_ptr(), shm::base().add(off), value.len()) };
+    shm::publish(name, 3, value.len(), off, value.len());
+}
+'''
+
+CPP_HELPERS = r'''
+#include <cstdint>
+#include <cstdlib>
+#include <cstring>
+#include <stdexcept>
+#include <string>
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+
+namespace shm {
+const size_t HEADER = 64, ENTRY = 64, MAX_BUFFERS = 64, NAME_LEN = 40;
+
+inline uint8_t* base() {
+    static uint8_t* region = nullptr;
+    if (!region) {
+        const char* path = getenv("POLYGLOT_SHM");
+        if (!path) throw runtime_error("POLYGLOT_SHM is not set");
+        int fd = open(path, O_RDWR);
+        if (fd < 0) throw runtime_error("cannot open shared memory region");
+        struct stat st;
+        fstat(fd, &st);
+        void* p = mmap(nullptr, st.st_size, PROT_READ | PROT_WRITE, MAP_SHARED, fd, 0);
+        close(fd);
+        if (p == MAP_FAILED) throw runtime_error("mmap of shared memory region failed");
+        region = static_cast<uint8_t*>(p);
+    }
+    return region;
+}
+
+template <typename T> T& at(size_t off) { return *reinterpret_cast<T*>(base() + off); }
+
+inline size_t find(const string& name, uint32_t dtype, size_t& length) {
+    for (size_t i = at<uint32_t>(16); i-- > 0;) {
+        size_t e = HEADER + i * ENTRY;
+        if (strncmp(reinterpret_cast<char*>(base() + e), name.c_str(), NAME_LEN) == 0) {
+            // The latest buffer of that name, as in Python: an older one of the right type would be stale
+            if (at<uint32_t>(e + 40) != dtype) throw runtime_error("shared buffer " + name + " holds another dtype");
+            length = at<uint64_t>(e + 56);
+            return at<uint64_t>(e + 48);
+        }
+    }
+    throw runtime_error("shared buffer not found: " + name);
+}
+
+inline size_t reserve(size_t nbytes) {
+    size_t offset = at<uint64_t>(24);
+    if (at<uint32_t>(16) >= MAX_BUFFERS || offset + nbytes > at<uint64_t>(8)) throw runtime_error("shared memory region is full");
+    return offset;
+}
+
+inline void publish(const string& name, uint32_t dtype, size_t length, size_t offset, size_t nbytes) {
+    uint32_t count = at<uint32_t>(16);
+    size_t e = HEADER + count * ENTRY;
+    memset(base() + e, 0, NAME_LEN);
+    memcpy(base() + e, name.data(), name.size() < NAME_LEN ? name.size() : NAME_LEN - 1);
+    at<uint32_t>(e + 40) = dtype;
+    at<uint64_t>(e + 48) = offset;
+    at<uint64_t>(e + 56) = length;
+    at<uint64_t>(24) = (offset + nbytes + 7) & ~size_t(7);
+    at<uint32_t>(16) = count + 1;
+}
+}
+
+vector<int64_t> shm_read_i64(const string& name) {
+    size_t n, off = shm::find(name, 1, n);
+    const int64_t* p = reinterpret_cast<const int64_t*>(shm::base() + off);
+    return vector<int64_t>(p, p + n);
+}
+
+vector<double> shm_read_f64(const string& name) {
+    size_t n, off = shm::find(name, 2, n);
+    const double* p = reinterpret_cast<const double*>(shm::base() + off);
+    return vector<double>(p, p + n);
+}
+
+string shm_read_str(const string& name) {
+    size_t n, off = shm::find(name, 3, n);
+    return string(reinterpret_cast<const char*>(shm::base() + off), n);
+}
+
+template <typename T> void shm_write_array(const string& name, uint32_t dtype, const vector<T>& values) {
+    size_t nbytes = values.size() * sizeof(T);
+    size_t off = shm::reserve(nbytes);
+    memcpy(shm::base() + off, values.data(), nbytes);
+    shm::publish(name, dtype, values.size(), off, nbytes);
+}
+
+void shm_write_i64(const string& name, const vector<int64_t>& values) { shm_write_array(name, 1, values); }
+void shm_write_f64(const string& name, const vector<double>& values) { shm_write_array(name, 2, values); }
+
+void shm_write_str(const string& name, const string& value) {
+    size_t off = shm::reserve(value.size());
+    memcpy(shm::base() + off, value.data(), value.size());
+    shm::publish(name, 3, value.size(), off, value.size());
+}
+'''
+
+GO_IMPORTS = ["bytes", "encoding/binary", "math", "os", "syscall"]
+
+GO_HELPERS = r'''
+const (
+	shmHeader     = 64
+	shmEntry      = 64
+	shmMaxBuffers = 64
+	shmNameLen    = 40
+)
+
+var shmRegion []byte
+
+func shmBase() []byte {
+	if shmRegion == nil {
+		path := os.Getenv("POLYGLOT_SHM")
+		if path == "" {
+			panic("POLYGLOT_SHM is not set")
+		}
+		f, err := os.OpenFile(path, os.O_RDWR, 0)
+		if err != nil {
+			panic(err)
+		}
+		defer f.Close()
+		info, err := f.Stat()
+		if err != nil {
+			panic(err)
+		}
+		shmRegion, err = syscall.Mmap(int(f.Fd()), 0, int(info.Size()), syscall.PROT_READ|syscall.PROT_WRITE, syscall.MAP_SHARED)
+		if err != nil {
+			panic(err)
+		}
+	}
+	return shmRegion
+}
+
+func shmFind(name string, dtype uint32) (int, int) {
+	r, le := shmBase(), binary.LittleEndian
+	for i := int(le.Uint32(r[16:])) - 1; i >= 0; i-- {
+		e := shmHeader + i*shmEntry
+		raw := r[e : e+shmNameLen]
+		if end := bytes.IndexByte(raw, 0); end >= 0 {
+			raw = raw[:end]
+		}
+		if string(raw) == name {
+			// The latest buffer of that name, as in Python: an older one of the right type would be stale
+			if le.Uint32(r[e+40:]) != dtype {
+				panic("shared buffer " + name + " holds another dtype")
+			}
+			return int(le.Uint64(r[e+48:])), int(le.Uint64(r[e+56:]))
+		}
+	}
+	panic("shared buffer not found: " + name)
+}
+
+func shmReserve(nbytes int) int {
+	r, le := shmBase(), binary.LittleEndian
+	offset := int(le.Uint64(r[24:]))
+	if int(le.Uint32(r[16:])) >= shmMaxBuffers || offset+nbytes > int(le.Uint64(r[8:])) {
+		panic("shared memory region is full")
+	}
+	return offset
+}
+
+func shmPublish(name string, dtype uint32, length, offset, nbytes int) {
+	r, le := shmBase(), binary.LittleEndian
+	count := int(le.Uint32(r[16:]))
+	e := shmHeader + count*shmEntry
+	for i := 0; i < shmNameLen; i++ {
+		r[e+i] = 0
+	}
+	copy(r[e:e+shmNameLen-1], name)
+	le.PutUint32(r[e+40:], dtype)
+	le.PutUint64(r[e+48:], uint64(offset))
+	le.PutUint64(r[e+56:], uint64(length))
+	le.PutUint64(r[24:], uint64((offset+nbytes+7)&^7))
+	le.PutUint32(r[16:], uint32(count+1))
+}
+
+func shmReadI64(name string) []int64 {
+	off, n := shmFind(name, 1)
+	r := shmBase()
+	out := make([]int64, n)
+	for i := range out {
+		out[i] = int64(binary.LittleEndian.Uint64(r[off+8*i:]))
+	}
+	return out
+}
+
+func shmReadF64(name string) []float64 {
+	off, n := shmFind(name, 2)
+	r := shmBase()
+	out := make([]float64, n)
+	for i := range out {
+		out[i] = math.Float64frombits(binary.LittleEndian.Uint64(r[off+8*i:]))
+	}
+	return out
+}
+
+func shmReadStr(name string) string {
+	off, n := shmFind(name, 3)
+	return string(shmBase()[off : off+n])
+}
+
+func shmWriteI64(name string, values []int64) {
+	off := shmReserve(8 * len(values))
+	r := shmBase()
+	for i, v := range values {
+		binary.LittleEndian.PutUint64(r[off+8*i:], uint64(v))
+	}
+	shmPublish(name, 1, len(values), off, 8*len(values))
+}
+
+func shmWriteF64(name string, values []float64) {
+	off := shmReserve(8 * len(values))
+	r := shmBase()
+	for i, v := range values {
+		binary.LittleEndian.PutUint64(r[off+8*i:], math.Float64bits(v))
+	}
+	shmPublish(name, 2, len(values), off, 8*len(values))
+}
+
+func shmWriteStr(name string, value string) {
+	off := shmReserve(len(value))
+	copy(shmBase()[off:], value)
+	shmPublish(name, 3, len(value), off, len(value))
+}
+'''
+
+JAVA_HELPERS = r'''
+static class Shm {
+    static final int HEADER = 64, ENTRY = 64, MAX_BUFFERS = 64, NAME_LEN = 40;
+    static java.nio.MappedByteBuffer region;
+
+    static java.nio.MappedByteBuffer base() {
+        if (region == null) {
+            String path = System.getenv("POLYGLOT_SHM");
+            if (path == null) throw new IllegalStateException("POLYGLOT_SHM is not set");
+            try (java.nio.channels.FileChannel ch = java.nio.channels.FileChannel.open(java.nio.file.Paths.get(path),
+                    java.nio.file.StandardOpenOption.READ, java.nio.file.StandardOpenOption.WRITE)) {
+                region = ch.map(java.nio.channels.FileChannel.MapMode.READ_WRITE, 0, ch.size());
+                region.order(java.nio.ByteOrder.LITTLE_ENDIAN);
+            } catch (java.io.IOException e) {
+                throw new IllegalStateException(e);
+            }
+        }
+        return region;
+    }
+
+    static int[] find(String name, int dtype) {
+        java.nio.MappedByteBuffer r = base();
+        byte[] want = name.getBytes(java.nio.charset.StandardCharsets.UTF_8);
+        for (int i = r.getInt(16) - 1; i >= 0; i--) {
+            int e = HEADER + i * ENTRY;
+            int len = 0;
+            while (len < NAME_LEN && r.get(e + len) != 0) len++;
+            byte[] raw = new byte[len];
+            for (int k = 0; k < len; k++) raw[k] = r.get(e + k);
+            if (java.util.Arrays.equals(raw, want)) {
+                // The latest buffer of that name, as in Python: an older one of the right type would be stale
+                if (r.getInt(e + 40) != dtype) throw new IllegalStateException("shared buffer " + name + " holds another dtype");
+                return new int[] { (int) r.getLong(e + 48), (int) r.getLong(e + 56) };
+            }
+        }
+        throw new IllegalStateException("shared buffer not found: " + name);
+    }
+
+    static int reserve(int nbytes) {
+        java.nio.MappedByteBuffer r = base();
+        int offset = (int) r.getLong(24);
+        if (r.getInt(16) >= MAX_BUFFERS || offset + nbytes > r.getLong(8)) throw new IllegalStateException("shared memory region is full");
+        return offset;
+    }
+
+    static void publish(String name, int dtype, int length, int offset, int nbytes) {
+        java.nio.MappedByteBuffer r = base();
+        int count = r.getInt(16);
+        int e = HEADER + count * ENTRY;
+        byte[] bytes = name.getBytes(java.nio.charset.StandardCharsets.UTF_8);
+        for (int k = 0; k < NAME_LEN; k++) r.put(e + k, k < Math.min(bytes.length, NAME_LEN - 1) ? bytes[k] : 0);
+        r.putInt(e + 40, dtype);
+        r.putLong(e + 48, offset);
+        r.putLong(e + 56, length);
+        r.putLong(24, (offset + nbytes + 7) & ~7L);
+        r.putInt(16, count + 1);
+    }
+
+    static long[] readI64(String name) {
+        int[] loc = find(name, 1);
+        long[] out = new long[loc[1]];
+        for (int i = 0; i < out.length; i++) out[i] = base().getLong(loc[0] + 8 * i);
+        return out;
+    }
+
+    static double[] readF64(String name) {
+        int[] loc = find(name, 2);
+        double[] out = new double[loc[1]];
+        for (int i = 0; i < out.length; i++) out[i] = base().getDouble(loc[0] + 8 * i);
+        return out;
+    }
+
+    static String readStr(String name) {
+        int[] loc = find(name, 3);
+        byte[] raw = new byte[loc[1]];
+        for (int i = 0; i < raw.length; i++) raw[i] = base().get(loc[0] + i);
+        return new String(raw, java.nio.charset.StandardCharsets.UTF_8);
+    }
+
+    static void writeI64(String name, long[] values) {
+        int off = reserve(8 * values.length);
+        for (int i = 0; i < values.length; i++) base().putLong(off + 8 * i, values[i]);
+        publish(name, 1, values.length, off, 8 * values.length);
+    }
+
+    static void writeF64(String name, double[] values) {
+        int off = reserve(8 * values.length);
+        for (int i = 0; i < values.length; i++) base().putDouble(off + 8 * i, values[i]);
+        publish(name, 2, values.length, off, 8 * values.length);
+    }
+
+    static void writeStr(String name, String value) {
+        byte[] raw = value.getBytes(java.nio.charset.StandardCharsets.UTF_8);
+        int off = reserve(raw.length);
+        for (int i = 0; i < raw.length; i++) base().put(off + i, raw[i]);
+        publish(name, 3, raw.length, off, raw.length);
+    }
+}
+'''
@@ -1,4 +1,5 @@
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List
 from src.parser import CodeParser, ParsedModule, SourceSegment
 from src.strategies.base import SplitStrategy
 from src.strategies.markers import MarkerStrategy
@@ -7,28 +8,35 @@ from src.strategies.neural import NeuralStrategy
 from src.comfort import ComfortBalancer
 
 class SplitterOrchestrator:
-    def __init__(self):
+    def __init__(self, compiled_models: bool = False, workers: int = 0):
         self.strategies: List[SplitStrategy] = [
             MarkerStrategy(),
             HeuristicStrategy(),
-            NeuralStrategy()
+            NeuralStrategy(compiled=compiled_models)
         ]
         self.comfort = ComfortBalancer()
+        # Threads for expensive strategies; 0 runs everything inline
+        self.workers = workers
+
+    def iter_segments(self, parsed_module: ParsedModule) -> Iterator[SourceSegment]:
+        """
+        Lazily runs the strategy chain and the comfort function as one pipeline.
+        Each final segment is yielded as soon as it is decided, so only a bounded
+        number of segments are in flight between stages.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 0 else None
+        try:
+            # 1. Chain strategies as generators
+            stream = iter(parsed_module.segments)
+            for strategy in self.strategies:
+                stream = strategy.stream(stream, executor if strategy.expensive else None)
+
+            # 2. Apply Comfort Function
+            yield from self.comfort.balance_stream(stream)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
 
     def process_module(self, parsed_module: ParsedModule) -> ParsedModule:
-        current_segments = parsed_module.segments
-        
-        # 1. Apply Strategies sequentially
-        for strategy in self.strategies:
-            new_segments = []
-            for seg in current_segments:
-                # Apply strategy to each segment
-                result = strategy.apply(seg)
-                new_segments.extend(result)
-            current_segments = new_segments
-            
-        # 2. Apply Comfort Function
-        final_segments = self.comfort.balance(current_segments)
-        
-        parsed_module.segments = final_segments
+        parsed_module.segments = list(self.iter_segments(parsed_module))
         return parsed_module
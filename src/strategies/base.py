@@ -1,9 +1,40 @@
 from abc import ABC, abstractmethod
-from typing import List
+from collections import deque
+from concurrent.futures import Executor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
 from src.parser import SourceSegment
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yields lists of up to size consecutive items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def ordered_map(executor: Executor, fn: Callable[[T], R], items: Iterable[T], window: int) -> Iterator[R]:
+    """
+    Like executor.map, but consumes items lazily with at most window tasks in
+    flight, so memory stays bounded and results come back in input order.
+    """
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
 class SplitStrategy(ABC):
     """Abstract base class for splitting strategies."""
+
+    # Expensive strategies are run on the orchestrator's executor when one is configured
+    expensive = False
     
     @abstractmethod
     def name(self) -> str:
@@ -16,3 +47,26 @@ class SplitStrategy(ABC):
         Returns a list of segments (original if no split).
         """
         pass
+
+    def apply_batch(self, segments: List[SourceSegment]) -> List[SourceSegment]:
+        """
+        Applies the strategy to a batch of segments, returning the flattened result.
+        Strategies with per-call overhead (e.g. model inference) override this.
+        """
+        result = []
+        for seg in segments:
+            result.extend(self.apply(seg))
+        return result
+
+    def stream(self, segments: Iterable[SourceSegment],
+               executor: Optional[Executor] = None, window: int = 8) -> Iterator[SourceSegment]:
+        """
+        Lazily applies the strategy, yielding each result as soon as it is decided.
+        With an executor, segments are processed in parallel but yielded in order.
+        """
+        if executor is None:
+            for seg in segments:
+                yield from self.apply(seg)
+            return
+        for result in ordered_map(executor, self.apply, segments, window):
+            yield from result
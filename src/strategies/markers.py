@@ -10,39 +10,28 @@ class MarkerStrategy(SplitStrategy):
         return "Marker-based Splitting"
 
     def apply(self, segment: SourceSegment) -> List[SourceSegment]:
-        if "# SPLIT" not in segment.code:
+        # Marker lines are located in the shared buffer, and each chunk is a
+        # view over it rather than a re-joined copy of the lines.
+        marker_lines = segment.find_lines("# SPLIT")
+        if not marker_lines:
             return [segment]
-            
-        # Naive splitting by line for demo purposes
-        # In production, we would carefully reconstruct AST or preserve indentation
-        lines = segment.code.splitlines()
+
         new_segments = []
-        current_chunk = []
         start_line = segment.start_line
         
-        for i, line in enumerate(lines):
-            if "# SPLIT" in line:
-                if current_chunk:
-                    code_str = "\n".join(current_chunk)
-                    new_segments.append(SourceSegment(
-                        id=f"{segment.id}_p{len(new_segments)}",
-                        code=code_str,
-                        start_line=start_line,
-                        end_line=start_line + len(current_chunk) - 1,
-                        tags=["explicit_split"]
-                    ))
-                    current_chunk = []
-                start_line = segment.start_line + i + 1
-            else:
-                current_chunk.append(line)
+        for marker_line in marker_lines:
+            if marker_line > start_line:
+                new_segments.append(segment.lines_view(
+                    start_line, marker_line - 1,
+                    id=f"{segment.id}_p{len(new_segments)}",
+                    tags=["explicit_split"]
+                ))
+            start_line = marker_line + 1
                 
-        if current_chunk:
-            code_str = "\n".join(current_chunk)
-            new_segments.append(SourceSegment(
+        if start_line <= segment.end_line:
+            new_segments.append(segment.lines_view(
+                start_line, segment.end_line,
                 id=f"{segment.id}_p{len(new_segments)}",
-                code=code_str,
-                start_line=start_line,
-                end_line=segment.end_line,
                 tags=["remainder"]
             ))
             
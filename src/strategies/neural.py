@@ -1,84 +1,165 @@
+import ast
+import textwrap
+from concurrent.futures import Executor
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from typing import List, Dict
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+from typing import Dict, Iterable, Iterator, List, Optional
 from src.parser import SourceSegment
-from src.strategies.base import SplitStrategy
-import random
+from src.strategies.base import SplitStrategy, chunked, ordered_map
+from src.strategies.tokenizer import CodeTokenizer
+from src.compiled_inference import compile_model, DEFAULT_CACHE_DIR
 
 class CodeSplitterModel(nn.Module):
     """
-    A simple LSTM-based model to predict split points in code.
+    A simple LSTM-based sequence tagger predicting split points in code.
+    Emits a split probability for every token; the probability at a line's
+    NEWLINE token is the score for splitting after that line.
     """
     def __init__(self, vocab_size: int, embedding_dim: int, hidden_dim: int):
         super().__init__()
-        self.embedding = nn.Embedding(vocab_size, embedding_dim)
+        self.embedding = nn.Embedding(vocab_size, embedding_dim, padding_idx=CodeTokenizer.PAD)
         self.lstm = nn.LSTM(embedding_dim, hidden_dim, batch_first=True, bidirectional=True)
-        self.fc = nn.Linear(hidden_dim * 2, 1) # Binary classification: Split or Not
+        self.fc = nn.Linear(hidden_dim * 2, 1) # Binary tagging per token: Split or Not
 
-    def forward(self, x):
-        # x: [batch, seq_len]
+    def forward(self, x, lengths: Optional[torch.Tensor] = None):
+        # x: [batch, seq_len], lengths: [batch] sorted in decreasing order (or None)
         embedded = self.embedding(x)
-        outputs, _ = self.lstm(embedded)
-        # We want a prediction for the sequence (or per token, but let's say per line/segment representation)
-        # For simplicity, let's assume we pool or take last state
-        # But for "splitting", we usually want seq-to-seq labeling.
-        # Let's assume we classify the whole segment as "needs split" or not.
-        final_hidden = outputs[:, -1, :]
-        prediction = torch.sigmoid(self.fc(final_hidden))
-        return prediction
+        if lengths is None:
+            outputs, _ = self.lstm(embedded)
+        else:
+            # Packed sequences keep padding out of the recurrence
+            packed = pack_padded_sequence(embedded, lengths, batch_first=True, enforce_sorted=True)
+            packed_out, _ = self.lstm(packed)
+            outputs, _ = pad_packed_sequence(packed_out, batch_first=True, total_length=x.size(1))
+        return torch.sigmoid(self.fc(outputs)).squeeze(-1)
 
 class NeuralStrategy(SplitStrategy):
-    """Splits code based on a Neural Network classifier."""
+    """Splits code at statement boundaries scored by a neural sequence tagger."""
 
-    def __init__(self):
+    expensive = True
+
+    def __init__(self, batch_size: int = 64, max_tokens: int = 2048,
+                 min_chars: int = 50, max_lines: int = 15, threshold: float = 0.5,
+                 compiled: bool = False, cache_dir: str = DEFAULT_CACHE_DIR):
         # In a real scenario, we would load weights here.
         self.vocab_size = 1000
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.min_chars = min_chars
+        self.max_lines = max_lines
+        self.threshold = threshold
+        self.tokenizer = CodeTokenizer(self.vocab_size)
+        # Seeded so split decisions are reproducible between runs
+        torch.manual_seed(42)
         self.model = CodeSplitterModel(self.vocab_size, 64, 128)
-        self.model.eval() 
+        self.model.eval()
+
+        if compiled:
+            # TorchScript + int8 path, verified against eager on padded and unpadded batches
+            tokens = torch.randint(1, self.vocab_size, (4, 40))
+            lengths = torch.tensor([40, 31, 12, 3])
+            self.model = compile_model(self.model, "code_splitter", [(tokens, lengths), (tokens[:1],)],
+                                       cache_dir=cache_dir)
 
     def name(self) -> str:
         return "Neural Network Splitting"
 
     def apply(self, segment: SourceSegment) -> List[SourceSegment]:
-        # 1. Preprocess code (tokenize) - Mocked
-        # 2. Run inference
-        # 3. Split based on result
-        
-        # Mock inference logic:
-        # If the segment is long, the NN "detects" a split point.
-        
-        if len(segment.code) < 50:
-            return [segment]
-            
-        with torch.no_grad():
-            # Mock input tensor
-            dummy_input = torch.randint(0, self.vocab_size, (1, 10)) 
-            prob = self.model(dummy_input).item()
-            
-        # If probability is high, we force a split (mock logic: split in half)
-        if prob > 0.5 or len(segment.code.splitlines()) > 15:
-            lines = segment.code.splitlines()
-            mid = len(lines) // 2
-            
-            part1_code = "\n".join(lines[:mid])
-            part2_code = "\n".join(lines[mid:])
-            
-            seg1 = SourceSegment(
-                id=f"{segment.id}_nn1",
-                code=part1_code,
-                start_line=segment.start_line,
-                end_line=segment.start_line + mid - 1,
-                tags=["neural_split"]
-            )
-            
-            seg2 = SourceSegment(
-                id=f"{segment.id}_nn2",
-                code=part2_code,
-                start_line=segment.start_line + mid,
-                end_line=segment.end_line,
-                tags=["neural_split"]
-            )
-            return [seg1, seg2]
-
-        return [segment]
+        return self.apply_batch([segment])
+
+    def apply_batch(self, segments: List[SourceSegment]) -> List[SourceSegment]:
+        # 1. Find statement boundaries and tokenize the candidates
+        candidates = []
+        for seg in segments:
+            if seg.size < self.min_chars:
+                continue
+            boundaries = self._statement_boundaries(seg)
+            if boundaries:
+                candidates.append((seg, boundaries))
+
+        # 2. Score every line of every candidate in length-bucketed batches
+        line_probs = self._score_lines([seg.code for seg, _ in candidates])
+
+        # 3. Split at the best-scoring boundary when the model or the length asks for it
+        splits: Dict[int, int] = {}
+        for (seg, boundaries), probs in zip(candidates, line_probs):
+            # A boundary at line b means "split after line b - 1"
+            scored = [(probs[b - seg.start_line - 1], b) for b in boundaries
+                      if b - seg.start_line - 1 < len(probs)]
+            if not scored:
+                continue
+            prob, boundary = max(scored)
+            if prob > self.threshold or seg.line_count > self.max_lines:
+                splits[id(seg)] = boundary
+
+        result = []
+        for seg in segments:
+            boundary = splits.get(id(seg))
+            if boundary is None:
+                result.append(seg)
+                continue
+            result.append(seg.lines_view(seg.start_line, boundary - 1, id=f"{seg.id}_nn1", tags=["neural_split"]))
+            result.append(seg.lines_view(boundary, seg.end_line, id=f"{seg.id}_nn2", tags=["neural_split"]))
+        return result
+
+    def stream(self, segments: Iterable[SourceSegment],
+               executor: Optional[Executor] = None, window: int = 4) -> Iterator[SourceSegment]:
+        # Micro-batches keep inference batched while results still flow out early
+        batches = chunked(segments, self.batch_size)
+        if executor is None:
+            for batch in batches:
+                yield from self.apply_batch(batch)
+            return
+        # torch releases the GIL inside the LSTM, so batches overlap on threads
+        for result in ordered_map(executor, self.apply_batch, batches, window):
+            yield from result
+
+    def _score_lines(self, codes: List[str]) -> List[List[float]]:
+        """Per-line split probabilities for each code string, batched by token length."""
+        encoded = []
+        for code in codes:
+            ids, newlines = self.tokenizer.encode(code)
+            encoded.append((ids[:self.max_tokens], [p for p in newlines if p < self.max_tokens]))
+
+        results: List[Optional[List[float]]] = [None] * len(codes)
+        # Sorting by length makes each batch a bucket of similar lengths (little padding),
+        # and gives the decreasing order pack_padded_sequence expects.
+        order = sorted(range(len(encoded)), key=lambda i: len(encoded[i][0]), reverse=True)
+        with torch.inference_mode():
+            for start in range(0, len(order), self.batch_size):
+                bucket = order[start:start + self.batch_size]
+                lengths = [len(encoded[i][0]) for i in bucket]
+                batch = torch.full((len(bucket), lengths[0]), CodeTokenizer.PAD, dtype=torch.long)
+                for row, i in enumerate(bucket):
+                    batch[row, :lengths[row]] = torch.tensor(encoded[i][0], dtype=torch.long)
+                probs = self.model(batch, torch.tensor(lengths))
+                for row, i in enumerate(bucket):
+                    newlines = encoded[i][1]
+                    results[i] = probs[row, newlines].tolist()
+        return results
+
+    def _statement_boundaries(self, segment: SourceSegment) -> List[int]:
+        """
+        Absolute line numbers where a new statement of the segment's outermost
+        block starts, i.e. the only places a split keeps both parts well-formed.
+        """
+        offset = 0
+        tree = segment.ast_node
+        if tree is None:
+            try:
+                tree = ast.parse(textwrap.dedent(segment.code))
+            except SyntaxError:
+                return []
+            offset = segment.start_line - 1
+        body = tree.body if isinstance(tree, ast.Module) else [tree]
+        if len(body) == 1 and isinstance(body[0], (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = body[0].body
+
+        boundaries = []
+        for prev, node in zip(body, body[1:]):
+            start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+            if prev.end_lineno < start:
+                boundaries.append(start + offset)
+        return [b for b in boundaries if segment.start_line < b <= segment.end_line]
@@ -0,0 +1,80 @@
+import keyword
+import re
+import zlib
+from typing import List, Tuple
+
+class CodeTokenizer:
+    """
+    Maps code text to ids in the splitter model's vocabulary.
+
+    A regex lexer is used instead of the tokenize module because segments
+    produced by line-based splits are often not standalone Python.
+    Keywords and operators get fixed ids, identifiers are hashed into the
+    remaining buckets, and every line ends with a NEWLINE token whose
+    position is reported so the model can tag split points per line.
+    """
+    PAD, UNK, NEWLINE, NUMBER, STRING, COMMENT = range(6)
+    MAX_INDENT = 8
+    OPERATORS = [
+        "==", "!=", "<=", ">=", "**", "//", "->", "+=", "-=", "*=", "/=", "%=", ":=",
+        "+", "-", "*", "/", "%", "<", ">", "=", "(", ")", "[", "]", "{", "}",
+        ",", ":", ".", ";", "@", "&", "|", "^", "~", "!",
+    ]
+
+    _TOKEN_RE = re.compile(
+        r'#.*'
+        r'|"(?:\\.|[^"\\])*"?|\'(?:\\.|[^\'\\])*\'?'
+        r'|\d[\d_]*(?:\.\d*)?(?:[eE][+-]?\d+)?'
+        r'|\w+'
+        r'|==|!=|<=|>=|\*\*|//|->|[-+*/%]=|:='
+        r'|[^\s\w]'
+    )
+
+    def __init__(self, vocab_size: int = 1000):
+        self.vocab_size = vocab_size
+        self.indent_base = 6
+        fixed = list(keyword.kwlist) + self.OPERATORS
+        offset = self.indent_base + self.MAX_INDENT
+        self.fixed_ids = {tok: offset + i for i, tok in enumerate(fixed)}
+        self.hash_base = offset + len(fixed)
+        self._cache = {}
+        if self.hash_base >= vocab_size:
+            raise ValueError(f"vocab_size must be larger than {self.hash_base}")
+
+    def encode(self, code: str) -> Tuple[List[int], List[int]]:
+        """
+        Returns (token ids, newline positions) where newline_positions[i] is the
+        index of the NEWLINE token that ends line i of the code.
+        """
+        ids = []
+        newline_positions = []
+        cache = self._cache
+        for line in code.split("\n"):
+            stripped = line.lstrip()
+            if stripped:
+                depth = (len(line) - len(stripped)) // 4
+                ids.append(self.indent_base + min(depth, self.MAX_INDENT - 1))
+                for tok in self._TOKEN_RE.findall(stripped):
+                    tok_id = cache.get(tok)
+                    if tok_id is None:
+                        tok_id = cache[tok] = self._token_id(tok)
+                    ids.append(tok_id)
+            newline_positions.append(len(ids))
+            ids.append(self.NEWLINE)
+        return ids, newline_positions
+
+    def _token_id(self, tok: str) -> int:
+        fixed = self.fixed_ids.get(tok)
+        if fixed is not None:
+            return fixed
+        first = tok[0]
+        if first == "#":
+            return self.COMMENT
+        if first in "\"'":
+            return self.STRING
+        if first.isdigit():
+            return self.NUMBER
+        if first.isalpha() or first == "_":
+            # Stable across runs, unlike hash()
+            return self.hash_base + zlib.crc32(tok.encode("utf-8")) % (self.vocab_size - self.hash_base)
+        return self.UNK
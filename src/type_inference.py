@@ -0,0 +1,493 @@
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+# Inferred types. None (the Python value) means "no information yet";
+# UNKNOWN means the evidence conflicts and the backend must pick a default.
+INT = "int"
+FLOAT = "float"
+BOOL = "bool"
+STR = "str"
+NONE = "None"
+UNKNOWN = "unknown"
+
+SCALARS = (INT, FLOAT, BOOL, STR)
+
+def list_of(elem: Optional[str]) -> str:
+    return f"list[{elem or INT}]"
+
+def is_list(t: Optional[str]) -> bool:
+    return bool(t) and t.startswith("list[")
+
+def element_type(t: Optional[str]) -> Optional[str]:
+    if is_list(t):
+        return t[5:-1]
+    if t == STR:
+        return STR
+    return None
+
+def is_numeric(t: Optional[str]) -> bool:
+    return t in (INT, FLOAT, BOOL)
+
+def join(a: Optional[str], b: Optional[str]) -> Optional[str]:
+    """Least upper bound: int and float widen to float, bool widens to int."""
+    if a is None or a == b:
+        return b
+    if b is None:
+        return a
+    if is_numeric(a) and is_numeric(b):
+        return FLOAT if FLOAT in (a, b) else INT
+    if is_list(a) and is_list(b):
+        return list_of(join(element_type(a), element_type(b)))
+    return UNKNOWN
+
+def _annotation_type(node: Optional[ast.AST]) -> Optional[str]:
+    if node is None:
+        return None
+    if isinstance(node, ast.Constant) and node.value is None:
+        return NONE
+    if isinstance(node, ast.Name):
+        return {"int": INT, "float": FLOAT, "bool": BOOL, "str": STR, "list": list_of(None)}.get(node.id)
+    if isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name) and node.value.id in ("list", "List"):
+        return list_of(_annotation_type(node.slice))
+    return None
+
+@dataclass
+class FunctionTypes:
+    """Inferred types for one function or method."""
+    name: str
+    class_name: Optional[str] = None
+    args: Dict[str, Optional[str]] = field(default_factory=dict)
+    locals: Dict[str, Optional[str]] = field(default_factory=dict)
+    returns: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.class_name}.{self.name}" if self.class_name else self.name
+
+    def var(self, name: str) -> Optional[str]:
+        return self.locals.get(name) or self.args.get(name)
+
+class TypeInference:
+    """
+    Flow-based type inference over the functions and methods of a module.
+
+    Types flow from literals, operators, annotations, builtin and module call
+    returns into locals, attributes and return values. Unannotated arguments
+    are typed from how they are used (arithmetic, comparisons, indexing,
+    assignments to typed targets) and from the values passed at call sites in
+    the module. Everything is iterated to a fixpoint, so types also flow
+    through loops and between mutually calling functions.
+    """
+    def __init__(self, max_rounds: int = 10):
+        self.max_rounds = max_rounds
+        self.functions: Dict[str, FunctionTypes] = {}
+        self.attributes: Dict[str, Dict[str, Optional[str]]] = {}
+        self._nodes: Dict[str, ast.AST] = {}
+        self._changed = False
+        self._frozen = False
+        self._current: Optional[FunctionTypes] = None
+
+    def infer(self, tree: ast.AST) -> "TypeInference":
+        self.functions = {}
+        self.attributes = {}
+        self._nodes = {}
+        body = tree.body if isinstance(tree, ast.Module) else [tree]
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._register(node, None)
+            elif isinstance(node, ast.ClassDef):
+                self.attributes[node.name] = {}
+                for child in node.body:
+                    if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        self._register(child, node.name)
+
+        for _ in range(self.max_rounds):
+            self._changed = False
+            for key, node in self._nodes.items():
+                self._current = self.functions[key]
+                self._visit_function(node)
+            if not self._changed:
+                break
+        self._current = None
+        return self
+
+    def function(self, name: str, class_name: Optional[str] = None) -> FunctionTypes:
+        key = f"{class_name}.{name}" if class_name else name
+        return self.functions.get(key) or FunctionTypes(name, class_name)
+
+    # --- Bookkeeping -----------------------------------------------------
+
+    def _register(self, node, class_name):
+        ft = FunctionTypes(node.name, class_name)
+        args = [a for a in node.args.args if not (class_name and a.arg == "self")]
+        defaults = [None] * (len(args) - len(node.args.defaults)) + list(node.args.defaults)
+        for arg, default in zip(args, defaults):
+            ft.args[arg.arg] = _annotation_type(arg.annotation) or (self._const_type(default) if default else None)
+        ft.returns = _annotation_type(node.returns)
+        self.functions[ft.key] = ft
+        self._nodes[ft.key] = node
+
+    def _update(self, table: Dict[str, Optional[str]], name: str, t: Optional[str]):
+        if t is None or t == NONE or self._frozen:
+            return
+        new = join(table.get(name), t)
+        if new != table.get(name):
+            table[name] = new
+            self._changed = True
+
+    def _assign_var(self, name: str, t: Optional[str]):
+        ft = self._current
+        self._update(ft.args if name in ft.args else ft.locals, name, t)
+
+    def _demand(self, node: ast.AST, t: Optional[str]):
+        """Records that an expression is used as type t (types arguments from usage)."""
+        if t in (None, NONE, UNKNOWN):
+            return
+        if isinstance(node, ast.Name) and node.id in self._current.args and self._current.args[node.id] is None:
+            self._update(self._current.args, node.id, t)
+        elif isinstance(node, ast.Attribute) and self._is_self(node.value) and self._current.class_name:
+            attrs = self.attributes[self._current.class_name]
+            if attrs.get(node.attr) is None:
+                self._update(attrs, node.attr, t)
+
+    @staticmethod
+    def _is_self(node) -> bool:
+        return isinstance(node, ast.Name) and node.id == "self"
+
+    # --- Statements ------------------------------------------------------
+
+    def _visit_function(self, node):
+        for stmt in node.body:
+            self._stmt(stmt)
+
+    def _stmt(self, node):
+        if isinstance(node, ast.Assign):
+            value = self.expr_type(node.value)
+            for target in node.targets:
+                self._assign(target, node.value, value)
+        elif isinstance(node, ast.AnnAssign):
+            t = _annotation_type(node.annotation)
+            if node.value is not None:
+                t = t or self.expr_type(node.value)
+            self._assign(node.target, node.value, t)
+        elif isinstance(node, ast.AugAssign):
+            target_t = self.expr_type(node.target)
+            value_t = self.expr_type(node.value)
+            self._demand(node.value, target_t if is_numeric(target_t) or target_t == STR else None)
+            self._demand(node.target, value_t)
+            self._assign(node.target, None, self._binop_type(node.op, target_t, value_t))
+        elif isinstance(node, (ast.For, ast.AsyncFor)):
+            iter_t = self.expr_type(node.iter)
+            # Iterating an untyped argument makes it a list
+            self._demand(node.iter, list_of(None))
+            self._assign(node.target, None, element_type(iter_t))
+            for stmt in node.body + node.orelse:
+                self._stmt(stmt)
+        elif isinstance(node, ast.While):
+            self.expr_type(node.test)
+            for stmt in node.body + node.orelse:
+                self._stmt(stmt)
+        elif isinstance(node, ast.If):
+            self.expr_type(node.test)
+            for stmt in node.body + node.orelse:
+                self._stmt(stmt)
+        elif isinstance(node, (ast.With, ast.AsyncWith)):
+            for stmt in node.body:
+                self._stmt(stmt)
+        elif isinstance(node, ast.Try):
+            for stmt in node.body + node.orelse + node.finalbody:
+                self._stmt(stmt)
+            for handler in node.handlers:
+                for stmt in handler.body:
+                    self._stmt(stmt)
+        elif isinstance(node, ast.Return):
+            t = self.expr_type(node.value) if node.value is not None else NONE
+            if t != NONE:
+                declared = self._current.returns
+                self._demand(node.value, declared)
+                returns = join(declared, t)
+                if returns != declared and not self._frozen:
+                    self._current.returns = returns
+                    self._changed = True
+        elif isinstance(node, ast.Expr):
+            self.expr_type(node.value)
+
+    def _assign(self, target, value_node, t):
+        if isinstance(target, ast.Name):
+            existing = self._current.var(target.id)
+            if value_node is not None and existing not in (None, UNKNOWN):
+                self._demand(value_node, existing)
+            self._assign_var(target.id, t)
+        elif isinstance(target, ast.Attribute) and self._is_self(target.value) and self._current.class_name:
+            attrs = self.attributes[self._current.class_name]
+            if value_node is not None and attrs.get(target.attr) not in (None, UNKNOWN):
+                self._demand(value_node, attrs[target.attr])
+            self._update(attrs, target.attr, t)
+        elif isinstance(target, ast.Tuple):
+            elts = value_node.elts if isinstance(value_node, ast.Tuple) else [None] * len(target.elts)
+            for sub, val in zip(target.elts, elts):
+                self._assign(sub, val, self.expr_type(val) if val is not None else None)
+        elif isinstance(target, ast.Subscript):
+            container = self.expr_type(target.value)
+            self.expr_type(target.slice)
+            self._demand(target.slice, INT if is_list(container) else None)
+            if is_list(container) and value_node is not None:
+                self._demand(value_node, element_type(container))
+
+    # --- Expressions -----------------------------------------------------
+
+    @staticmethod
+    def _const_type(node) -> Optional[str]:
+        if not isinstance(node, ast.Constant):
+            return None
+        value = node.value
+        if isinstance(value, bool):
+            return BOOL
+        if isinstance(value, int):
+            return INT
+        if isinstance(value, float):
+            return FLOAT
+        if isinstance(value, str):
+            return STR
+        if value is None:
+            return NONE
+        return None
+
+    def _binop_type(self, op, left: Optional[str], right: Optional[str]) -> Optional[str]:
+        if isinstance(op, ast.Add) and STR in (left, right):
+            return STR
+        if isinstance(op, ast.Add) and (is_list(left) or is_list(right)):
+            return join(left, right) if is_list(left) and is_list(right) else (left if is_list(left) else right)
+        if isinstance(op, ast.Mult) and (is_list(left) or left == STR):
+            return left
+        if isinstance(op, ast.Mult) and (is_list(right) or right == STR):
+            return right
+        if isinstance(op, ast.Mod) and left == STR:
+            return STR
+        if isinstance(op, ast.Div):
+            return FLOAT
+        if isinstance(op, (ast.BitAnd, ast.BitOr, ast.BitXor, ast.LShift, ast.RShift)):
+            return INT
+        if left is None and right is None:
+            return None
+        if not (is_numeric(left or right) and is_numeric(right or left)):
+            return UNKNOWN
+        return join(INT if left == BOOL else left, INT if right == BOOL else right)
+
+    def expr_type(self, node: Optional[ast.AST], ft: Optional[FunctionTypes] = None) -> Optional[str]:
+        """
+        Type of an expression in the current function, or in ft once inference
+        has finished (queries with ft never change the inferred types).
+        """
+        if ft is not None:
+            saved, self._current, self._frozen = self._current, ft, True
+            try:
+                return self.expr_type(node)
+            finally:
+                self._current, self._frozen = saved, False
+        if node is None:
+            return None
+
+        const = self._const_type(node)
+        if const:
+            return const
+        if isinstance(node, ast.Name):
+            return self._current.var(node.id) if self._current else None
+        if isinstance(node, ast.Attribute):
+            self.expr_type(node.value)
+            if self._is_self(node.value) and self._current and self._current.class_name:
+                return self.attributes.get(self._current.class_name, {}).get(node.attr)
+            return None
+        if isinstance(node, ast.BinOp):
+            left, right = self.expr_type(node.left), self.expr_type(node.right)
+            if isinstance(node.op, ast.Add) and STR in (left, right):
+                self._demand(node.left, STR)
+                self._demand(node.right, STR)
+            elif not isinstance(node.op, ast.Mult) or not (is_list(left) or is_list(right)):
+                if is_numeric(left):
+                    self._demand(node.right, INT if left == BOOL else left)
+                if is_numeric(right):
+                    self._demand(node.left, INT if right == BOOL else right)
+            return self._binop_type(node.op, left, right)
+        if isinstance(node, ast.UnaryOp):
+            operand = self.expr_type(node.operand)
+            if isinstance(node.op, ast.Not):
+                return BOOL
+            return INT if operand == BOOL else operand
+        if isinstance(node, ast.BoolOp):
+            t = None
+            for value in node.values:
+                t = join(t, self.expr_type(value))
+            return t
+        if isinstance(node, ast.Compare):
+            operands = [node.left] + node.comparators
+            types = [self.expr_type(o) for o in operands]
+            for op, (a, ta), (b, tb) in zip(node.ops, zip(operands, types), zip(operands[1:], types[1:])):
+                if isinstance(op, (ast.In, ast.NotIn)):
+                    self._demand(a, element_type(tb))
+                    continue
+                self._demand(a, tb)
+                self._demand(b, ta)
+            return BOOL
+        if isinstance(node, ast.IfExp):
+            self.expr_type(node.test)
+            return join(self.expr_type(node.body), self.expr_type(node.orelse))
+        if isinstance(node, ast.JoinedStr):
+            for value in node.values:
+                if isinstance(value, ast.FormattedValue):
+                    self.expr_type(value.value)
+            return STR
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            elem = None
+            for elt in node.elts:
+                elem = join(elem, self.expr_type(elt))
+            return list_of(elem)
+        if isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp)):
+            self._comprehension(node.generators)
+            return list_of(self.expr_type(node.elt))
+        if isinstance(node, ast.Subscript):
+            container = self.expr_type(node.value)
+            if isinstance(node.slice, ast.Slice):
+                for part in (node.slice.lower, node.slice.upper, node.slice.step):
+                    self._demand(part, INT)
+                    self.expr_type(part)
+                return container
+            self.expr_type(node.slice)
+            self._demand(node.slice, INT if is_list(container) or container == STR else None)
+            if container is None:
+                self._demand(node.value, list_of(None))
+            return element_type(container)
+        if isinstance(node, ast.Call):
+            return self._call_type(node)
+        if isinstance(node, ast.Await):
+            return self.expr_type(node.value)
+        if isinstance(node, ast.Starred):
+            return self.expr_type(node.value)
+        if isinstance(node, ast.Yield):
+            self._yield(self.expr_type(node.value) if node.value is not None else NONE)
+            return None
+        return None
+
+    def _yield(self, t: Optional[str]):
+        # Generators are typed as the list of the values they yield
+        if self._current is None or t in (None, NONE):
+            return
+        returns = join(self._current.returns, list_of(t))
+        if returns != self._current.returns and not self._frozen:
+            self._current.returns = returns
+            self._changed = True
+
+    def _comprehension(self, generators):
+        for gen in generators:
+            iter_t = self.expr_type(gen.iter)
+            self._demand(gen.iter, list_of(None))
+            self._assign(gen.target, None, element_type(iter_t))
+            for cond in gen.ifs:
+                self.expr_type(cond)
+
+    def _call_type(self, node: ast.Call) -> Optional[str]:
+        arg_types = [self.expr_type(a) for a in node.args]
+        func = node.func
+        if isinstance(func, ast.Name):
+            name = func.id
+            if name in ("int", "len", "round", "ord", "hash"):
+                return INT if name != "round" or len(node.args) < 2 else FLOAT
+            if name == "float":
+                return FLOAT
+            if name in ("str", "repr", "chr", "input"):
+                return STR
+            if name in ("bool", "isinstance", "callable", "hasattr"):
+                if name == "isinstance" and len(node.args) == 2:
+                    self._demand(node.args[0], _annotation_type(node.args[1]))
+                return BOOL
+            if name == "range":
+                for a in node.args:
+                    self._demand(a, INT)
+                return list_of(INT)
+            if name == "abs":
+                return arg_types[0] if arg_types else None
+            if name in ("min", "max"):
+                if len(arg_types) == 1:
+                    return element_type(arg_types[0])
+                t = None
+                for a in arg_types:
+                    t = join(t, a)
+                return t
+            if name == "sum":
+                return element_type(arg_types[0]) if arg_types and element_type(arg_types[0]) else INT
+            if name in ("any", "all"):
+                return BOOL
+            if name in ("list", "sorted", "reversed"):
+                return arg_types[0] if arg_types and is_list(arg_types[0]) else list_of(element_type(arg_types[0]) if arg_types else None)
+            if name == "shm_read":
+                dtype = node.args[1].value if len(node.args) > 1 and isinstance(node.args[1], ast.Constant) else "int64"
+                for kw in node.keywords:
+                    if kw.arg == "dtype" and isinstance(kw.value, ast.Constant):
+                        dtype = kw.value.value
+                return {"float64": list_of(FLOAT), "str": STR}.get(dtype, list_of(INT))
+            if name in self.functions:
+                return self._module_call(self.functions[name], node, arg_types)
+            if name in self.attributes and f"{name}.__init__" in self.functions:
+                self._module_call(self.functions[f"{name}.__init__"], node, arg_types)
+            return None
+
+        if isinstance(func, ast.Attribute):
+            owner = self.expr_type(func.value)
+            if isinstance(func.value, ast.Name) and func.value.id == "math":
+                return INT if func.attr in ("floor", "ceil", "factorial", "gcd", "comb", "perm") else FLOAT
+            if isinstance(func.value, ast.Name) and func.value.id == "asyncio":
+                if func.attr == "gather":
+                    elem = None
+                    for arg, t in zip(node.args, arg_types):
+                        elem = join(elem, element_type(t) if isinstance(arg, ast.Starred) else t)
+                    return list_of(elem)
+                if func.attr in ("create_task", "ensure_future", "wait_for"):
+                    # A task awaits to the value of its coroutine
+                    return arg_types[0] if arg_types else None
+                return None
+            if func.attr in ("upper", "lower", "strip", "lstrip", "rstrip", "title", "capitalize",
+                             "replace", "format", "zfill", "center", "ljust", "rjust"):
+                self._demand(func.value, STR)
+                return STR
+            if func.attr == "join":
+                return STR
+            if func.attr in ("startswith", "endswith", "isdigit", "isalpha", "isalnum", "isspace"):
+                self._demand(func.value, STR)
+                return BOOL
+            if func.attr in ("find", "count", "index"):
+                return INT
+            if func.attr == "split":
+                return list_of(STR)
+            if func.attr == "append" and node.args:
+                if is_list(owner):
+                    self._demand(node.args[0], element_type(owner))
+                else:
+                    self._demand(func.value, list_of(arg_types[0]))
+                    if isinstance(func.value, ast.Name) and func.value.id in self._current.locals:
+                        self._assign_var(func.value.id, list_of(arg_types[0]))
+                return NONE
+            if func.attr == "pop":
+                return element_type(owner)
+            # asyncio.Queue is typed as a list of its items; None is the usual end-of-stream sentinel
+            if func.attr in ("put", "put_nowait") and len(node.args) == 1:
+                if arg_types[0] not in (None, NONE):
+                    self._demand(func.value, list_of(arg_types[0]))
+                    if isinstance(func.value, ast.Name) and func.value.id in self._current.locals:
+                        self._assign_var(func.value.id, list_of(arg_types[0]))
+                return NONE
+            if func.attr in ("get", "get_nowait") and not node.args:
+                return element_type(owner)
+            if self._is_self(func.value) and self._current and self._current.class_name:
+                method = self.functions.get(f"{self._current.class_name}.{func.attr}")
+                if method:
+                    return self._module_call(method, node, arg_types)
+        return None
+
+    def _module_call(self, callee: FunctionTypes, node: ast.Call, arg_types: List[Optional[str]]) -> Optional[str]:
+        # Call sites type the callee's arguments, and typed parameters type the call's arguments
+        for (name, param_t), arg, arg_t in zip(list(callee.args.items()), node.args, arg_types):
+            self._demand(arg, param_t)
+            if arg_t not in (None, UNKNOWN, NONE):
+                self._update(callee.args, name, arg_t)
+        return callee.returns
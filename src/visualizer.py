@@ -24,7 +24,9 @@ class Visualizer:
             "Rust": "orange",
             "C++": "lightblue",
             "Go": "cyan",
-            "Java": "lightgrey"
+            "Java": "lightgrey",
+            "NumPy": "palegreen",
+            "Python": "lightyellow"
         }
 
         for i, seg in enumerate(segments_data):
@@ -71,6 +73,7 @@ class Visualizer:
             elif f.loops > 0: reason = "Loop Performance"
             elif f.classes > 0: reason = "OOP Structure"
             elif f.async_ops > 0: reason = "Concurrency"
+            if seg.get('source') == "Profile": reason = "Cold (profiled)"
             
             table.add_row(str(i), seg['lang'], reason, f"{seg['score']:.2f}")
             
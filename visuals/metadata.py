@@ -19,11 +19,8 @@ class MetadataGenerator:
 
         output_path = os.path.join(self.output_dir, f"metadata_{os.path.basename(module.path)}.json")
         
-        data = dataclasses.asdict(module)
-        # Remove non-serializable parts manually or use the encoder above
-        # dataclasses.asdict is recursive, so we need to handle ast_node inside segments
-        
-        # Let's just build a clean dict
+        # Build a clean dict; dataclasses.asdict would deep-copy the AST nodes
+        # and the shared source buffer of every segment.
         clean_segments = []
         for seg in module.segments:
             clean_segments.append({
@@ -1,11 +1,15 @@
+import ast
 import click
 import os
 import sys
+import time
 
 # Add current directory to path to ensure imports work
 sys.path.append(os.getcwd())
 
 from src.parser import CodeParser
+from src.analyzer import FeatureAnalyzer
+from src.segment_store import SegmentStore, SegmentRecord, hash_file, hash_text
 from src.splitter import SplitterOrchestrator
 from src.transpiler import Transpiler, ExecutionWrapper
 from visuals.graph import GraphGenerator
@@ -13,12 +17,40 @@ from visuals.report import ReportGenerator
 from visuals.metadata import MetadataGenerator
 from visuals.live import LiveVisualizer
 
+def _segment_records(module):
+    """Builds index records for the final segments, with features where the code parses."""
+    analyzer = FeatureAnalyzer()
+    records = []
+    for seg in module.segments:
+        seg_start = time.perf_counter()
+        code = seg.code
+        features = None
+        try:
+            features = analyzer.analyze(seg.ast_node or ast.parse(code))
+        except SyntaxError:
+            pass # Line-based splits are not always standalone Python
+        records.append(SegmentRecord(
+            segment_id=seg.id,
+            start_line=seg.start_line,
+            end_line=seg.end_line,
+            code_hash=hash_text(code),
+            complexity=seg.complexity_score,
+            features=features,
+            tags=seg.tags,
+            elapsed=time.perf_counter() - seg_start
+        ))
+    return records
+
 @click.command()
 @click.argument('input_file', type=click.Path(exists=True))
 @click.option('--output-dir', default='viz', help='Directory to save visualizations')
 @click.option('--live-viz', is_flag=True, help='Show live parsing/lexing visualization')
 @click.option('--execute', is_flag=True, help='Execute the transpiled code immediately')
-def process(input_file, output_dir, live_viz, execute):
+@click.option('--index-db', default=None, help='SQLite segment index to record results in (default: <output-dir>/segments.db, empty to disable)')
+@click.option('--skip-unchanged', is_flag=True, help='Skip the file if the segment index already has its current contents')
+@click.option('--compiled-models', is_flag=True, help='Use cached TorchScript/int8 models for neural inference')
+@click.option('--workers', default=0, help='Threads for expensive splitting strategies (0 = inline)')
+def process(input_file, output_dir, live_viz, execute, index_db, skip_unchanged, compiled_models, workers):
     """
     SelfPartitioningTranspilerV5 CLI.
     
@@ -28,10 +60,19 @@ def process(input_file, output_dir, live_viz, execute):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
-    with open(input_file, 'r', encoding='utf-8') as f:
-        source_code = f.read()
+    if index_db is None:
+        index_db = os.path.join(output_dir, 'segments.db')
+    store = SegmentStore(index_db) if index_db else None
+    file_hash = hash_file(input_file)
+    if store and skip_unchanged and store.is_unchanged(input_file, "splitter", file_hash):
+        click.echo(f"{input_file} is unchanged since the last indexed run. Skipping.")
+        store.close()
+        return
+    run_start = time.perf_counter()
 
     if live_viz:
+        with open(input_file, 'r', encoding='utf-8') as f:
+            source_code = f.read()
         try:
             viz = LiveVisualizer()
             viz.visualize_process(source_code)
@@ -44,14 +85,21 @@ def process(input_file, output_dir, live_viz, execute):
 
     # 1. Parse
     parser = CodeParser()
-    parsed_module = parser.parse_source(source_code, input_file)
+    # Large inputs are memory-mapped; segments stay views into that buffer.
+    parsed_module = parser.parse_file(input_file)
     click.echo(f"Parsed {len(parsed_module.segments)} initial segments.")
 
     # 2. Split & Balance
-    splitter = SplitterOrchestrator()
+    splitter = SplitterOrchestrator(compiled_models=compiled_models, workers=workers)
     processed_module = splitter.process_module(parsed_module)
     click.echo(f"After splitting and balancing: {len(processed_module.segments)} segments.")
 
+    if store:
+        store.record_file(input_file, "splitter", file_hash,
+                          _segment_records(processed_module), elapsed=time.perf_counter() - run_start)
+        store.close()
+        click.echo(f"Segment index updated: {index_db}")
+
     # 3. Transpile
     click.echo("Transpiling and instrumenting code...")
     transpiler = Transpiler(output_dir)
@@ -75,6 +123,8 @@ def process(input_file, output_dir, live_viz, execute):
 
     meta_gen = MetadataGenerator(output_dir)
     meta_gen.generate(processed_module)
+    # Drops the memory map of a large input; segment text is copied out first
+    processed_module.close()
 
     click.echo("Done! Check the 'viz/' folder.")
     